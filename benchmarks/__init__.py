@@ -0,0 +1 @@
+"""PPMS性能基准测试"""
@@ -0,0 +1,331 @@
+"""PPMS接口基准：在临时数据库上逐个计时PPMS的公开方法（不启动pywebview窗口）
+
+每个用例先预热一次，再计时若干次，报告ops/sec、p50/p95/p99延迟，
+并在tracemalloc下额外运行一次记录峰值内存。结果可保存为基线，
+之后的运行与基线比较，p50变慢超过阈值的用例标记为回归（退出码1）。
+
+用法：
+    python -m benchmarks.api [--scale small] [--only get_tasks,export]
+                             [--save-baseline data/bench_baseline.json]
+                             [--baseline data/bench_baseline.json] [--threshold 0.2]
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.datagen import SCALES, generate  # noqa: E402
+
+READ_ITERATIONS = 20
+WRITE_ITERATIONS = 200
+HEAVY_ITERATIONS = 3
+BURST_SIZE = 50
+
+
+class Context:
+    """用例共享的状态：已有数据的id范围及用例中新建的记录"""
+
+    def __init__(self, ppms, api):
+        self.ppms = ppms
+        self.api = api
+        with ppms.db.connection() as conn:
+            self.task_id = conn.execute("SELECT MIN(id) FROM tasks").fetchone()[0]
+            self.project_id = conn.execute(
+                "SELECT project_id FROM payments GROUP BY project_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+            self.version = conn.execute("SELECT version FROM sync_version").fetchone()[0]
+        self.counter = itertools.count()
+        self.accounts = []
+        self.projects = []
+        self.payments = []
+
+    def new_account(self):
+        account_id = self.ppms.add_account("基准网站", "https://example.com", f"bench{next(self.counter)}", "pw")["id"]
+        self.accounts.append(account_id)
+        return account_id
+
+    def new_project(self):
+        project_id = self.ppms.add_project(f"[基准客户] 项目{next(self.counter)}", "其他", 1, date.today().isoformat())
+        self.projects.append(project_id)
+        return project_id
+
+    def new_payment(self):
+        # 每个项目只能结算一次，每条结算记录使用单独的项目
+        project_id = self.ppms.add_project(f"[基准客户] 结算项目{next(self.counter)}", "其他", 1)
+        payment_id = self.ppms.add_payment(project_id, 100)
+        self.payments.append(payment_id)
+        return payment_id
+
+
+def _export(ctx, data_type, format):
+    result = ctx.ppms.export_data(data_type, format)
+    if "file_path" in result:
+        os.remove(result["file_path"])
+    return result
+
+
+def _month_range():
+    today = date.today()
+    next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return today.replace(day=1).isoformat(), (next_month - timedelta(days=1)).isoformat()
+
+
+def _burst(ctx):
+    """模拟页面连续发起的写操作：BURST_SIZE个线程同时经由PPMSApi更新任务，由写线程合并提交"""
+    threads = [threading.Thread(target=ctx.api.update_task, args=(ctx.task_id + i, {"notes": f"备注{i}"}))
+               for i in range(BURST_SIZE)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _bridge(result):
+    """与pywebview桥接相同，返回值经json.dumps序列化后才交给页面"""
+    return json.dumps(result)
+
+
+# (用例名, 分组, 迭代次数, 调用函数)
+CASES = [
+    ("get_tasks", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_tasks()),
+    ("get_tasks[status]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.get_tasks("pending")),
+    ("get_tasks[priority]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.get_tasks(None, "high")),
+    ("get_tasks[columnar]", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_tasks(None, None, "columnar")),
+    ("get_tasks_page", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_tasks_page(None, None, 50)),
+    ("get_task_progress", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_task_progress(ctx.task_id)),
+    ("get_accounts", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_accounts()),
+    ("get_accounts[tag]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.get_accounts("网页设计")),
+    ("get_accounts[columnar]", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_accounts(None, "columnar")),
+    ("get_accounts_page", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_accounts_page(None, 50)),
+    ("get_projects", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_projects()),
+    ("get_projects[archived]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.get_projects(True)),
+    ("get_projects[columnar]", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_projects(False, "columnar")),
+    ("get_projects_page", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_projects_page(False, 50)),
+    ("get_payments", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payments()),
+    ("get_payments[project]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payments(ctx.project_id)),
+    ("get_payments[columnar]", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payments(None, "columnar")),
+    ("get_payments_page", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payments_page(None, 50)),
+    ("get_clients", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_clients()),
+    ("get_categories", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_categories()),
+    ("get_websites", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_websites()),
+    ("get_settings", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_settings()),
+    ("search", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.search("小程序海报")),
+    ("search[short]", "filter", READ_ITERATIONS, lambda ctx: ctx.ppms.search("设计")),
+    ("get_changes_since", "list", READ_ITERATIONS, lambda ctx: ctx.ppms.get_changes_since(ctx.version)),
+
+    ("add_task", "add", WRITE_ITERATIONS, lambda ctx: ctx.ppms.add_task(
+        f"基准任务{next(ctx.counter)}", "其他", None, "medium", None, "客户001")),
+    ("update_task", "update", WRITE_ITERATIONS, lambda ctx: ctx.ppms.update_task(
+        ctx.task_id, {"notes": f"备注{next(ctx.counter)}"})),
+    ("update_task[burst]", "update", READ_ITERATIONS, _burst),
+    ("add_task_progress", "add", WRITE_ITERATIONS, lambda ctx: ctx.ppms.add_task_progress(
+        ctx.task_id, f"进度{next(ctx.counter)}")),
+    ("add_account", "add", WRITE_ITERATIONS, lambda ctx: ctx.new_account()),
+    ("update_account", "update", WRITE_ITERATIONS, lambda ctx: ctx.ppms.update_account(
+        ctx.accounts[-1] if ctx.accounts else ctx.new_account(), {"notes": f"备注{next(ctx.counter)}"})),
+    ("delete_account", "delete", WRITE_ITERATIONS, lambda ctx: ctx.ppms.delete_account(
+        ctx.accounts.pop() if ctx.accounts else ctx.new_account())),
+    ("add_project", "add", WRITE_ITERATIONS, lambda ctx: ctx.new_project()),
+    ("update_project", "update", WRITE_ITERATIONS, lambda ctx: ctx.ppms.update_project(
+        ctx.projects[-1] if ctx.projects else ctx.new_project(), {"notes": f"备注{next(ctx.counter)}"})),
+    ("add_payment", "add", WRITE_ITERATIONS, lambda ctx: ctx.new_payment()),
+    ("delete_payment", "delete", WRITE_ITERATIONS, lambda ctx: ctx.ppms.delete_payment(
+        ctx.payments.pop() if ctx.payments else ctx.new_payment())),
+    ("delete_project", "delete", WRITE_ITERATIONS, lambda ctx: ctx.ppms.delete_project(
+        ctx.projects.pop() if ctx.projects else ctx.new_project())),
+    ("convert_completed_tasks_to_projects", "add", READ_ITERATIONS,
+     lambda ctx: ctx.ppms.convert_completed_tasks_to_projects()),
+
+    ("get_task_stats[week]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_task_stats("week")),
+    ("get_task_stats[month]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_task_stats("month")),
+    ("get_payment_stats[month]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payment_stats("month")),
+    ("get_payment_stats[year]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_payment_stats("year")),
+    ("get_dashboard_stats[week]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_dashboard_stats("week")),
+    ("get_dashboard_stats[year]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_dashboard_stats("year")),
+    ("get_timeseries[trend,month]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_timeseries(
+        ["projects_completed", "payment_count"], *_month_range(), "day")),
+    ("get_timeseries[trend,year]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_timeseries(
+        ["projects_completed", "payment_count"], f"{date.today().year}-01-01", f"{date.today().year}-12-31", "month")),
+    ("get_timeseries[payments,year]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_timeseries(
+        "payment_amount", f"{date.today().year}-01-01", f"{date.today().year}-12-31", "month")),
+    ("get_timeseries[payments,all]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_timeseries(
+        "payment_amount", None, None, "year")),
+    ("get_timeseries[tasks_completed,week]", "stats", READ_ITERATIONS, lambda ctx: ctx.ppms.get_timeseries(
+        "tasks_completed", None, None, "week")),
+
+    ("export_data[accounts,csv]", "export", HEAVY_ITERATIONS, lambda ctx: _export(ctx, "accounts", "csv")),
+    ("export_data[accounts,excel]", "export", HEAVY_ITERATIONS, lambda ctx: _export(ctx, "accounts", "excel")),
+    ("export_data[tasks,csv]", "export", HEAVY_ITERATIONS, lambda ctx: _export(ctx, "tasks", "csv")),
+    ("export_data[payments,csv]", "export", HEAVY_ITERATIONS, lambda ctx: _export(ctx, "payments", "csv")),
+]
+
+# 大表列表接口三种返回格式的对比，计时包含桥接序列化
+BRIDGE_CALLS = [
+    ("get_tasks", (None, None)),
+    ("get_accounts", (None,)),
+    ("get_projects", (True,)),
+    ("get_payments", (None,)),
+]
+CASES += [
+    (f"bridge:{method}[{format}]", "bridge", READ_ITERATIONS,
+     lambda ctx, method=method, args=args, format=format: _bridge(getattr(ctx.ppms, method)(*args, format)))
+    for method, args in BRIDGE_CALLS for format in ("records", "columnar", "json")
+]
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(ctx, func, iterations):
+    """预热一次后计时iterations次，再在tracemalloc下运行一次记录峰值内存"""
+    result = func(ctx)
+    if isinstance(result, dict) and "error" in result:
+        return {"error": str(result["error"])}
+
+    timings = []
+    errors = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func(ctx)
+        timings.append((time.perf_counter() - start) * 1000)
+        if isinstance(result, dict) and "error" in result:
+            errors += 1
+
+    tracemalloc.start()
+    try:
+        func(ctx)
+        peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    total_s = sum(timings) / 1000
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "ops_per_sec": round(iterations / total_s, 1) if total_s else None,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(_percentile(timings, 0.50), 3),
+        "p95_ms": round(_percentile(timings, 0.95), 3),
+        "p99_ms": round(_percentile(timings, 0.99), 3),
+        "max_ms": round(timings[-1], 3),
+        "peak_alloc_kb": peak_kb,
+    }
+
+
+def compare(results, baseline, threshold):
+    """与基线比较p50，返回回归用例列表"""
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or "p50_ms" not in previous or "p50_ms" not in current:
+            continue
+        ratio = current["p50_ms"] / previous["p50_ms"] if previous["p50_ms"] else 1.0
+        current["baseline_p50_ms"] = previous["p50_ms"]
+        current["ratio"] = round(ratio, 2)
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results):
+    print(f"{'用例':<36}{'ops/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'峰值KB':>10}{'基线比':>8}")
+    for name, case in results["cases"].items():
+        if "error" in case:
+            print(f"{name:<36}  失败: {case['error']}")
+            continue
+        ratio = f"{case['ratio']:.2f}" if "ratio" in case else "-"
+        print(f"{name:<36}{case['ops_per_sec'] or 0:>10.1f}{case['p50_ms']:>10.3f}{case['p95_ms']:>10.3f}"
+              f"{case['p99_ms']:>10.3f}{case['peak_alloc_kb']:>10}{ratio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPMS接口基准")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="只运行名称包含这些关键字的用例（逗号分隔）")
+    parser.add_argument("--db", help="使用已生成的数据库（会先复制，不修改原文件）")
+    parser.add_argument("--output", help="结果JSON的保存路径")
+    parser.add_argument("--baseline", help="与此基线JSON比较")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50变慢超过该比例视为回归")
+    args = parser.parse_args()
+
+    import main as ppms_main
+
+    workdir = tempfile.mkdtemp(prefix="ppms-bench-")
+    try:
+        db_path = os.path.join(workdir, "bench.db")
+        if args.db:
+            shutil.copy(args.db, db_path)
+        # 基准运行期间屏蔽业务代码的print输出
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                ppms = ppms_main.PPMS(db_path=db_path)
+                start = time.perf_counter()
+                if not args.db:
+                    generate(ppms, args.scale, args.seed)
+                setup_s = time.perf_counter() - start
+                ctx = Context(ppms, ppms_main.PPMSApi(ppms))
+
+                keywords = [k.strip() for k in args.only.split(",")] if args.only else None
+                cases = {}
+                for name, group, iterations, func in CASES:
+                    if keywords and not any(k in name for k in keywords):
+                        continue
+                    try:
+                        cases[name] = dict(group=group, **run_case(ctx, func, iterations))
+                    except Exception as e:
+                        cases[name] = {"group": group, "error": f"{type(e).__name__}: {e}"}
+                ppms.writer.stop()
+                ppms.db.close_all()
+
+        results = {
+            "meta": {
+                "scale": "db" if args.db else args.scale,
+                "seed": args.seed,
+                "setup_s": round(setup_s, 1),
+                "python": sys.version.split()[0],
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "cases": cases,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        results["regressions"] = regressions
+
+    print_table(results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+    if regressions:
+        print(f"\n回归（p50变慢超过{args.threshold:.0%}）: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
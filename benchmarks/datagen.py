@@ -0,0 +1,173 @@
+"""确定性的基准测试数据生成器
+
+同一个(seed, anchor)总是生成完全相同的数据。日期以anchor为基准向前分布，
+这样按周/月统计的接口也能命中数据。数据通过PPMS自身的连接管理器批量写入，
+统计汇总表、同步版本号、全文索引等触发器都会照常执行。
+
+用法：
+    python -m benchmarks.datagen --scale small --output data/bench.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 各规模下每张表的行数；full为需求中的目标规模
+SCALES = {
+    "tiny": {"tasks": 1000, "task_progress": 5000, "accounts": 500, "projects": 200, "payments": 200},
+    "small": {"tasks": 10000, "task_progress": 50000, "accounts": 5000, "projects": 2000, "payments": 2000},
+    "full": {"tasks": 100000, "task_progress": 500000, "accounts": 50000, "projects": 20000, "payments": 20000},
+}
+CHUNK_SIZE = 5000
+
+WORDS = ("设计 开发 测试 网站 小程序 海报 视频 剪辑 需求 修改 方案 文案 推广 运营 数据 报表 后台 接口 优化 "
+         "首页 详情页 活动 品牌 包装 插画 动画 部署 迁移 文档 培训").split()
+CATEGORIES = ["网页设计", "平面设计", "视频剪辑", "程序开发", "文案撰写", "运营推广", "数据分析", "其他"]
+WEBSITES = [("淘宝", "https://www.taobao.com"), ("京东", "https://www.jd.com"), ("拼多多", "https://www.pinduoduo.com"),
+            ("抖音", "https://www.douyin.com"), ("小红书", "https://www.xiaohongshu.com"), ("哔哩哔哩", "https://www.bilibili.com"),
+            ("知乎", "https://www.zhihu.com"), ("微博", "https://weibo.com"), ("GitHub", "https://github.com"),
+            ("闲鱼", "https://www.goofish.com")]
+TAGS = CATEGORIES[:6]
+CLIENT_COUNT = 300
+
+
+def _text(rng, words):
+    return "".join(rng.sample(WORDS, words))
+
+
+def _stamp(anchor, rng, days):
+    moment = datetime.combine(anchor, datetime.min.time()) - timedelta(
+        days=rng.randrange(days), seconds=rng.randrange(86400))
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(ppms, scale="small", seed=42, anchor=None, counts=None, progress=None):
+    """向PPMS实例的数据库写入合成数据，返回各表实际写入的行数
+
+    counts可覆盖SCALES中的部分行数；progress(表名, 已写入行数)用于显示进度。
+    """
+    counts = dict(SCALES[scale], **(counts or {}))
+    anchor = anchor or date.today()
+    rng = random.Random(seed)
+    clients = [f"客户{i:03d}" for i in range(CLIENT_COUNT)]
+
+    def write(table, sql, rows):
+        written = 0
+        for chunk in _chunks(rows):
+            with ppms.db.transaction() as conn:
+                conn.executemany(sql, chunk)
+            written += len(chunk)
+            if progress:
+                progress(table, written)
+        return written
+
+    # 参照数据的创建时间也取自anchor，保证同一(seed, anchor)生成的数据完全相同
+    created_at = datetime.combine(anchor, datetime.min.time()).strftime("%Y-%m-%d %H:%M:%S")
+    write("clients", "INSERT OR IGNORE INTO clients (name, created_at) VALUES (?, ?)",
+          ((name, created_at) for name in clients))
+    write("categories", "INSERT OR IGNORE INTO categories (name, created_at) VALUES (?, ?)",
+          ((name, created_at) for name in CATEGORIES))
+    write("websites", "INSERT OR IGNORE INTO websites (name, url, description, created_at) VALUES (?, ?, ?, ?)",
+          ((name, url, None, created_at) for name, url in WEBSITES))
+
+    with ppms.db.connection() as conn:
+        first_task = conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM tasks").fetchone()[0]
+        first_project = conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM projects").fetchone()[0]
+
+    def tasks():
+        for _ in range(counts["tasks"]):
+            created = _stamp(anchor, rng, 730)
+            deadline = (datetime.strptime(created[:10], "%Y-%m-%d") + timedelta(days=rng.randrange(1, 60))
+                        ).strftime("%Y-%m-%d") if rng.random() < 0.7 else None
+            yield (_text(rng, 3), deadline, rng.choice(["pending", "in-progress", "completed", "completed"]),
+                   rng.choice(["high", "medium", "low"]), created, created,
+                   _text(rng, 8) if rng.random() < 0.6 else None, rng.choice(clients), rng.choice(CATEGORIES),
+                   rng.randint(1, 5))
+
+    written = {}
+    written["tasks"] = write("tasks", '''
+        INSERT INTO tasks (title, deadline, status, priority, created_at, updated_at, notes, client, category, quantity)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', tasks())
+    task_ids = range(first_task, first_task + written["tasks"])
+
+    written["task_progress"] = write("task_progress", '''
+        INSERT INTO task_progress (task_id, progress_text, timestamp) VALUES (?, ?, ?)''',
+        ((rng.choice(task_ids), _text(rng, 6), _stamp(anchor, rng, 730))
+         for _ in range(counts["task_progress"])))
+
+    written["accounts"] = write("accounts", '''
+        INSERT INTO accounts (website_name, url, username, password, notes, tag, account, row, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        ((site, url, f"user{i:06d}", f"pw{rng.randrange(10 ** 8):08d}",
+          _text(rng, 4) if rng.random() < 0.3 else None, rng.choice(TAGS), f"1{rng.randrange(10 ** 10):010d}",
+          str(rng.randrange(1, 100)) if rng.random() < 0.2 else None, _stamp(anchor, rng, 730))
+         for i, (site, url) in ((i, rng.choice(WEBSITES)) for i in range(counts["accounts"]))))
+
+    # 前一半项目关联到不同的任务（task_id唯一）
+    linked = rng.sample(task_ids, min(counts["projects"] // 2, len(task_ids)))
+
+    def projects():
+        for i in range(counts["projects"]):
+            client = rng.choice(clients)
+            yield (f"[{client}] {_text(rng, 3)}", rng.choice(CATEGORIES), rng.randint(1, 5),
+                   _stamp(anchor, rng, 730)[:10], rng.choice(["paid", "unpaid"]),
+                   _text(rng, 5) if rng.random() < 0.4 else None, 1 if rng.random() < 0.3 else 0,
+                   linked[i] if i < len(linked) else None)
+
+    written["projects"] = write("projects", '''
+        INSERT INTO projects (name, type, quantity, completion_date, payment_status, notes, archived, task_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', projects())
+    project_ids = range(first_project, first_project + written["projects"])
+
+    written["payments"] = write("payments", '''
+        INSERT INTO payments (project_id, amount, date, notes) VALUES (?, ?, ?, ?)''',
+        ((rng.choice(project_ids), round(rng.uniform(50, 5000), 2), _stamp(anchor, rng, 730)[:10],
+          _text(rng, 3) if rng.random() < 0.3 else None)
+         for _ in range(counts["payments"])))
+
+    with ppms.db.transaction() as conn:
+        conn.execute("ANALYZE")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成PPMS基准测试数据库")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", help="日期基准（YYYY-MM-DD），默认今天")
+    parser.add_argument("--output", required=True, help="生成的数据库文件路径（已存在时报错）")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} 已存在")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    import main as ppms_main
+    ppms = ppms_main.PPMS(db_path=os.path.abspath(args.output))
+    anchor = datetime.strptime(args.anchor, "%Y-%m-%d").date() if args.anchor else None
+    start = time.perf_counter()
+    written = generate(ppms, args.scale, args.seed, anchor,
+                       progress=lambda table, rows: print(f"\r{table}: {rows}", end="", flush=True))
+    ppms.db.close_all()
+    print(f"\n生成完成，耗时{time.perf_counter() - start:.1f}s: {written}")
+
+
+if __name__ == "__main__":
+    main()
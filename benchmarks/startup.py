@@ -0,0 +1,108 @@
+"""启动开销基准：对比按需导入导出依赖前后的导入耗时和常驻内存
+
+每种场景在独立子进程中运行，避免模块缓存相互影响：
+  lazy   - 只导入main（当前行为，导出依赖按需加载）
+  eager  - 导入main后立即导入导出依赖openpyxl（等价于原先在顶层导入导出依赖）
+
+用法：
+    python -m benchmarks.startup [--repeat 5] [--output data/startup_bench.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行的测量代码，输出一行JSON
+CHILD_CODE = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+if sys.argv[1] == "eager":
+    main.get_openpyxl()
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+def peak_rss_kb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS返回字节，Linux返回KB
+        return rss // 1024 if sys.platform == "darwin" else rss
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize // 1024
+
+print(json.dumps({"import_ms": elapsed_ms, "peak_rss_kb": peak_rss_kb()}))
+'''
+
+
+def run_once(mode):
+    """在子进程中测量一次导入耗时和峰值内存"""
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE, mode],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode}模式运行失败:\n{proc.stderr}")
+    # 只取最后一行，忽略main模块导入时的其他输出
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    import_ms = [s["import_ms"] for s in samples]
+    rss_kb = [s["peak_rss_kb"] for s in samples]
+    return {
+        "import_ms_median": round(statistics.median(import_ms), 2),
+        "import_ms_min": round(min(import_ms), 2),
+        "peak_rss_mb_median": round(statistics.median(rss_kb) / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPMS启动开销基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每种场景的运行次数")
+    parser.add_argument("--output", help="结果JSON的保存路径")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "platform": platform.platform(), "modes": {}}
+    for mode in ("lazy", "eager"):
+        samples = [run_once(mode) for _ in range(args.repeat)]
+        results["modes"][mode] = summarize(samples)
+
+    lazy, eager = results["modes"]["lazy"], results["modes"]["eager"]
+    results["saved_ms"] = round(eager["import_ms_median"] - lazy["import_ms_median"], 2)
+    results["saved_rss_mb"] = round(eager["peak_rss_mb_median"] - lazy["peak_rss_mb_median"], 2)
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,29 @@
 import os
 import sys
+import csv
+import codecs
+import html
 import json
 import webview
 import sqlite3
 import logging
-import pandas as pd
 import subprocess
+import itertools
+import random
+import bisect
+import functools
+import re
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
+from types import MappingProxyType
 import platform
+import queue
 import threading
+import time
 import ctypes
+from contextlib import contextmanager
 
 # Windows平台特定模块导入
 if platform.system() == 'Windows':
@@ -27,6 +40,27 @@ if platform.system() == 'Windows':
         print("警告: pywin32模块导入失败，单例检测和窗口操作将不可用")
         PYWIN32_AVAILABLE = False
 
+# Excel导出依赖（openpyxl）导入耗时长、占用内存大，仅在首次导出时加载
+_openpyxl = None
+_openpyxl_lock = threading.Lock()
+
+def get_openpyxl():
+    """按需导入openpyxl，并发调用时只导入一次"""
+    global _openpyxl
+    if _openpyxl is None:
+        with _openpyxl_lock:
+            if _openpyxl is None:
+                import openpyxl
+                _openpyxl = openpyxl
+    return _openpyxl
+
+def preload_export_modules():
+    """在后台线程中预热导出依赖，失败时忽略（首次导出时会再次尝试并返回错误）"""
+    try:
+        get_openpyxl()
+    except Exception as e:
+        print(f"预加载导出模块失败: {e}")
+
 # 单例实现 - 创建互斥锁
 def create_mutex(mutex_name="PPMS_SINGLETON_MUTEX"):
     """创建一个互斥锁确保程序只有一个实例运行"""
@@ -60,20 +94,633 @@ def create_mutex(mutex_name="PPMS_SINGLETON_MUTEX"):
         print(f"创建互斥锁失败: {e}")
         return None, True  # 如果创建互斥锁失败，则允许运行新实例
 
-class PPMS:
+class ExportCancelled(Exception):
+    """导出任务被用户取消"""
+
+class BatchAborted(Exception):
+    """批量调用中有一项失败，整批回滚"""
+
+class ConnectionManager:
+    """SQLite连接管理器
+
+    pywebview会在不同的线程上调度每一次桥接调用，因此连接按线程借出：
+    同一线程内的嵌套调用复用同一个连接，调用结束后连接归还到空闲池，
+    供后续线程继续使用（保留语句缓存和已解析的schema）。
+    """
+
+    # 每个连接建立时执行一次的PRAGMA
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",      # 约16MB页缓存
+        "PRAGMA mmap_size = 268435456",    # 256MB内存映射
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    # 从执行的语句中识别被写入的表
+    WRITE_STATEMENT = re.compile(
+        r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"'`\[]?(\w+)",
+        re.IGNORECASE
+    )
+
+    def __init__(self, db_path, max_idle=4, cached_statements=256):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._idle = []
+        self._all = []
+        self._lock = threading.Lock()
+        self._commit_listeners = []
+
+    def add_commit_listener(self, listener):
+        """注册提交回调，写事务提交后以被修改的表名集合调用"""
+        self._commit_listeners.append(listener)
+
+    def _open(self):
+        """创建新连接并初始化PRAGMA"""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,  # 由transaction()显式管理事务
+            check_same_thread=False,  # 连接会在不同线程间复用，但同一时刻只属于一个线程
+            cached_statements=self.cached_statements
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """借出当前线程的连接，可重入"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+
+        local.conn = conn
+        local.depth = 1
+        local.tx_depth = 0
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            local.depth = 0
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    def _release(self, conn):
+        """归还连接到空闲池，超出上限则关闭"""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._all.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """写事务上下文：正常退出时提交，异常时回滚
+
+        嵌套调用并入外层事务，并在保存点中执行：嵌套块抛出异常时只撤销它自己的修改，
+        与单独执行时的效果一致，外层事务可以继续。
+        """
+        with self.connection() as conn:
+            local = self._local
+            if local.tx_depth > 0:
+                savepoint = f"sp_{local.tx_depth}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                local.tx_depth += 1
+                try:
+                    yield conn
+                    conn.execute(f"RELEASE {savepoint}")
+                except BaseException:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    raise
+                finally:
+                    local.tx_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE")  # 写事务立即获取写锁，避免升级锁时的死锁
+            local.tx_depth = 1
+            changed = set()
+            changes_before = conn.total_changes
+            if self._commit_listeners:
+                conn.set_trace_callback(lambda sql: self._track_write(sql, changed))
+            try:
+                yield conn
+                conn.execute("COMMIT")
+                # 没有实际修改任何行的事务不通知
+                if conn.total_changes == changes_before:
+                    changed.clear()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                local.tx_depth = 0
+                if self._commit_listeners:
+                    conn.set_trace_callback(None)
+
+            if changed:
+                for listener in self._commit_listeners:
+                    try:
+                        listener(changed)
+                    except Exception as e:
+                        print(f"提交回调出错: {e}")
+
+    def holds_connection(self):
+        """当前线程是否已借出连接（处于connection()/transaction()块内）"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def _track_write(self, sql, changed):
+        match = self.WRITE_STATEMENT.match(sql)
+        if match:
+            changed.add(match.group(1).lower())
+
+    def close_all(self):
+        """关闭所有连接（程序退出时调用）"""
+        with self._lock:
+            conns, self._all, self._idle = self._all, [], []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+class GroupCommitWriter:
+    """单写线程：写操作排队到同一个线程执行，短时间内到达的写操作合并为一个事务提交
+
+    每个写操作在各自的保存点中执行，失败只撤销它自己的修改；调用方阻塞到所在的事务
+    提交后才拿到自己的返回值或异常。读操作不经过写线程，仍在各自线程的连接上并发执行。
+    写线程在第一次写入时才启动。
+    """
+
+    WINDOW = 0.003      # 收到一个写操作后继续等待合并的时间（秒）
+    MAX_BATCH = 64      # 一个事务最多合并的写操作数
+
+    def __init__(self, db, window=None, max_batch=None):
+        self.db = db
+        self.window = self.WINDOW if window is None else window
+        self.max_batch = max_batch or self.MAX_BATCH
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.writes = 0
+
+    def call(self, func, *args, **kwargs):
+        """在写线程上执行func并返回其结果；已在写线程或已持有连接时直接执行"""
+        if threading.current_thread() is self._thread or self.db.holds_connection():
+            return func(*args, **kwargs)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ppms-writer", daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future.result()
+
+    def stop(self):
+        """提交已排队的写操作后停止写线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self):
+        return {"commits": self.commits, "writes": self.writes}
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """在一个事务中依次执行一组写操作，提交后再通知各调用方"""
+        outcomes = []
+        try:
+            with self.db.transaction():
+                for future, func, args, kwargs in batch:
+                    try:
+                        with self.db.transaction():
+                            outcomes.append((future, func(*args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # 提交失败时整组修改都未生效
+            print(f"写线程提交失败: {e}")
+            for future, _, _, _ in batch:
+                future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.writes += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+class PerfStats:
+    """桥接API的调用统计
+
+    每个方法记录调用次数、错误次数、返回行数、采样的返回数据大小，以及固定内存的延迟直方图：
+    桶边界按1.25倍等比增长，覆盖0.05ms到约26s，分位数取所在桶的上界（相对误差不超过25%）。
+    """
+
+    BUCKET_BOUNDS = [0.05 * 1.25 ** i for i in range(60)]  # 毫秒
+    PAYLOAD_SAMPLE_EVERY = 10      # 每隔多少次调用序列化一次返回值来估算数据大小
+
     def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # 可选的cProfile/tracemalloc采样（ApiProfiler），默认关闭
+        self.profiler = None
+
+    def _entry(self, method):
+        entry = self._methods.get(method)
+        if entry is None:
+            entry = self._methods[method] = {
+                "calls": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "payload_bytes": 0, "payload_samples": 0,
+                "buckets": [0] * (len(self.BUCKET_BOUNDS) + 1),
+            }
+        return entry
+
+    def should_sample_payload(self, method):
+        with self._lock:
+            return self._entry(method)["calls"] % self.PAYLOAD_SAMPLE_EVERY == 0
+
+    def record(self, method, elapsed_ms, error=False, rows=0, payload_bytes=None):
+        bucket = bisect.bisect_left(self.BUCKET_BOUNDS, elapsed_ms)
+        with self._lock:
+            entry = self._entry(method)
+            entry["calls"] += 1
+            entry["errors"] += 1 if error else 0
+            entry["rows"] += rows
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["buckets"][bucket] += 1
+            if payload_bytes is not None:
+                entry["payload_bytes"] += payload_bytes
+                entry["payload_samples"] += 1
+
+    def _percentile(self, buckets, calls, fraction):
+        target = calls * fraction
+        seen = 0
+        for idx, count in enumerate(buckets):
+            seen += count
+            if seen >= target and count:
+                return self.BUCKET_BOUNDS[idx] if idx < len(self.BUCKET_BOUNDS) else float("inf")
+        return 0.0
+
+    def snapshot(self, reset=False):
+        """返回各方法的统计摘要，按累计耗时倒序"""
+        with self._lock:
+            methods = self._methods
+            started_at = self.started_at
+            if reset:
+                self._methods = {}
+                self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        summary = {}
+        for method, entry in methods.items():
+            calls = entry["calls"]
+            if not calls:
+                continue
+            # 桶上界可能大于实际最大值，分位数不超过max_ms
+            max_ms = entry["max_ms"]
+            summary[method] = {
+                "calls": calls,
+                "errors": entry["errors"],
+                "avg_ms": round(entry["total_ms"] / calls, 3),
+                "p50_ms": round(min(self._percentile(entry["buckets"], calls, 0.50), max_ms), 3),
+                "p95_ms": round(min(self._percentile(entry["buckets"], calls, 0.95), max_ms), 3),
+                "p99_ms": round(min(self._percentile(entry["buckets"], calls, 0.99), max_ms), 3),
+                "max_ms": round(max_ms, 3),
+                "total_ms": round(entry["total_ms"], 1),
+                "rows": entry["rows"],
+                "avg_payload_bytes": (entry["payload_bytes"] // entry["payload_samples"]
+                                      if entry["payload_samples"] else None),
+            }
+        ordered = dict(sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+        return {"since": started_at, "methods": ordered}
+
+class ApiProfiler:
+    """按需对桥接方法做cProfile/tracemalloc采样，结果写入data/profiles目录
+
+    通过环境变量开启（默认关闭，关闭时instrument_api只多一次None判断）：
+      PPMS_PROFILE          cprofile、tracemalloc或两者以逗号分隔
+      PPMS_PROFILE_METHODS  只采样这些方法（逗号分隔），默认全部
+      PPMS_PROFILE_RATE     采样比例0~1，默认1
+      PPMS_PROFILE_TOP      报告中列出的函数/分配位置条数，默认25
+    cProfile和tracemalloc都是进程级的，同一时间只采样一个调用，其余调用照常执行。
+    """
+
+    MAX_FILES = 200                # 每次运行最多写入的报告数，避免占满磁盘
+
+    def __init__(self, output_dir, modes, methods=None, rate=1.0, top=25):
+        self.output_dir = output_dir
+        self.cprofile = "cprofile" in modes
+        self.tracemalloc = "tracemalloc" in modes
+        self.methods = set(methods) if methods else None
+        self.rate = rate
+        self.top = top
+        self._lock = threading.Lock()
+        self._written = 0
+
+    @classmethod
+    def from_env(cls, output_dir, environ=None):
+        """根据环境变量创建，未开启时返回None"""
+        environ = os.environ if environ is None else environ
+        modes = {m.strip().lower() for m in environ.get("PPMS_PROFILE", "").split(",") if m.strip()}
+        modes &= {"cprofile", "tracemalloc"}
+        if not modes:
+            return None
+        methods = [m.strip() for m in environ.get("PPMS_PROFILE_METHODS", "").split(",") if m.strip()]
+        try:
+            rate = min(max(float(environ.get("PPMS_PROFILE_RATE", "1")), 0.0), 1.0)
+            top = max(int(environ.get("PPMS_PROFILE_TOP", "25")), 1)
+        except ValueError:
+            rate, top = 1.0, 25
+        print(f"API性能采样已开启: {', '.join(sorted(modes))}，输出目录: {output_dir}")
+        return cls(output_dir, modes, methods, rate, top)
+
+    def wants(self, method):
+        if self.methods is not None and method not in self.methods:
+            return False
+        return self._written < self.MAX_FILES and random.random() < self.rate
+
+    def call(self, name, func, *args, **kwargs):
+        """采样执行一次调用；已有采样在进行时直接执行"""
+        if not self._lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            import cProfile
+            import tracemalloc
+            profile = cProfile.Profile() if self.cprofile else None
+            before = None
+            # 只在本次采样期间开启跟踪，否则之后进程内的每次分配都要记录调用栈
+            started = False
+            if self.tracemalloc:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(10)
+                    started = True
+                before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            try:
+                result = profile.runcall(func, *args, **kwargs) if profile else func(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                after = tracemalloc.take_snapshot() if before is not None else None
+                if started:
+                    tracemalloc.stop()
+                self._write_reports(name, elapsed_ms, profile, before, after)
+            return result
+        finally:
+            self._lock.release()
+
+    def _write_reports(self, name, elapsed_ms, profile, before, after):
+        import pstats
+        import io
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        base = os.path.join(self.output_dir, f"{name}_{stamp}_{elapsed_ms:.0f}ms")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(base + ".prof")
+                text = io.StringIO()
+                pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+                with open(base + ".txt", "w", encoding="utf-8") as f:
+                    f.write(text.getvalue())
+            if after is not None:
+                # 排除采样工具自身和模块导入的分配
+                import cProfile
+                import tracemalloc
+                ignored = [tracemalloc.Filter(False, path) for path in (
+                    "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                    tracemalloc.__file__, cProfile.__file__, pstats.__file__)]
+                after = after.filter_traces(ignored)
+                before = before.filter_traces(ignored)
+                with open(base + "_alloc.txt", "w", encoding="utf-8") as f:
+                    f.write(f"{name} {elapsed_ms:.1f}ms，内存分配增量前{self.top}位\n")
+                    for stat in after.compare_to(before, "lineno")[:self.top]:
+                        f.write(f"{stat}\n")
+            self._written += 1
+        except OSError as e:
+            print(f"写入性能采样报告失败: {e}")
+
+def instrument_api(cls):
+    """类装饰器：为API代理类的每个公开方法记录耗时、错误、返回行数和数据大小"""
+    def wrap(name, method):
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            perf = self._ppms.perf
+            sample = perf.should_sample_payload(name)
+            profiler = perf.profiler
+            start = time.perf_counter()
+            try:
+                if profiler is not None and profiler.wants(name):
+                    result = profiler.call(name, method, self, *args, **kwargs)
+                else:
+                    result = method(self, *args, **kwargs)
+            except Exception:
+                perf.record(name, (time.perf_counter() - start) * 1000, error=True)
+                raise
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            payload_bytes = None
+            if sample:
+                try:
+                    payload_bytes = len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+                except (TypeError, ValueError):
+                    pass
+            perf.record(name, elapsed_ms, error=isinstance(result, dict) and "error" in result,
+                        rows=_count_result_rows(result), payload_bytes=payload_bytes)
+            return result
+        return timed
+
+    for name, method in list(vars(cls).items()):
+        if callable(method) and not name.startswith('_'):
+            setattr(cls, name, wrap(name, method))
+    return cls
+
+def route_writes(cls):
+    """类装饰器：cls.WRITE_METHODS中的方法交给单写线程执行，短时间内的写操作合并提交"""
+    def wrap(method):
+        @functools.wraps(method)
+        def routed(self, *args, **kwargs):
+            return self._ppms.writer.call(method, self, *args, **kwargs)
+        return routed
+
+    for name in cls.WRITE_METHODS:
+        setattr(cls, name, wrap(getattr(cls, name)))
+    return cls
+
+def _count_result_rows(result):
+    """API返回的记录条数：列表取长度，分页/搜索/批量/列式结果取其中列表的长度"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        for key in ("items", "hits", "results", "rows"):
+            if isinstance(result.get(key), list):
+                return len(result[key])
+    return 0
+
+class PPMS:
+    # 二级索引：(索引名, 建索引语句)。排序表达式需与查询中的ORDER BY完全一致才能命中
+    INDEXES = [
+        ("idx_tasks_deadline", "CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks (IFNULL(deadline, ''), id)"),
+        ("idx_tasks_status_deadline", "CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline ON tasks (status, IFNULL(deadline, ''), id)"),
+        ("idx_tasks_priority_deadline", "CREATE INDEX IF NOT EXISTS idx_tasks_priority_deadline ON tasks (priority, IFNULL(deadline, ''), id)"),
+        ("idx_task_progress_task", "CREATE INDEX IF NOT EXISTS idx_task_progress_task ON task_progress (task_id, timestamp)"),
+        ("idx_accounts_website", "CREATE INDEX IF NOT EXISTS idx_accounts_website ON accounts (website_name, id)"),
+        ("idx_accounts_tag_website", "CREATE INDEX IF NOT EXISTS idx_accounts_tag_website ON accounts (tag, website_name, id)"),
+        ("idx_projects_archived_completion", "CREATE INDEX IF NOT EXISTS idx_projects_archived_completion ON projects (archived, IFNULL(completion_date, ''), id)"),
+        # 迁移6会将其重建为唯一索引
+        ("idx_projects_task", "CREATE INDEX IF NOT EXISTS idx_projects_task ON projects (task_id)"),
+        ("idx_payments_project", "CREATE INDEX IF NOT EXISTS idx_payments_project ON payments (project_id, IFNULL(date, ''), id)"),
+        ("idx_payments_date", "CREATE INDEX IF NOT EXISTS idx_payments_date ON payments (IFNULL(date, ''), id)"),
+    ]
+
+    def __init__(self, db_path=None):
         self.window = None
-        # 确保数据库文件在项目根目录下
-        self.db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ppms.db')
+        # 确保数据库文件在项目根目录下；基准测试等场景可指定其他数据库文件
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ppms.db')
+        self.db = ConnectionManager(self.db_path)
         self.init_database()
+        # 页面发起的写操作经由单写线程组提交（见PPMSApi.WRITE_METHODS）
+        self.writer = GroupCommitWriter(self.db)
         self._should_quit = False
         self._tray_icon = None
+        # 数据版本：每次写事务提交后递增，并合并短时间内的变更推送给页面
+        self._data_version = 0
+        self._table_versions = {}
+        self._pending_changes = set()
+        self._change_timer = None
+        self._change_lock = threading.Lock()
+        self.db.add_commit_listener(self._on_commit)
+        # 后台导出任务
+        self._export_jobs = {}
+        self._export_lock = threading.Lock()
+        self._export_executor = None
+        # 全文检索索引是否可用，首次搜索时检测
+        self._search_fts_ready = None
+        # 规范化日期键（生成列）是否可用，首次使用时检测
+        self._date_keys_ready = None
+        # SQLite是否支持JSON函数，首次请求json格式时检测
+        self._sqlite_json_ready = None
+        # 设置缓存（只读快照），首次读取时加载，settings表的写事务提交后失效
+        self._settings_cache = None
+        self._settings_version = 0
+        self._settings_lock = threading.Lock()
+        self.db.add_commit_listener(self._invalidate_settings)
+        # 客户/项目类型/网站类型等下拉参照数据的缓存，写事务提交后按依赖的表失效
+        self._lookup_cache = {}
+        self._lookup_version = 0
+        self._lookup_lock = threading.Lock()
+        self.db.add_commit_listener(self._invalidate_lookups)
+        # 桥接API调用统计
+        self.perf = PerfStats()
+        self.perf.profiler = ApiProfiler.from_env(
+            os.path.join(os.path.dirname(self.db_path), "data", "profiles"))
+        self._perf_dump_stop = None
+
+    # 版本化迁移步骤：(版本号, 说明, 方法名)。已发布的步骤不可修改，新的结构变更追加新步骤
+    MIGRATIONS = [
+        (1, "创建基础表", "_migration_1_create_tables"),
+        (2, "补齐历史版本缺失的字段和表", "_migration_2_legacy_columns"),
+        (3, "创建二级索引", "_migration_3_indexes"),
+        (4, "创建统计汇总表及维护触发器", "_migration_4_stats_tables"),
+        (5, "增量同步：行版本号与删除记录", "_migration_5_sync_tracking"),
+        (6, "项目task_id唯一索引", "_migration_6_unique_project_task"),
+        (7, "FTS5全文检索索引", "_migration_7_search_index"),
+        (8, "规范化日期键及索引", "_migration_8_date_keys"),
+        (9, "修复任务统计触发器对空状态的处理", "_migration_9_task_stats_triggers"),
+    ]
 
     def init_database(self):
         """Initialize the SQLite database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # 已是最新版本时只需读取一次user_version
+        if self.get_schema_version() >= self.MIGRATIONS[-1][0]:
+            return
+        self.migrate_database()
+
+    def get_schema_version(self):
+        """读取数据库当前结构版本（PRAGMA user_version）"""
+        with self.db.connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate_database(self, dry_run=False):
+        """按版本号依次执行未应用的迁移步骤
+
+        每个步骤在独立事务中执行并在同一事务内更新user_version，失败时回滚该步骤
+        并停止后续步骤。dry_run为True时只返回待执行的步骤，不修改数据库。
+        """
+        current = self.get_schema_version()
+        pending = [m for m in self.MIGRATIONS if m[0] > current]
+        result = {
+            "from_version": current,
+            "to_version": current,
+            "dry_run": dry_run,
+            "steps": []
+        }
+
+        if dry_run:
+            result["steps"] = [{"version": v, "description": d} for v, d, _ in pending]
+            return result
+
+        for version, description, method_name in pending:
+            start = time.perf_counter()
+            try:
+                with self.db.transaction() as conn:
+                    getattr(self, method_name)(conn.cursor())
+                    conn.execute(f"PRAGMA user_version = {int(version)}")
+            except Exception as e:
+                print(f"数据库迁移错误: 步骤{version}（{description}）失败: {e}")
+                result["error"] = str(e)
+                result["steps"].append({"version": version, "description": description, "error": str(e)})
+                break
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"数据库迁移: 步骤{version}（{description}）完成，耗时{elapsed_ms:.1f}ms")
+            result["to_version"] = version
+            result["steps"].append({"version": version, "description": description, "elapsed_ms": round(elapsed_ms, 2)})
 
+        if pending and "error" not in result:
+            print(f"数据库迁移完成，当前版本: {result['to_version']}")
+        return result
+
+    def _migration_1_create_tables(self, cursor):
+        """创建全部基础表和默认设置"""
         # Tasks table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS tasks (
@@ -190,260 +837,827 @@ class PPMS:
         )
         ''')
 
-        # Insert default settings if not exists
+        # Insert default settings if not exists（其余字段使用列默认值，兼容缺少新字段的旧表）
         cursor.execute('''
-        INSERT OR IGNORE INTO settings (id, theme, autostart, minimize_to_tray) VALUES (1, 'light', 0, 0)
+        INSERT OR IGNORE INTO settings (id, theme) VALUES (1, 'light')
         ''')
 
-        # 执行数据库迁移
-        self.migrate_database(cursor)
+    def _migration_2_legacy_columns(self, cursor):
+        """为旧版本数据库补齐后续新增的字段和表"""
+        # 检查tasks表是否有client和category字段
+        cursor.execute("PRAGMA table_info(tasks)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        # 如果没有client字段，添加它
+        if 'client' not in columns:
+            print("正在添加client字段到tasks表...")
+            cursor.execute("ALTER TABLE tasks ADD COLUMN client TEXT")
+        
+        # 如果没有category字段，添加它
+        if 'category' not in columns:
+            print("正在添加category字段到tasks表...")
+            cursor.execute("ALTER TABLE tasks ADD COLUMN category TEXT")
+            
+            # 使用description字段的值填充category字段
+            cursor.execute("UPDATE tasks SET category = description WHERE category IS NULL")
+        
+        # 如果没有quantity字段，添加它
+        if 'quantity' not in columns:
+            print("正在添加quantity字段到tasks表...")
+            cursor.execute("ALTER TABLE tasks ADD COLUMN quantity INTEGER DEFAULT 1")
+        
+        # 检查accounts表是否有account和row字段
+        cursor.execute("PRAGMA table_info(accounts)")
+        accounts_columns = [column[1] for column in cursor.fetchall()]
+        
+        # 如果没有account字段，添加它
+        if 'account' not in accounts_columns:
+            print("正在添加account字段到accounts表...")
+            cursor.execute("ALTER TABLE accounts ADD COLUMN account TEXT")
+        
+        # 如果没有row字段，添加它
+        if 'row' not in accounts_columns:
+            print("正在添加row字段到accounts表...")
+            cursor.execute("ALTER TABLE accounts ADD COLUMN row TEXT")
+        
+        # 检查projects表是否有task_id字段
+        cursor.execute("PRAGMA table_info(projects)")
+        project_columns = [column[1] for column in cursor.fetchall()]
+        
+        # 如果没有task_id字段，添加它
+        if 'task_id' not in project_columns:
+            print("正在添加task_id字段到projects表...")
+            cursor.execute("ALTER TABLE projects ADD COLUMN task_id INTEGER")
+        
+        # 检查settings表是否有window_width、window_height等字段
+        cursor.execute("PRAGMA table_info(settings)")
+        settings_columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'window_width' not in settings_columns:
+            print("正在添加window_width字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN window_width INTEGER DEFAULT 1260")
+            cursor.execute("UPDATE settings SET window_width = 1260 WHERE id = 1")
+        
+        if 'window_height' not in settings_columns:
+            print("正在添加window_height字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN window_height INTEGER DEFAULT 900")
+            cursor.execute("UPDATE settings SET window_height = 900 WHERE id = 1")
+        
+        if 'min_width' not in settings_columns:
+            print("正在添加min_width字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN min_width INTEGER DEFAULT 800")
+            cursor.execute("UPDATE settings SET min_width = 800 WHERE id = 1")
+        
+        if 'min_height' not in settings_columns:
+            print("正在添加min_height字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN min_height INTEGER DEFAULT 600")
+            cursor.execute("UPDATE settings SET min_height = 600 WHERE id = 1")
+        
+        # 检查是否有clients表和categories表
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='clients'")
+        has_clients_table = cursor.fetchone() is not None
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='categories'")
+        has_categories_table = cursor.fetchone() is not None
+        
+        if not has_clients_table:
+            print("创建客户列表表...")
+            cursor.execute('''
+            CREATE TABLE clients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                created_at TEXT
+            )
+            ''')
+        
+        if not has_categories_table:
+            print("创建项目类型表...")
+            cursor.execute('''
+            CREATE TABLE categories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                created_at TEXT
+            )
+            ''')
+        
+        # 新增：自动添加autostart和minimize_to_tray字段
+        if 'autostart' not in settings_columns:
+            print("正在添加autostart字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN autostart INTEGER DEFAULT 0")
+            cursor.execute("UPDATE settings SET autostart = 0 WHERE id = 1")
+        if 'minimize_to_tray' not in settings_columns:
+            print("正在添加minimize_to_tray字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN minimize_to_tray INTEGER DEFAULT 0")
+            cursor.execute("UPDATE settings SET minimize_to_tray = 0 WHERE id = 1")
+        
+        # 新增：自动添加userAvatar和username字段
+        if 'userAvatar' not in settings_columns:
+            print("正在添加userAvatar字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN userAvatar TEXT")
+        if 'username' not in settings_columns:
+            print("正在添加username字段到settings表...")
+            cursor.execute("ALTER TABLE settings ADD COLUMN username TEXT")
 
-        conn.commit()
-        conn.close()
+    def _migration_3_indexes(self, cursor):
+        """创建INDEXES中定义的二级索引"""
+        self.create_indexes(cursor)
+
+    def _migration_4_stats_tables(self, cursor):
+        """创建按日/按月的统计汇总表，由触发器随写入维护，并用现有数据初始化"""
+        for sql in self.STATS_SCHEMA:
+            cursor.execute(sql)
+        self._rebuild_stats_tables(cursor)
+
+    # 统计汇总表及触发器：
+    # task_daily_stats按任务创建日期汇总创建数和其中当前已完成的任务数；
+    # payment_monthly_stats按结算月份汇总金额和笔数。
+    # 状态比较用IS，状态为NULL的任务计为0而不是NULL（计数字段不允许NULL）
+    STATS_SCHEMA = [
+        '''
+        CREATE TABLE IF NOT EXISTS task_daily_stats (
+            day TEXT PRIMARY KEY,
+            created_count INTEGER NOT NULL DEFAULT 0,
+            completed_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS payment_monthly_stats (
+            month TEXT PRIMARY KEY,
+            total_amount REAL NOT NULL DEFAULT 0,
+            payment_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_stats_insert AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO task_daily_stats (day, created_count, completed_count)
+            SELECT date(NEW.created_at), 1, NEW.status IS 'completed'
+            WHERE date(NEW.created_at) IS NOT NULL
+            ON CONFLICT(day) DO UPDATE SET
+                created_count = created_count + 1,
+                completed_count = completed_count + excluded.completed_count;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_stats_update AFTER UPDATE OF status, created_at ON tasks
+        BEGIN
+            UPDATE task_daily_stats SET
+                created_count = created_count - 1,
+                completed_count = completed_count - (OLD.status IS 'completed')
+            WHERE day = date(OLD.created_at);
+            INSERT INTO task_daily_stats (day, created_count, completed_count)
+            SELECT date(NEW.created_at), 1, NEW.status IS 'completed'
+            WHERE date(NEW.created_at) IS NOT NULL
+            ON CONFLICT(day) DO UPDATE SET
+                created_count = created_count + 1,
+                completed_count = completed_count + excluded.completed_count;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_stats_delete AFTER DELETE ON tasks
+        BEGIN
+            UPDATE task_daily_stats SET
+                created_count = created_count - 1,
+                completed_count = completed_count - (OLD.status IS 'completed')
+            WHERE day = date(OLD.created_at);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_payments_stats_insert AFTER INSERT ON payments
+        BEGIN
+            INSERT INTO payment_monthly_stats (month, total_amount, payment_count)
+            SELECT strftime('%Y-%m', NEW.date), IFNULL(NEW.amount, 0), 1
+            WHERE strftime('%Y-%m', NEW.date) IS NOT NULL
+            ON CONFLICT(month) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                payment_count = payment_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_payments_stats_update AFTER UPDATE OF amount, date ON payments
+        BEGIN
+            UPDATE payment_monthly_stats SET
+                total_amount = total_amount - IFNULL(OLD.amount, 0),
+                payment_count = payment_count - 1
+            WHERE month = strftime('%Y-%m', OLD.date);
+            INSERT INTO payment_monthly_stats (month, total_amount, payment_count)
+            SELECT strftime('%Y-%m', NEW.date), IFNULL(NEW.amount, 0), 1
+            WHERE strftime('%Y-%m', NEW.date) IS NOT NULL
+            ON CONFLICT(month) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                payment_count = payment_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_payments_stats_delete AFTER DELETE ON payments
+        BEGIN
+            UPDATE payment_monthly_stats SET
+                total_amount = total_amount - IFNULL(OLD.amount, 0),
+                payment_count = payment_count - 1
+            WHERE month = strftime('%Y-%m', OLD.date);
+        END
+        ''',
+    ]
+
+    # 参与增量同步的表及返回给前端的字段（与对应get_*方法一致，另加row_version）
+    SYNC_TABLES = {
+        "tasks": ['id', 'title', 'description', 'deadline', 'status', 'priority', 'created_at',
+                  'updated_at', 'notes', 'client', 'category', 'quantity', 'row_version'],
+        "accounts": ['id', 'website_name', 'url', 'username', 'password', 'notes', 'tag',
+                     'account', 'row', 'created_at', 'row_version'],
+        "projects": ['id', 'name', 'type', 'quantity', 'completion_date', 'payment_status',
+                     'notes', 'archived', 'task_id', 'row_version'],
+        "payments": ['id', 'project_id', 'amount', 'date', 'notes', 'row_version'],
+        "websites": ['id', 'name', 'url', 'description', 'created_at', 'row_version'],
+    }
+
+    def _migration_5_sync_tracking(self, cursor):
+        """为同步表增加row_version字段，建立全局版本号、删除记录表及维护触发器
+
+        每次插入/更新都把全局版本号加一并写入该行的row_version，删除时写入删除记录。
+        已有数据统一标记为版本1。
+        """
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO sync_version (id, version) VALUES (1, 1)")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_tombstones (
+            version INTEGER NOT NULL,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            deleted_at TEXT
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_tombstones_version ON sync_tombstones (version)")
+
+        for table in self.SYNC_TABLES:
+            cursor.execute(f"PRAGMA table_info({table})")
+            if 'row_version' not in [column[1] for column in cursor.fetchall()]:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN row_version INTEGER")
+            cursor.execute(f"UPDATE {table} SET row_version = 1 WHERE row_version IS NULL")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_row_version ON {table} (row_version)")
+
+            bump = f'''
+                UPDATE sync_version SET version = version + 1 WHERE id = 1;
+                UPDATE {table} SET row_version = (SELECT version FROM sync_version WHERE id = 1)
+                WHERE id = NEW.id;
+            '''
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_insert AFTER INSERT ON {table}
+            BEGIN {bump} END
+            ''')
+            # 触发器自身更新row_version时不再重复计数
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_update AFTER UPDATE ON {table}
+            WHEN NEW.row_version IS OLD.row_version
+            BEGIN {bump} END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE sync_version SET version = version + 1 WHERE id = 1;
+                INSERT INTO sync_tombstones (version, table_name, row_id, deleted_at)
+                VALUES ((SELECT version FROM sync_version WHERE id = 1), '{table}', OLD.id,
+                        datetime('now', 'localtime'));
+            END
+            ''')
+
+    def _migration_6_unique_project_task(self, cursor):
+        """将projects.task_id索引改为唯一索引，保证每个任务最多转换为一个项目
 
-    def migrate_database(self, cursor):
-        """执行数据库迁移，添加新字段到现有表"""
+        早期前端重复转换产生的多余项目保留，只解除其与任务的关联（保留id最小的一条）。
+        """
+        cursor.execute('''
+        UPDATE projects SET task_id = NULL
+        WHERE task_id IS NOT NULL
+          AND id NOT IN (SELECT MIN(id) FROM projects WHERE task_id IS NOT NULL GROUP BY task_id)
+        ''')
+        if cursor.rowcount:
+            print(f"已解除{cursor.rowcount}个重复项目与任务的关联")
+        cursor.execute("DROP INDEX IF EXISTS idx_projects_task")
+        cursor.execute("CREATE UNIQUE INDEX idx_projects_task ON projects (task_id)")
+
+    def _migration_7_search_index(self, cursor):
+        """为SEARCH_SCOPES建立FTS5外部内容索引（trigram分词，支持中文子串匹配）及同步触发器
+
+        SQLite不支持FTS5或trigram分词（低于3.34）时跳过，search退化为LIKE扫描。
+        """
         try:
-            # 检查tasks表是否有client和category字段
-            cursor.execute("PRAGMA table_info(tasks)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            # 如果没有client字段，添加它
-            if 'client' not in columns:
-                print("正在添加client字段到tasks表...")
-                cursor.execute("ALTER TABLE tasks ADD COLUMN client TEXT")
-            
-            # 如果没有category字段，添加它
-            if 'category' not in columns:
-                print("正在添加category字段到tasks表...")
-                cursor.execute("ALTER TABLE tasks ADD COLUMN category TEXT")
-                
-                # 使用description字段的值填充category字段
-                cursor.execute("UPDATE tasks SET category = description WHERE category IS NULL")
-            
-            # 如果没有quantity字段，添加它
-            if 'quantity' not in columns:
-                print("正在添加quantity字段到tasks表...")
-                cursor.execute("ALTER TABLE tasks ADD COLUMN quantity INTEGER DEFAULT 1")
-            
-            # 检查accounts表是否有account和row字段
-            cursor.execute("PRAGMA table_info(accounts)")
-            accounts_columns = [column[1] for column in cursor.fetchall()]
-            
-            # 如果没有account字段，添加它
-            if 'account' not in accounts_columns:
-                print("正在添加account字段到accounts表...")
-                cursor.execute("ALTER TABLE accounts ADD COLUMN account TEXT")
-            
-            # 如果没有row字段，添加它
-            if 'row' not in accounts_columns:
-                print("正在添加row字段到accounts表...")
-                cursor.execute("ALTER TABLE accounts ADD COLUMN row TEXT")
-            
-            # 检查projects表是否有task_id字段
-            cursor.execute("PRAGMA table_info(projects)")
-            project_columns = [column[1] for column in cursor.fetchall()]
-            
-            # 如果没有task_id字段，添加它
-            if 'task_id' not in project_columns:
-                print("正在添加task_id字段到projects表...")
-                cursor.execute("ALTER TABLE projects ADD COLUMN task_id INTEGER")
-            
-            # 检查settings表是否有window_width、window_height等字段
-            cursor.execute("PRAGMA table_info(settings)")
-            settings_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'window_width' not in settings_columns:
-                print("正在添加window_width字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN window_width INTEGER DEFAULT 1260")
-                cursor.execute("UPDATE settings SET window_width = 1260 WHERE id = 1")
-            
-            if 'window_height' not in settings_columns:
-                print("正在添加window_height字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN window_height INTEGER DEFAULT 900")
-                cursor.execute("UPDATE settings SET window_height = 900 WHERE id = 1")
-            
-            if 'min_width' not in settings_columns:
-                print("正在添加min_width字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN min_width INTEGER DEFAULT 800")
-                cursor.execute("UPDATE settings SET min_width = 800 WHERE id = 1")
-            
-            if 'min_height' not in settings_columns:
-                print("正在添加min_height字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN min_height INTEGER DEFAULT 600")
-                cursor.execute("UPDATE settings SET min_height = 600 WHERE id = 1")
-            
-            # 检查是否有clients表和categories表
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='clients'")
-            has_clients_table = cursor.fetchone() is not None
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='categories'")
-            has_categories_table = cursor.fetchone() is not None
-            
-            if not has_clients_table:
-                print("创建客户列表表...")
-                cursor.execute('''
-                CREATE TABLE clients (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    created_at TEXT
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.fts_probe")
+        except sqlite3.OperationalError as e:
+            print(f"当前SQLite不支持FTS5 trigram分词，搜索将使用LIKE扫描: {e}")
+            return
+
+        for spec in self.SEARCH_SCOPES.values():
+            table = spec["table"]
+            fts = f"{table}_fts"
+            columns = ', '.join(spec["columns"])
+            new_values = ', '.join(f"NEW.{c}" for c in spec["columns"])
+            old_values = ', '.join(f"OLD.{c}" for c in spec["columns"])
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {columns}, content='{table}', content_rowid='id', tokenize='trigram'
+            )
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.id, {new_values});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            END
+            ''')
+            # 只在被索引的字段变化时更新，row_version等字段的更新不触发
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE OF {columns} ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+                INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.id, {new_values});
+            END
+            ''')
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    # 规范化日期键：日期文本换算为自1970-01-01起的天数（INTEGER），无法解析时为NULL。
+    # 以VIRTUAL生成列存在，插入和更新时由SQLite自动计算，不占表空间，索引中保存计算结果
+    EPOCH_DAY_SQL = "CAST(julianday(date({column})) - 2440587.5 AS INTEGER)"
+    EPOCH = datetime(1970, 1, 1).date()
+    # 键字段 -> (表, 源字段, 索引字段)；索引带上status，按状态统计时只需读取索引。
+    # 日期键必须在前，以status开头的索引会抢走get_tasks按状态筛选的查询，导致临时排序
+    DATE_KEYS = {
+        "created_day": ("tasks", "created_at", "created_day, status"),
+        "updated_day": ("tasks", "updated_at", "updated_day, status"),
+        "completion_day": ("projects", "completion_date", "completion_day"),
+        "payment_day": ("payments", "date", "payment_day"),
+    }
+
+    def _migration_8_date_keys(self, cursor):
+        """为日期范围查询添加规范化日期键（生成列）及索引，已有数据无需回填即可使用
+
+        SQLite低于3.31不支持生成列时跳过，查询改用等价的换算表达式（无法利用索引）。
+        """
+        if sqlite3.sqlite_version_info < (3, 31, 0):
+            print(f"当前SQLite {sqlite3.sqlite_version}不支持生成列，日期范围查询将不使用索引")
+            return
+        for key, (table, source, indexed) in self.DATE_KEYS.items():
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {key} INTEGER GENERATED ALWAYS AS "
+                           f"({self.EPOCH_DAY_SQL.format(column=source)}) VIRTUAL")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key} ON {table} ({indexed})")
+
+    def _date_key(self, key):
+        """日期键的SQL表达式：生成列存在时为列名（可走索引），否则为等价的换算表达式"""
+        if self._date_keys_ready is None:
+            with self.db.connection() as conn:
+                # table_xinfo才会列出生成列
+                columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(tasks)")}
+            self._date_keys_ready = "created_day" in columns
+        if self._date_keys_ready:
+            return key
+        _, source, _ = self.DATE_KEYS[key]
+        return self.EPOCH_DAY_SQL.format(column=source)
+
+    @classmethod
+    def _epoch_day(cls, day):
+        return (day - cls.EPOCH).days
+
+    def _migration_9_task_stats_triggers(self, cursor):
+        """重建任务统计触发器：旧版本在任务状态为NULL时写入NULL计数，导致插入/更新失败"""
+        for name in ("trg_tasks_stats_insert", "trg_tasks_stats_update", "trg_tasks_stats_delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for sql in self.STATS_SCHEMA:
+            cursor.execute(sql)
+        self._rebuild_stats_tables(cursor)
+
+    def get_changes_since(self, version=0, tables=None):
+        """增量同步：返回版本号version之后新增/修改的行和被删除的id
+
+        客户端保存返回的version，下次以此调用即可只取变更部分。
+        version比数据库当前版本还新（例如数据库被替换）时返回reset=True，客户端应全量重新加载。
+        """
+        tables = [t for t in (tables or self.SYNC_TABLES) if t in self.SYNC_TABLES]
+        try:
+            since = int(version or 0)
+        except (TypeError, ValueError):
+            return {"error": "无效的版本号"}
+
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            # 先读取当前版本，只返回(since, current]区间内的变更；
+            # 之后发生的写入版本号更大，会在下一次同步中返回
+            cursor.execute("SELECT version FROM sync_version WHERE id = 1")
+            current = cursor.fetchone()[0]
+            if since > current:
+                return {"version": current, "reset": True, "tables": {}}
+
+            changes = {}
+            for table in tables:
+                columns = self.SYNC_TABLES[table]
+                cursor.execute(
+                    f"SELECT {', '.join(columns)} FROM {table} WHERE row_version > ? AND row_version <= ?",
+                    (since, current)
                 )
-                ''')
-            
-            if not has_categories_table:
-                print("创建项目类型表...")
-                cursor.execute('''
-                CREATE TABLE categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    created_at TEXT
+                upserted = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                cursor.execute(
+                    "SELECT row_id FROM sync_tombstones WHERE version > ? AND version <= ? AND table_name = ?",
+                    (since, current, table)
                 )
-                ''')
-            
-            # 新增：自动添加autostart和minimize_to_tray字段
-            if 'autostart' not in settings_columns:
-                print("正在添加autostart字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN autostart INTEGER DEFAULT 0")
-                cursor.execute("UPDATE settings SET autostart = 0 WHERE id = 1")
-            if 'minimize_to_tray' not in settings_columns:
-                print("正在添加minimize_to_tray字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN minimize_to_tray INTEGER DEFAULT 0")
-                cursor.execute("UPDATE settings SET minimize_to_tray = 0 WHERE id = 1")
-            
-            # 新增：自动添加userAvatar和username字段
-            if 'userAvatar' not in settings_columns:
-                print("正在添加userAvatar字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN userAvatar TEXT")
-            if 'username' not in settings_columns:
-                print("正在添加username字段到settings表...")
-                cursor.execute("ALTER TABLE settings ADD COLUMN username TEXT")
-            
-            # 打印settings表所有字段名
-            cursor.execute("PRAGMA table_info(settings)")
-            all_settings_columns = [column[1] for column in cursor.fetchall()]
-            print("settings表字段:", all_settings_columns)
-            
-            print("数据库迁移完成")
+                deleted = [row[0] for row in cursor.fetchall()]
+                if table == "accounts":
+                    # 与get_accounts保持一致，None值转换为空串
+                    for account_dict in upserted:
+                        for key in account_dict:
+                            if account_dict[key] is None:
+                                account_dict[key] = ''
+                changes[table] = {"upserted": upserted, "deleted": deleted}
+
+        return {"version": current, "reset": False, "tables": changes}
+
+    def rebuild_stats_tables(self):
+        """根据tasks/payments全表重新计算统计汇总表（数据被外部修改后使用）"""
+        with self.db.transaction() as conn:
+            self._rebuild_stats_tables(conn.cursor())
+        return {"success": True}
+
+    def _rebuild_stats_tables(self, cursor):
+        cursor.execute("DELETE FROM task_daily_stats")
+        cursor.execute('''
+        INSERT INTO task_daily_stats (day, created_count, completed_count)
+        SELECT date(created_at), COUNT(*), SUM(status IS 'completed')
+        FROM tasks
+        WHERE date(created_at) IS NOT NULL
+        GROUP BY date(created_at)
+        ''')
+        cursor.execute("DELETE FROM payment_monthly_stats")
+        cursor.execute('''
+        INSERT INTO payment_monthly_stats (month, total_amount, payment_count)
+        SELECT strftime('%Y-%m', date), SUM(IFNULL(amount, 0)), COUNT(*)
+        FROM payments
+        WHERE strftime('%Y-%m', date) IS NOT NULL
+        GROUP BY strftime('%Y-%m', date)
+        ''')
+
+    def create_indexes(self, cursor):
+        """创建INDEXES中定义的全部索引，并更新查询规划器统计信息"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing = {row[0] for row in cursor.fetchall()}
+        created = []
+        for name, sql in self.INDEXES:
+            if name not in existing:
+                print(f"正在创建索引{name}...")
+                cursor.execute(sql)
+                created.append(name)
+        if created:
+            cursor.execute("ANALYZE")
+        return created
+
+    # 查询计划检查用例：(方法名, 位置参数)，覆盖所有公开的查询方法
+    QUERY_PLAN_PROBES = [
+        ("get_tasks", ()),
+        ("get_tasks", ("pending",)),
+        ("get_tasks", (None, "high")),
+        ("get_tasks", ("pending", "high")),
+        ("get_tasks_page", (None, None, 20, ["2000-01-01", 1], True)),
+        ("get_tasks_page", ("pending", None, 20, ["2000-01-01", 1], True)),
+        ("get_task_progress", (1,)),
+        ("get_accounts", ()),
+        ("get_accounts", ("tag",)),
+        ("get_accounts_page", (None, 20, ["name", 1], True)),
+        ("get_accounts_page", ("tag", 20, ["name", 1], True)),
+        ("get_projects", (False,)),
+        ("get_projects", (True,)),
+        ("get_projects_page", (False, 20, ["2000-01-01", 1], True)),
+        ("get_payments", ()),
+        ("get_payments", (1,)),
+        ("get_payments_page", (None, 20, ["2000-01-01", 1], True)),
+        ("get_payments_page", (1, 20, ["2000-01-01", 1], True)),
+        ("add_payment", (0, 0, "2000-01-01")),
+        ("delete_payment", (0,)),
+        ("delete_project", (0,)),
+        ("delete_website", (0,)),
+    ]
+
+    def check_query_plans(self):
+        """用EXPLAIN QUERY PLAN检查每个查询方法实际执行的语句是否走索引
+
+        所有用例在同一个事务中执行并最终回滚，不会修改数据。用例执行前先插入
+        一个已结算项目，使add_payment/delete_project走到按project_id查询的分支。
+        返回每条语句的查询计划，ok为False表示存在全表扫描或临时排序。
+        """
+        class _Rollback(Exception):
+            pass
+
+        results = []
+        try:
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO projects (name, payment_status) VALUES ('__plan_probe__', 'paid')")
+                probe_project_id = cursor.lastrowid
+
+                for method_name, args in self.QUERY_PLAN_PROBES:
+                    if method_name in ("add_payment", "delete_project"):
+                        args = (probe_project_id,) + tuple(args[1:])
+                    statements = []
+                    conn.set_trace_callback(statements.append)
+                    try:
+                        getattr(self, method_name)(*args)
+                    finally:
+                        conn.set_trace_callback(None)
+
+                    for sql in statements:
+                        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+                        if head not in ("SELECT", "UPDATE", "DELETE"):
+                            continue
+                        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                        plan = [row[3] for row in cursor.fetchall()]
+                        full_scan = any(
+                            detail.startswith("SCAN ") and " USING " not in detail
+                            for detail in plan
+                        )
+                        temp_sort = any("USE TEMP B-TREE" in detail for detail in plan)
+                        results.append({
+                            "method": method_name,
+                            "sql": " ".join(sql.split()),
+                            "plan": plan,
+                            "uses_index": not full_scan,
+                            "temp_sort": temp_sort,
+                        })
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        return {
+            "ok": all(r["uses_index"] and not r["temp_sort"] for r in results),
+            "queries": results,
+        }
+
+    # === Change Notification APIs ===
+    CHANGE_PUSH_DELAY = 0.15   # 合并变更推送的时间窗口（秒）
+
+    def _on_commit(self, tables):
+        """写事务提交回调：递增数据版本并安排一次合并推送"""
+        with self._change_lock:
+            self._data_version += 1
+            for table in tables:
+                self._table_versions[table] = self._data_version
+            self._pending_changes.update(tables)
+            if self._change_timer is None and self.window:
+                self._change_timer = threading.Timer(self.CHANGE_PUSH_DELAY, self._push_changes)
+                self._change_timer.daemon = True
+                self._change_timer.start()
+
+    def _push_changes(self):
+        """把窗口期内累计的变更以一个事件推送给页面"""
+        with self._change_lock:
+            self._change_timer = None
+            if not self._pending_changes:
+                return
+            payload = json.dumps({
+                "version": self._data_version,
+                "tables": sorted(self._pending_changes)
+            })
+            self._pending_changes.clear()
+        try:
+            self.window.evaluate_js(f"window.onDataChanged && window.onDataChanged({payload})")
         except Exception as e:
-            print(f"数据库迁移错误: {e}")
-            
+            print(f"推送数据变更失败: {e}")
+
+    def get_data_version(self):
+        """当前数据版本及各表最后一次变更时的版本"""
+        with self._change_lock:
+            return {"version": self._data_version, "tables": dict(self._table_versions)}
+
+    # === Lookup Cache ===
+    # 参照数据：名称 -> (查询语句, 字段)；缓存的是行元组，返回时再组装成新的字典
+    LOOKUP_QUERIES = {
+        'clients': ("SELECT id, name, created_at FROM clients ORDER BY name",
+                    ('id', 'name', 'created_at')),
+        'categories': ("SELECT id, name, created_at FROM categories ORDER BY name",
+                       ('id', 'name', 'created_at')),
+        'websites': ("SELECT id, name, url, description, created_at FROM websites ORDER BY name",
+                     ('id', 'name', 'url', 'description', 'created_at')),
+    }
+    # 每项缓存依赖的表，这些表的写事务提交后缓存失效
+    LOOKUP_DEPENDENCIES = {
+        'clients': {'clients'},
+        'categories': {'categories'},
+        'websites': {'websites'},
+        'client_names': {'clients', 'tasks', 'projects'},
+    }
+    # 与页面原先的提取规则一致：项目名称中的[客户]、备注中的"客户: xxx"
+    PROJECT_NAME_CLIENT = re.compile(r"\[(.*?)\]")
+    PROJECT_NOTES_CLIENT = re.compile(r"客户:\s*([^\n]+)")
+
+    def _invalidate_lookups(self, tables):
+        """提交回调：丢弃依赖被修改表的缓存，并递增参照数据版本"""
+        stale = [name for name, depends in self.LOOKUP_DEPENDENCIES.items() if depends & tables]
+        if not stale:
+            return
+        with self._lookup_lock:
+            self._lookup_version += 1
+            for name in stale:
+                self._lookup_cache.pop(name, None)
+
+    def _cached_lookup(self, name, load):
+        """返回缓存的参照数据，未命中时用load(cursor)查询并缓存"""
+        with self._lookup_lock:
+            rows = self._lookup_cache.get(name)
+            version = self._lookup_version
+        if rows is not None:
+            return rows
+
+        with self.db.connection() as conn:
+            rows = load(conn.cursor())
+        with self._lookup_lock:
+            # 查询期间有相关写入提交时不缓存，避免存入过期数据
+            if version == self._lookup_version:
+                self._lookup_cache[name] = rows
+        return rows
+
+    def _lookup_rows(self, name):
+        """按LOOKUP_QUERIES查询参照表，返回新组装的字典列表"""
+        sql, columns = self.LOOKUP_QUERIES[name]
+
+        def load(cursor):
+            cursor.execute(sql)
+            return tuple(cursor.fetchall())
+
+        return [dict(zip(columns, row)) for row in self._cached_lookup(name, load)]
+
+    def _load_client_names(self, cursor):
+        """汇总客户表、任务的client字段以及项目名称/备注中出现的客户名称"""
+        names = set()
+        cursor.execute("SELECT name FROM clients")
+        names.update(row[0] for row in cursor.fetchall())
+        cursor.execute("SELECT DISTINCT client FROM tasks WHERE client IS NOT NULL AND client != ''")
+        names.update(row[0] for row in cursor.fetchall())
+        cursor.execute("SELECT name, notes FROM projects WHERE name LIKE '%[%]%' OR notes LIKE '%客户:%'")
+        for project_name, notes in cursor.fetchall():
+            match = self.PROJECT_NAME_CLIENT.search(project_name or '')
+            if match and match.group(1):
+                names.add(match.group(1))
+            match = self.PROJECT_NOTES_CLIENT.search(notes or '')
+            if match and match.group(1).strip():
+                names.add(match.group(1).strip())
+        return tuple(sorted(names))
+
+    def get_client_names(self):
+        """获取去重排序后的全部客户名称，供下拉框使用"""
+        return list(self._cached_lookup('client_names', self._load_client_names))
+
+    def get_lookups(self, version=None):
+        """一次获取全部参照数据及其版本；传入的版本与当前一致时只返回版本号"""
+        with self._lookup_lock:
+            current = self._lookup_version
+        if version is not None and version == current:
+            return {"version": current, "unchanged": True}
+        return {
+            "version": current,
+            "unchanged": False,
+            "clients": self.get_clients(),
+            "categories": self.get_categories(),
+            "websites": self.get_websites(),
+            "client_names": self.get_client_names(),
+        }
+
     # === Client Management APIs ===
     def get_clients(self):
         """获取所有客户列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, created_at FROM clients ORDER BY name")
-        clients = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'name', 'created_at']
-        return [dict(zip(columns, client)) for client in clients]
+        return self._lookup_rows('clients')
     
     def add_client(self, name):
         """添加新客户"""
         if not name or not name.strip():
             return {"error": "客户名称不能为空"}
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            cursor.execute("INSERT INTO clients (name, created_at) VALUES (?, ?)", (name.strip(), now))
-            client_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO clients (name, created_at) VALUES (?, ?)", (name.strip(), now))
+                client_id = cursor.lastrowid
             return {"id": client_id, "name": name.strip(), "created_at": now}
         except sqlite3.IntegrityError:
-            conn.close()
             return {"error": "客户名称已存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
     
     def delete_client(self, client_id):
         """删除客户"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+                affected_rows = cursor.rowcount
             
             if affected_rows > 0:
                 return {"success": True}
             else:
                 return {"error": "客户不存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
     
     # === Category Management APIs ===
     def get_categories(self):
         """获取所有项目类型列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, created_at FROM categories ORDER BY name")
-        categories = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'name', 'created_at']
-        return [dict(zip(columns, category)) for category in categories]
+        return self._lookup_rows('categories')
     
     def add_category(self, name):
         """添加新项目类型"""
         if not name or not name.strip():
             return {"error": "项目类型名称不能为空"}
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            cursor.execute("INSERT INTO categories (name, created_at) VALUES (?, ?)", (name.strip(), now))
-            category_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO categories (name, created_at) VALUES (?, ?)", (name.strip(), now))
+                category_id = cursor.lastrowid
             return {"id": category_id, "name": name.strip(), "created_at": now}
         except sqlite3.IntegrityError:
-            conn.close()
             return {"error": "项目类型名称已存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
     
     def delete_category(self, category_id):
         """删除项目类型"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("DELETE FROM categories WHERE id = ?", (category_id,))
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+                affected_rows = cursor.rowcount
             
             if affected_rows > 0:
                 return {"success": True}
             else:
                 return {"error": "项目类型不存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
 
     # === Task Management APIs ===
-    def get_tasks(self, status=None, priority=None):
+    # === List Result Encoding ===
+    # 列表API的字段（与查询中的字段顺序一致）
+    TASK_COLUMNS = ('id', 'title', 'description', 'deadline', 'status',
+                    'priority', 'created_at', 'updated_at', 'notes', 'client', 'category', 'quantity')
+    ACCOUNT_COLUMNS = ('id', 'website_name', 'url', 'username', 'password', 'notes', 'tag', 'account', 'row', 'created_at')
+    PROJECT_COLUMNS = ('id', 'name', 'type', 'quantity', 'completion_date', 'payment_status', 'notes', 'archived', 'task_id')
+    PAYMENT_COLUMNS = ('id', 'project_id', 'amount', 'date', 'notes')
+    # records：字典列表（默认）；columnar：{"columns": [...], "rows": [[...], ...]}，
+    # 字段名只传一次、每行不再创建字典，大表时桥接数据量和内存分配都明显减少；
+    # json：由SQLite直接生成与records结构相同的JSON文本，Python端不创建任何行对象，
+    # 页面收到的是字符串，需自行JSON.parse（SQLite不支持JSON函数时自动退回records）
+    LIST_FORMATS = ('records', 'columnar', 'json')
+
+    def _list_result(self, columns, rows, format=None):
+        """按请求的格式组装列表API的返回值"""
+        if format == 'columnar':
+            return {"columns": list(columns), "rows": rows}
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _fetch_list(self, query, params, columns, format=None):
+        """执行列表查询并按格式返回；query的结果列须与columns一一对应（带别名）"""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            if format == 'json' and self._json_functions_ready(cursor):
+                # 聚合按子查询的输出顺序进行，保持ORDER BY的排序
+                fields = ", ".join(f"'{column}', {column}" for column in columns)
+                cursor.execute(f"SELECT json_group_array(json_object({fields})) FROM ({query})", params)
+                return cursor.fetchone()[0]
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        return self._list_result(columns, rows, format)
+
+    def _json_functions_ready(self, cursor):
+        """检测SQLite是否内置JSON函数（3.38起默认内置，更早的版本取决于编译选项）"""
+        if self._sqlite_json_ready is None:
+            try:
+                cursor.execute("SELECT json_group_array(json_object('a', 1))").fetchone()
+                self._sqlite_json_ready = True
+            except sqlite3.OperationalError as e:
+                print(f"SQLite不支持JSON函数，json格式将退回为字典列表: {e}")
+                self._sqlite_json_ready = False
+        return self._sqlite_json_ready
+
+    def _check_list_format(self, format):
+        if format is not None and format not in self.LIST_FORMATS:
+            return {"error": f"不支持的返回格式: {format}"}
+        return None
+
+    def get_tasks(self, status=None, priority=None, format=None):
         """Get tasks with optional filters."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM tasks"
+        error = self._check_list_format(format)
+        if error:
+            return error
+        query = f"SELECT {', '.join(self.TASK_COLUMNS)} FROM tasks"
         params = []
         
         if status and priority:
@@ -456,35 +1670,24 @@ class PPMS:
             query += " WHERE priority = ?"
             params = [priority]
             
-        query += " ORDER BY deadline ASC"
-        
-        cursor.execute(query, params)
-        tasks = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'title', 'description', 'deadline', 'status', 
-                  'priority', 'created_at', 'updated_at', 'notes', 'client', 'category', 'quantity']
+        query += " ORDER BY IFNULL(deadline, '') ASC, id ASC"
         
-        return [dict(zip(columns, task)) for task in tasks]
+        return self._fetch_list(query, params, self.TASK_COLUMNS, format)
 
     def add_task(self, title, description=None, deadline=None, priority="medium", notes=None, client=None, quantity=1):
         """Add a new task."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # 使用description字段作为category字段
         category = description
         
-        cursor.execute('''
-        INSERT INTO tasks (title, description, deadline, status, priority, created_at, updated_at, notes, client, category, quantity)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (title, None, deadline, 'pending', priority, now, now, notes, client, category, quantity))
-        
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO tasks (title, description, deadline, status, priority, created_at, updated_at, notes, client, category, quantity)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (title, None, deadline, 'pending', priority, now, now, notes, client, category, quantity))
+            task_id = cursor.lastrowid
         
         return task_id
 
@@ -501,107 +1704,60 @@ class PPMS:
         set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
         params = list(updates.values()) + [task_id]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", params)
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", params)
         
         return True
         
     def add_task_progress(self, task_id, progress_text):
         """Add progress update to a task."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        cursor.execute('''
-        INSERT INTO task_progress (task_id, progress_text, timestamp)
-        VALUES (?, ?, ?)
-        ''', (task_id, progress_text, now))
-        
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute('''
+            INSERT INTO task_progress (task_id, progress_text, timestamp)
+            VALUES (?, ?, ?)
+            ''', (task_id, progress_text, now))
         
         return True
         
     def get_task_progress(self, task_id):
         """Get progress updates for a task."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM task_progress WHERE task_id = ? ORDER BY timestamp DESC
-        ''', (task_id,))
-        
-        progress = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            SELECT * FROM task_progress WHERE task_id = ? ORDER BY timestamp DESC
+            ''', (task_id,))
+            progress = cursor.fetchall()
         
         columns = ['id', 'task_id', 'progress_text', 'timestamp']
         return [dict(zip(columns, p)) for p in progress]
 
     # === Account Management APIs ===
-    def get_accounts(self, tag=None):
+    def get_accounts(self, tag=None, format=None):
         """Get accounts with optional tag filter."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 直接通过字段名获取数据，不依赖字段顺序
-        query = """
-        SELECT 
-            id,
-            website_name,
-            url,
-            username,
-            password,
-            notes,
-            tag,
-            account,
-            row,
-            created_at
-        FROM accounts
-        """
+        error = self._check_list_format(format)
+        if error:
+            return error
+        # 直接通过字段名获取数据，不依赖字段顺序；None值在查询中转换为空串，
+        # 确保页面上不会显示为"null"或"undefined"
+        query = "SELECT id, " + ", ".join(
+            f"IFNULL({column}, '') AS {column}" for column in self.ACCOUNT_COLUMNS[1:]) + " FROM accounts"
         params = []
         
         if tag:
             query += " WHERE tag = ?"
             params = [tag]
             
-        query += " ORDER BY website_name ASC"
-        
-        cursor.execute(query, params)
-        accounts = cursor.fetchall()
-        conn.close()
-        
-        # 列名与查询返回的字段顺序保持一致
-        columns = ['id', 'website_name', 'url', 'username', 'password', 'notes', 'tag', 'account', 'row', 'created_at']
-        result = []
+        # 按表字段排序（而不是同名的IFNULL别名），才能利用website_name索引
+        query += " ORDER BY accounts.website_name ASC, accounts.id ASC"
         
-        for account in accounts:
-            # 创建账号字典
-            account_dict = dict(zip(columns, account))
-            
-            # 清理数据，确保None值不会显示为"null"或"undefined"
-            for key in account_dict:
-                if account_dict[key] is None:
-                    account_dict[key] = ''
-                    
-            # 打印调试信息到服务器控制台
-            print(f"从数据库读取账号: {account_dict}")
-                    
-            result.append(account_dict)
-            
-        return result
+        return self._fetch_list(query, params, self.ACCOUNT_COLUMNS, format)
 
     def add_account(self, website_name, url=None, username=None, password=None, notes=None, tag=None, account=None, row=None):
         """Add a new account."""
         print(f"添加账号参数: website_name={website_name}, url={url}, username={username}, password={password}, notes={notes}, tag={tag}, account={account}, row={row}")
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # 确保row为None或有实际值
@@ -609,26 +1765,25 @@ class PPMS:
             row = None
             
         # 直接使用命名参数，避免位置参数的顺序混淆
-        cursor.execute('''
-        INSERT INTO accounts 
-        (website_name, url, username, password, notes, tag, account, row, created_at) 
-        VALUES 
-        (:website_name, :url, :username, :password, :notes, :tag, :account, :row, :created_at)
-        ''', {
-            'website_name': website_name,
-            'url': url,
-            'username': username,
-            'password': password,
-            'notes': notes,
-            'tag': tag, 
-            'account': account,
-            'row': row,
-            'created_at': now
-        })
-        
-        account_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO accounts 
+            (website_name, url, username, password, notes, tag, account, row, created_at) 
+            VALUES 
+            (:website_name, :url, :username, :password, :notes, :tag, :account, :row, :created_at)
+            ''', {
+                'website_name': website_name,
+                'url': url,
+                'username': username,
+                'password': password,
+                'notes': notes,
+                'tag': tag, 
+                'account': account,
+                'row': row,
+                'created_at': now
+            })
+            account_id = cursor.lastrowid
         
         # 返回完整的账号对象以便检查数据
         return {
@@ -669,17 +1824,12 @@ class PPMS:
         params = dict(updates)
         params['account_id'] = account_id
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 使用命名参数执行更新
-        cursor.execute(f"UPDATE accounts SET {set_sql} WHERE id = :account_id", params)
-        
-        # 检查是否成功更新
-        rows_affected = cursor.rowcount
-        
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            # 使用命名参数执行更新
+            cursor.execute(f"UPDATE accounts SET {set_sql} WHERE id = :account_id", params)
+            # 检查是否成功更新
+            rows_affected = cursor.rowcount
         
         # 返回详细结果
         return {
@@ -690,86 +1840,107 @@ class PPMS:
     
     def delete_account(self, account_id):
         """Delete an account."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
         
         return True
         
     # === Project Management APIs ===
-    def get_projects(self, archived=False):
+    def get_projects(self, archived=False, format=None):
         """Get projects with archive filter."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM projects WHERE archived = ? ORDER BY completion_date DESC
-        ''', (1 if archived else 0,))
-        
-        projects = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'name', 'type', 'quantity', 'completion_date', 'payment_status', 'notes', 'archived', 'task_id']
-        return [dict(zip(columns, project)) for project in projects]
+        error = self._check_list_format(format)
+        if error:
+            return error
+        query = f'''
+            SELECT {', '.join(self.PROJECT_COLUMNS)} FROM projects
+            WHERE archived = ? ORDER BY IFNULL(completion_date, '') DESC, id DESC
+            '''
+        return self._fetch_list(query, (1 if archived else 0,), self.PROJECT_COLUMNS, format)
 
     def delete_project(self, project_id):
         """删除项目，如果已结算则返回错误"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # 首先检查项目是否存在
-            cursor.execute("SELECT payment_status FROM projects WHERE id = ?", (project_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                conn.close()
-                return {"success": False, "error": "项目不存在"}
-            
-            payment_status = result[0]
-            
-            # 检查项目是否已结算
-            if payment_status == 'paid':
-                # 检查是否有关联的支付记录
-                cursor.execute("SELECT id FROM payments WHERE project_id = ?", (project_id,))
-                payment_records = cursor.fetchall()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                if payment_records:
-                    conn.close()
-                    return {"success": False, "error": "项目已结算，请先删除关联的结算记录", "payment_ids": [p[0] for p in payment_records]}
-            
-            # 删除项目
-            cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-            
-            conn.commit()
-            conn.close()
+                # 首先检查项目是否存在
+                cursor.execute("SELECT payment_status FROM projects WHERE id = ?", (project_id,))
+                result = cursor.fetchone()
+                
+                if not result:
+                    return {"success": False, "error": "项目不存在"}
+                
+                payment_status = result[0]
+                
+                # 检查项目是否已结算
+                if payment_status == 'paid':
+                    # 检查是否有关联的支付记录
+                    cursor.execute("SELECT id FROM payments WHERE project_id = ?", (project_id,))
+                    payment_records = cursor.fetchall()
+                    
+                    if payment_records:
+                        return {"success": False, "error": "项目已结算，请先删除关联的结算记录", "payment_ids": [p[0] for p in payment_records]}
+                
+                # 删除项目
+                cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
             
             return {"success": True}
         
         except Exception as e:
-            conn.rollback()
-            conn.close()
             return {"success": False, "error": str(e)}
 
     def add_project(self, name, type=None, quantity=None, completion_date=None, payment_status="unpaid", notes=None, task_id=None):
         """Add a new project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO projects (name, type, quantity, completion_date, payment_status, notes, task_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (name, type, quantity, completion_date, payment_status, notes, task_id))
-        
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO projects (name, type, quantity, completion_date, payment_status, notes, task_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (name, type, quantity, completion_date, payment_status, notes, task_id))
+            project_id = cursor.lastrowid
         
         return project_id
         
+    def convert_completed_tasks_to_projects(self, task_ids=None):
+        """将已完成且尚未转换的任务批量转换为项目，返回新建项目的id列表
+
+        命名规则与原前端一致：有客户时项目名为"[客户] 标题"，类型取任务类别（为空时为"已完成任务"），
+        备注取任务备注，数量为空或0时记为1，完成日期为当天。
+        task_ids为空时转换全部已完成任务；依靠projects.task_id唯一索引保证重复调用不会重复创建。
+        """
+        params = [datetime.now().strftime("%Y-%m-%d")]
+        where = "status = 'completed'"
+        if task_ids:
+            where += f" AND id IN ({', '.join('?' * len(task_ids))})"
+            params.extend(task_ids)
+
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT IFNULL(MAX(id), 0) FROM projects")
+            last_id = cursor.fetchone()[0]
+            cursor.execute(f'''
+            INSERT INTO projects (name, type, quantity, completion_date, payment_status, notes, task_id)
+            SELECT CASE WHEN IFNULL(client, '') != '' THEN '[' || client || '] ' || title ELSE title END,
+                   IFNULL(NULLIF(category, ''), '已完成任务'),
+                   IFNULL(NULLIF(quantity, 0), 1),
+                   ?,
+                   'unpaid',
+                   IFNULL(notes, ''),
+                   id
+            FROM tasks
+            WHERE {where}
+              AND NOT EXISTS (SELECT 1 FROM projects WHERE projects.task_id = tasks.id)
+            ORDER BY id
+            ON CONFLICT (task_id) DO NOTHING
+            ''', params)
+            # 写事务内id自增且无并发写入，新插入的行即id大于插入前最大值的行
+            cursor.execute("SELECT id FROM projects WHERE id > ? ORDER BY id", (last_id,))
+            project_ids = [row[0] for row in cursor.fetchall()]
+
+        if project_ids:
+            print(f"已将{len(project_ids)}个已完成任务转换为项目")
+        return project_ids
+
     def update_project(self, project_id, updates_dict):
         """Update a project with provided fields."""
         valid_fields = ['name', 'type', 'quantity', 'completion_date', 'payment_status', 'notes', 'archived']
@@ -781,211 +1952,293 @@ class PPMS:
         set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
         params = list(updates.values()) + [project_id]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(f"UPDATE projects SET {set_clause} WHERE id = ?", params)
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute(f"UPDATE projects SET {set_clause} WHERE id = ?", params)
         
         return True
 
     # === Payment Management APIs ===
-    def get_payments(self, project_id=None):
+    def get_payments(self, project_id=None, format=None):
         """Get payments with optional project filter."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM payments"
+        error = self._check_list_format(format)
+        if error:
+            return error
+        query = f"SELECT {', '.join(self.PAYMENT_COLUMNS)} FROM payments"
         params = []
         
         if project_id:
             query += " WHERE project_id = ?"
             params = [project_id]
             
-        query += " ORDER BY date DESC"
+        query += " ORDER BY IFNULL(date, '') DESC, id DESC"
         
-        cursor.execute(query, params)
-        payments = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'project_id', 'amount', 'date', 'notes']
-        return [dict(zip(columns, payment)) for payment in payments]
+        return self._fetch_list(query, params, self.PAYMENT_COLUMNS, format)
 
     def add_payment(self, project_id, amount, date=None, notes=None):
         """Add a new payment."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             if not date:
                 date = datetime.now().strftime("%Y-%m-%d")
             
-            # 检查项目是否存在
-            cursor.execute("SELECT id FROM projects WHERE id = ?", (project_id,))
-            project = cursor.fetchone()
-            if not project:
-                conn.close()
-                return {"error": "项目不存在"}
-            
-            # 检查该项目是否已经有结算记录
-            cursor.execute("SELECT id FROM payments WHERE project_id = ?", (project_id,))
-            existing_payment = cursor.fetchone()
-            if existing_payment:
-                conn.close()
-                return {"error": "该项目已有结算记录，不能重复结算"}
-            
-            cursor.execute('''
-            INSERT INTO payments (project_id, amount, date, notes)
-            VALUES (?, ?, ?, ?)
-            ''', (project_id, amount, date, notes))
-            
-            payment_id = cursor.lastrowid
-            
-            # Update project payment status
-            cursor.execute('''
-            UPDATE projects SET payment_status = 'paid' WHERE id = ?
-            ''', (project_id,))
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # 检查项目是否存在
+                cursor.execute("SELECT id FROM projects WHERE id = ?", (project_id,))
+                project = cursor.fetchone()
+                if not project:
+                    return {"error": "项目不存在"}
+                
+                # 检查该项目是否已经有结算记录
+                cursor.execute("SELECT id FROM payments WHERE project_id = ?", (project_id,))
+                existing_payment = cursor.fetchone()
+                if existing_payment:
+                    return {"error": "该项目已有结算记录，不能重复结算"}
+                
+                cursor.execute('''
+                INSERT INTO payments (project_id, amount, date, notes)
+                VALUES (?, ?, ?, ?)
+                ''', (project_id, amount, date, notes))
+                
+                payment_id = cursor.lastrowid
+                
+                # Update project payment status
+                cursor.execute('''
+                UPDATE projects SET payment_status = 'paid' WHERE id = ?
+                ''', (project_id,))
             
             print(f"成功添加结算记录: ID={payment_id}, 项目ID={project_id}, 金额={amount}")
             return payment_id
         except sqlite3.Error as e:
             print(f"数据库错误: {e}")
-            try:
-                if conn:
-                    conn.rollback()
-                    conn.close()
-            except:
-                pass
             return {"error": f"数据库错误: {str(e)}"}
         except Exception as e:
             print(f"添加结算记录时发生错误: {e}")
-            try:
-                if conn:
-                    conn.rollback()
-                    conn.close()
-            except:
-                pass
             return {"error": f"添加结算记录失败: {str(e)}"}
         
     def delete_payment(self, payment_id):
         """Delete a payment record and update related project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # 首先查找该结算关联的项目
-            cursor.execute("SELECT project_id FROM payments WHERE id = ?", (payment_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                conn.close()
-                return {"success": False, "error": "结算记录不存在"}
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
                 
-            project_id = result[0]
-            
-            # 删除结算记录
-            cursor.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
-            
-            # 检查该项目是否还有其他结算记录
-            cursor.execute("SELECT COUNT(*) FROM payments WHERE project_id = ?", (project_id,))
-            count = cursor.fetchone()[0]
-            
-            # 如果没有其他结算记录，将项目状态更新为未结算
-            if count == 0:
-                cursor.execute("UPDATE projects SET payment_status = 'unpaid' WHERE id = ?", (project_id,))
-            
-            conn.commit()
-            conn.close()
+                # 首先查找该结算关联的项目
+                cursor.execute("SELECT project_id FROM payments WHERE id = ?", (payment_id,))
+                result = cursor.fetchone()
+                
+                if not result:
+                    return {"success": False, "error": "结算记录不存在"}
+                    
+                project_id = result[0]
+                
+                # 删除结算记录
+                cursor.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
+                
+                # 检查该项目是否还有其他结算记录
+                cursor.execute("SELECT COUNT(*) FROM payments WHERE project_id = ?", (project_id,))
+                count = cursor.fetchone()[0]
+                
+                # 如果没有其他结算记录，将项目状态更新为未结算
+                if count == 0:
+                    cursor.execute("UPDATE projects SET payment_status = 'unpaid' WHERE id = ?", (project_id,))
             
             return {"success": True}
         
         except Exception as e:
-            conn.rollback()
-            conn.close()
             return {"success": False, "error": str(e)}
 
+    # === Paginated List APIs ===
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 500
+
+    def _keyset_page(self, table, columns, filters, sort_expr, descending, limit, after, with_total):
+        """按(排序键, id)做游标分页
+
+        filters为[(条件, 参数)]列表；after为上一页返回的next_cursor，即[排序键, id]。
+        可为空的排序列使用NULL替换为空串后的表达式，保证游标比较对NULL同样有效，
+        该表达式与INDEXES中的表达式索引一致。
+        """
+        try:
+            limit = int(limit) if limit else self.PAGE_SIZE_DEFAULT
+        except (TypeError, ValueError):
+            limit = self.PAGE_SIZE_DEFAULT
+        limit = max(1, min(limit, self.PAGE_SIZE_MAX))
+
+        where = [clause for clause, _ in filters]
+        params = [value for _, value in filters]
+        count_where = list(where)
+        count_params = list(params)
+
+        if after:
+            try:
+                after_key, after_id = after
+            except (TypeError, ValueError):
+                return {"error": "无效的分页游标"}
+            # 写成"键范围 + 同键比较id"的形式，使索引可以直接定位到游标位置
+            op = "<" if descending else ">"
+            where.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR id {op} ?)")
+            params += [after_key, after_key, after_id]
+
+        direction = "DESC" if descending else "ASC"
+        query = f"SELECT {', '.join(columns)}, {sort_expr} AS sort_key FROM {table}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        # 多取一行用于判断是否还有下一页
+        query += f" ORDER BY {sort_expr} {direction}, id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            total = None
+            if with_total:
+                count_query = f"SELECT COUNT(*) FROM {table}"
+                if count_where:
+                    count_query += " WHERE " + " AND ".join(count_where)
+                cursor.execute(count_query, count_params)
+                total = cursor.fetchone()[0]
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [dict(zip(columns, row[:-1])) for row in rows]
+        next_cursor = [rows[-1][-1], rows[-1][0]] if has_more else None
+
+        result = {"items": items, "next_cursor": next_cursor, "has_more": has_more}
+        if with_total:
+            result["total"] = total
+        return result
+
+    def get_tasks_page(self, status=None, priority=None, limit=None, after=None, with_total=False):
+        """分页获取任务，按截止日期、id升序"""
+        filters = []
+        if status:
+            filters.append(("status = ?", status))
+        if priority:
+            filters.append(("priority = ?", priority))
+        return self._keyset_page('tasks', self.TASK_COLUMNS, filters, "IFNULL(deadline, '')", False,
+                                 limit, after, with_total)
+
+    def get_accounts_page(self, tag=None, limit=None, after=None, with_total=False):
+        """分页获取账号，按网站类型、id升序"""
+        filters = [("tag = ?", tag)] if tag else []
+        page = self._keyset_page('accounts', self.ACCOUNT_COLUMNS, filters, "website_name", False,
+                                 limit, after, with_total)
+        # 与get_accounts保持一致，None值转换为空串
+        for account_dict in page.get("items", []):
+            for key in account_dict:
+                if account_dict[key] is None:
+                    account_dict[key] = ''
+        return page
+
+    def get_projects_page(self, archived=False, limit=None, after=None, with_total=False):
+        """分页获取项目，按完成日期、id降序"""
+        filters = [("archived = ?", 1 if archived else 0)]
+        return self._keyset_page('projects', self.PROJECT_COLUMNS, filters, "IFNULL(completion_date, '')", True,
+                                 limit, after, with_total)
+
+    def get_payments_page(self, project_id=None, limit=None, after=None, with_total=False):
+        """分页获取结算记录，按结算日期、id降序"""
+        filters = [("project_id = ?", project_id)] if project_id else []
+        return self._keyset_page('payments', self.PAYMENT_COLUMNS, filters, "IFNULL(date, '')", True,
+                                 limit, after, with_total)
+
     # === Settings APIs ===
-    def get_settings(self):
-        """Get application settings."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    # settings表缺失或字段为空时使用的默认值
+    DEFAULT_SETTINGS = {
+        'id': 1, 'theme': 'light', 'window_width': 1260, 'window_height': 900, 'min_width': 800,
+        'min_height': 600, 'autostart': 0, 'minimize_to_tray': 0, 'userAvatar': None, 'username': None,
+    }
+
+    def settings_snapshot(self):
+        """返回缓存的只读设置快照，首次调用时从数据库加载，之后不再访问数据库"""
+        snapshot = self._settings_cache
+        if snapshot is None:
+            with self._settings_lock:
+                version = self._settings_version
+            with self.db.connection() as conn:
+                snapshot = self._load_settings(conn.cursor())
+                # 在未提交的事务中读到的可能是尚未提交的值，不缓存
+                cacheable = not conn.in_transaction
+            with self._settings_lock:
+                # 读取期间有设置提交时不缓存，避免存入过期数据
+                if cacheable and version == self._settings_version:
+                    self._settings_cache = snapshot
+        return snapshot
+
+    def _invalidate_settings(self, tables):
+        """提交回调：settings表的修改提交后丢弃设置缓存，主题有变化时通知页面
+
+        写操作经由写线程组提交，回调在事务提交之后执行；页面调用放到单独的线程，
+        不占用写线程，也不让同组的其他写操作等待页面响应。
+        """
+        if 'settings' not in tables:
+            return
+        with self._settings_lock:
+            previous = self._settings_cache
+            self._settings_version += 1
+            self._settings_cache = None
+        if not self.window:
+            return
+        theme = self.settings_snapshot().get('theme')
+        if previous is None or previous.get('theme') != theme:
+            threading.Thread(target=self._apply_theme, args=(theme,), daemon=True).start()
+
+    def _apply_theme(self, theme):
+        """通过JavaScript立即应用新主题"""
         try:
-            cursor.execute("PRAGMA table_info(settings)")
-            columns_info = cursor.fetchall()
-            column_names = [col[1] for col in columns_info]
-            cursor.execute("SELECT * FROM settings WHERE id = 1")
-            settings_row = cursor.fetchone()
-            if settings_row:
-                settings_dict = {}
-                for i, col in enumerate(column_names):
-                    if i < len(settings_row):
-                        settings_dict[col] = settings_row[i]
+            js_code = f'''
+            (function() {{
+                console.log("[Python注入] theme=", {json.dumps(theme)});
+                document.body.setAttribute("data-theme", {json.dumps(theme)});
+                document.body.className = {json.dumps(theme)};
+                window.dispatchEvent(new Event("themeChanged"));
+            }})();
+            '''
+            self.window.evaluate_js(js_code)
+        except Exception as e:
+            print(f"应用主题时出错: {e}")
+
+    def _load_settings(self, cursor):
+        """从数据库读取设置，返回只读快照（字段名取自查询结果，无需PRAGMA）"""
+        cursor.execute("SELECT * FROM settings WHERE id = 1")
+        settings_row = cursor.fetchone()
+        settings_dict = dict(self.DEFAULT_SETTINGS)
+        if settings_row:
+            for column, value in zip((col[0] for col in cursor.description), settings_row):
                 # 默认值
-                if 'window_width' not in settings_dict or settings_dict['window_width'] is None:
-                    settings_dict['window_width'] = 1260
-                if 'window_height' not in settings_dict or settings_dict['window_height'] is None:
-                    settings_dict['window_height'] = 900
-                if 'min_width' not in settings_dict or settings_dict['min_width'] is None:
-                    settings_dict['min_width'] = 800
-                if 'min_height' not in settings_dict or settings_dict['min_height'] is None:
-                    settings_dict['min_height'] = 600
-                if 'autostart' not in settings_dict or settings_dict['autostart'] is None:
-                    settings_dict['autostart'] = 0
-                if 'minimize_to_tray' not in settings_dict or settings_dict['minimize_to_tray'] is None:
-                    settings_dict['minimize_to_tray'] = 0
-                # 新增：确保userAvatar和username字段存在
-                if 'userAvatar' not in settings_dict:
-                    settings_dict['userAvatar'] = None
-                if 'username' not in settings_dict:
-                    settings_dict['username'] = None
-                print("get_settings返回:", settings_dict)
-                conn.close()
-                return settings_dict
-            else:
-                conn.close()
-                return {'id': 1, 'theme': 'light', 'window_width': 1260, 'window_height': 900, 'min_width': 800, 'min_height': 600, 'autostart': 0, 'minimize_to_tray': 0, 'userAvatar': None, 'username': None}
+                if value is not None or column not in settings_dict:
+                    settings_dict[column] = value
+        return MappingProxyType(settings_dict)
+
+    def get_settings(self):
+        """Get application settings."""
+        try:
+            # 返回缓存快照的副本，调用方修改不会影响缓存
+            return dict(self.settings_snapshot())
         except Exception as e:
-            conn.close()
-            return {'id': 1, 'theme': 'light', 'window_width': 1260, 'window_height': 900, 'min_width': 800, 'min_height': 600, 'autostart': 0, 'minimize_to_tray': 0, 'userAvatar': None, 'username': None}
+            print(f"读取设置失败: {e}")
+            return dict(self.DEFAULT_SETTINGS)
         
     def update_settings(self, updates_dict):
         """更新应用程序设置"""
         valid_fields = ['password', 'theme', 'window_width', 'window_height', 'min_width', 'min_height', 'autostart', 'minimize_to_tray', 'userAvatar', 'username']
         updates = {k: v for k, v in updates_dict.items() if k in valid_fields}
-        print("update_settings收到:", updates)
+        # 只打印字段名，头像等字段可能是很长的base64
+        print("update_settings收到:", list(updates.keys()))
         if not updates:
             return {"error": "没有有效的更新字段"}
         set_clauses = []
         for field in updates.keys():
             set_clauses.append(f"{field} = :{field}")
         set_sql = ", ".join(set_clauses)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            cursor.execute(f"UPDATE settings SET {set_sql} WHERE id = 1", updates)
-            conn.commit()
-            rows_affected = cursor.rowcount
-            conn.close()
-            
-            # 如果主题被更新，立即应用新主题
-            if 'theme' in updates and self.window:
-                try:
-                    # 通过JavaScript应用新主题
-                    js_code = f'''
-                    (function() {{
-                        console.log("[Python注入] theme=", "{updates["theme"]}");
-                        document.body.setAttribute("data-theme", "{updates["theme"]}");
-                        document.body.className = "{updates["theme"]}";
-                        window.dispatchEvent(new Event("themeChanged"));
-                    }})();
-                    '''
-                    self.window.evaluate_js(js_code)
-                except Exception as e:
-                    print(f"应用主题时出错: {e}")
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"UPDATE settings SET {set_sql} WHERE id = 1", updates)
+                rows_affected = cursor.rowcount
+            # 主题的变化在提交后由_invalidate_settings推送给页面
             
             return {
                 "success": rows_affected > 0,
@@ -993,47 +2246,25 @@ class PPMS:
                 "updated_fields": list(updates.keys())
             }
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
             
     def get_window_property(self, property_name):
         """获取窗口属性"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT {property_name} FROM settings WHERE id = 1")
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                return result[0]
-            else:
-                return None
+            return self.settings_snapshot().get(property_name)
         except Exception as e:
             return None
             
     def get_window_size(self):
         """获取当前窗口大小设置"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT window_width, window_height FROM settings WHERE id = 1")
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                width, height = result
-                return {
-                    "width": width,
-                    "height": height,
-                    "size": f"{width}x{height}"
-                }
-            else:
-                return {
-                    "width": 1260,
-                    "height": 900,
-                    "size": "1260x900"
-                }
+            settings = self.settings_snapshot()
+            width, height = settings['window_width'], settings['window_height']
+            return {
+                "width": width,
+                "height": height,
+                "size": f"{width}x{height}"
+            }
         except Exception as e:
             return {
                 "width": 1260,
@@ -1068,32 +2299,40 @@ class PPMS:
             return {"error": str(e)}
         
     # === Data Export APIs ===
-    def export_data(self, data_type, format="excel"):
-        """Export data to Excel or CSV format."""
-        conn = sqlite3.connect(self.db_path)
-        
-        if data_type == "accounts":
-            # 账号数据导出
-            df = pd.read_sql_query("SELECT * FROM accounts", conn)
-            # 重命名列为中文
-            df = df.rename(columns={
-                'id': '编号',
-                'website_name': '网站类型',
-                'url': '网址',
-                'username': '用户名',
-                'account': '账号',
-                'row': '扩展行',
-                'password': '密码',
-                'tag': '项目类型',
-                'created_at': '创建时间',
-                'notes': '备注'
-            })
-            # 调整列顺序
-            columns_order = ['编号', '网站类型', '网址', '用户名', '账号', '扩展行', '密码', '项目类型', '创建时间', '备注']
-            df = df[columns_order]
-        elif data_type == "projects":
-            # 项目数据导出
-            query = """
+    # 导出定义：工作表名、中文表头及按表头顺序取数的查询，状态值在SQL中直接转换为中文
+    EXPORT_SPECS = {
+        "tasks": {
+            "sheet": "任务数据",
+            "headers": ['编号', '任务标题', '客户名称', '项目类型', '数量', '截止日期', '状态', '优先级', '创建时间', '更新时间', '备注'],
+            "query": """
+            SELECT
+                id,
+                title,
+                client,
+                category,
+                quantity,
+                deadline,
+                CASE status WHEN 'pending' THEN '待办' WHEN 'in-progress' THEN '进行中'
+                    WHEN 'completed' THEN '已完成' WHEN 'settled' THEN '已结算' ELSE status END as status,
+                CASE priority WHEN 'high' THEN '高' WHEN 'medium' THEN '中' WHEN 'low' THEN '低' ELSE priority END as priority,
+                created_at,
+                updated_at,
+                notes
+            FROM tasks
+            """
+        },
+        "accounts": {
+            "sheet": "账号数据",
+            "headers": ['编号', '网站类型', '网址', '用户名', '账号', '扩展行', '密码', '项目类型', '创建时间', '备注'],
+            "query": """
+            SELECT id, website_name, url, username, account, row, password, tag, created_at, notes
+            FROM accounts
+            """
+        },
+        "projects": {
+            "sheet": "项目数据",
+            "headers": ['编号', '项目名称', '客户名称', '项目描述', '项目类型', '数量', '完成日期', '结算状态', '备注', '已归档', '关联任务'],
+            "query": """
             SELECT 
                 id,
                 name,
@@ -1108,37 +2347,17 @@ class PPMS:
                 type,
                 quantity,
                 completion_date,
-                payment_status,
+                CASE payment_status WHEN 'paid' THEN '已结算' WHEN 'unpaid' THEN '未结算' END as payment_status,
                 notes,
-                archived,
+                CASE archived WHEN 1 THEN '是' WHEN 0 THEN '否' END as archived,
                 task_id
             FROM projects
             """
-            df = pd.read_sql_query(query, conn)
-            # 重命名列为中文
-            df = df.rename(columns={
-                'id': '编号',
-                'name': '项目名称',
-                'client_name': '客户名称',
-                'project_description': '项目描述',
-                'type': '项目类型',
-                'quantity': '数量',
-                'completion_date': '完成日期',
-                'payment_status': '结算状态',
-                'notes': '备注',
-                'archived': '已归档',
-                'task_id': '关联任务'
-            })
-            # 转换结算状态为中文
-            df['结算状态'] = df['结算状态'].map({'paid': '已结算', 'unpaid': '未结算'})
-            # 转换归档状态为中文
-            df['已归档'] = df['已归档'].map({0: '否', 1: '是'})
-            # 调整列顺序
-            columns_order = ['编号', '项目名称', '客户名称', '项目描述', '项目类型', '数量', '完成日期', '结算状态', '备注', '已归档', '关联任务']
-            df = df[columns_order]
-        elif data_type == "payments":
-            # 结算数据导出（优化版）
-            query = """
+        },
+        "payments": {
+            "sheet": "结算数据",
+            "headers": ['编号', '项目名称', '客户名称', '项目描述', '项目类型', '数量', '结算金额', '结算日期', '备注'],
+            "query": """
             SELECT 
                 p.id as payment_id,
                 pr.name as project_name,
@@ -1159,223 +2378,1190 @@ class PPMS:
             JOIN projects pr ON p.project_id = pr.id
             ORDER BY p.date DESC
             """
-            df = pd.read_sql_query(query, conn)
-            # 重命名列为中文
-            df = df.rename(columns={
-                'payment_id': '编号',
-                'project_name': '项目名称',
-                'client_name': '客户名称',
-                'project_description': '项目描述',
-                'project_type': '项目类型',
-                'quantity': '数量',
-                'amount': '结算金额',
-                'payment_date': '结算日期',
-                'notes': '备注'
-            })
-        else:
-            conn.close()
+        },
+    }
+    EXPORT_CHUNK_SIZE = 1000       # 每次从游标读取的行数
+    EXPORT_WIDTH_SAMPLE = 500      # 估算Excel列宽时采样的行数
+
+    EXPORT_MAX_WORKERS = 3         # 同时运行的后台导出任务数
+    EXPORT_JOBS_KEPT = 20          # 保留的已结束任务记录数
+    EXPORT_PUSH_INTERVAL = 0.25    # 向页面推送进度的最小间隔（秒）
+
+    def export_data(self, data_type, format="excel"):
+        """Export data to Excel or CSV format."""
+        error = self._check_export_args(data_type, format)
+        if error:
+            return error
+        try:
+            return self._run_export(data_type, format)
+        except ImportError as e:
+            return {"error": f"导出组件加载失败: {e}"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _check_export_args(self, data_type, format):
+        if data_type not in self.EXPORT_SPECS:
             return {"error": "无效的数据类型"}
-            
-        conn.close()
+        if format not in ("excel", "csv"):
+            return {"error": "无效的格式"}
+        return None
+
+    def _run_export(self, data_type, format, on_progress=None, cancel_event=None):
+        """执行一次导出，返回结果字典；取消或失败时删除未写完的文件"""
+        spec = self.EXPORT_SPECS[data_type]
         
         # 创建导出目录 - 使用data文件夹而不是exports文件夹
         export_dir = os.path.join(os.path.dirname(self.db_path), "data")
         os.makedirs(export_dir, exist_ok=True)
         
-        # 生成文件名
+        # 生成文件名，同一秒内的并发导出追加序号避免覆盖
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = f"{data_type}_{timestamp}"
+        extension = "xlsx" if format == "excel" else "csv"
+        file_path = os.path.join(export_dir, f"{data_type}_{timestamp}.{extension}")
+        suffix = 1
+        while os.path.exists(file_path):
+            file_path = os.path.join(export_dir, f"{data_type}_{timestamp}_{suffix}.{extension}")
+            suffix += 1
         
         try:
-            if format == "excel":
-                file_path = os.path.join(export_dir, f"{file_name}.xlsx")
-                # 创建ExcelWriter对象
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    sheet_name = {
-                        "accounts": "账号数据",
-                        "projects": "项目数据",
-                        "payments": "结算数据"
-                    }.get(data_type, data_type.capitalize())
-                    
-                    df.to_excel(writer, index=False, sheet_name=sheet_name)
-                    # 自动调整列宽
-                    worksheet = writer.sheets[sheet_name]
-                    for idx, col in enumerate(df.columns):
-                        # 计算最大宽度，考虑中文字符
-                        max_len = 0
-                        for value in df[col].astype(str):
-                            # 计算字符串宽度，中文字符计为2
-                            char_width = sum(2 if ord(c) > 127 else 1 for c in value)
-                            max_len = max(max_len, char_width)
-                        # 列名的宽度
-                        col_width = sum(2 if ord(c) > 127 else 1 for c in str(col))
-                        # 取最大值并增加一点空间
-                        max_len = max(max_len, col_width) + 2
-                        # 限制最大宽度
-                        max_len = min(max_len, 50)
-                        worksheet.column_dimensions[chr(65 + idx)].width = max_len
-                
-                # 获取相对路径，用于显示
-                try:
-                    # 获取应用根目录
-                    app_dir = os.path.dirname(self.db_path)
-                    # 计算相对路径
-                    rel_path = os.path.relpath(file_path, app_dir)
-                    # 如果是在data文件夹下，简化显示
-                    if rel_path.startswith('data\\'):
-                        display_path = rel_path
-                    else:
-                        display_path = file_path
-                except:
-                    display_path = file_path
-                
-                return {"success": True, "file_path": file_path, "display_path": display_path}
-            elif format == "csv":
-                file_path = os.path.join(export_dir, f"{file_name}.csv")
-                df.to_csv(file_path, index=False, encoding='utf-8-sig')  # 使用带BOM的UTF-8编码以支持中文
-                
-                # 获取相对路径，用于显示
-                try:
-                    # 获取应用根目录
-                    app_dir = os.path.dirname(self.db_path)
-                    # 计算相对路径
-                    rel_path = os.path.relpath(file_path, app_dir)
-                    # 如果是在data文件夹下，简化显示
-                    if rel_path.startswith('data\\'):
-                        display_path = rel_path
-                    else:
-                        display_path = file_path
-                except:
-                    display_path = file_path
-                
-                return {"success": True, "file_path": file_path, "display_path": display_path}
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                if on_progress:
+                    cursor.execute(f"SELECT COUNT(*) FROM ({spec['query']})")
+                    on_progress(0, cursor.fetchone()[0])
+                cursor.execute(spec["query"])
+                rows = self._iter_export_rows(cursor, on_progress, cancel_event)
+                if format == "excel":
+                    self._write_xlsx(rows, file_path, spec["sheet"], spec["headers"])
+                else:
+                    self._write_csv(rows, file_path, spec["headers"])
+        except BaseException:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            raise
+        
+        return {"success": True, "file_path": file_path, "display_path": self._export_display_path(file_path)}
+
+    def _iter_export_rows(self, cursor, on_progress=None, cancel_event=None):
+        """分块读取游标，内存占用与总行数无关；每块之后汇报进度并检查取消"""
+        written = 0
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+            rows = cursor.fetchmany(self.EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            yield from rows
+            written += len(rows)
+            if on_progress:
+                on_progress(written, None)
+
+    def _write_csv(self, rows, file_path, headers):
+        """逐行写入CSV"""
+        # 使用带BOM的UTF-8编码以支持中文
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+    def _write_xlsx(self, rows, file_path, sheet_name, headers):
+        """用openpyxl只写模式流式写入xlsx，列宽按前若干行采样估算"""
+        openpyxl = get_openpyxl()
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        sample = list(itertools.islice(rows, self.EXPORT_WIDTH_SAMPLE))
+
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet(sheet_name)
+        # 只写模式下列宽必须在写入数据前设置
+        for idx, header in enumerate(headers):
+            max_len = self._display_width(header)
+            for row in sample:
+                if row[idx] is not None:
+                    max_len = max(max_len, self._display_width(str(row[idx])))
+            # 增加一点空间并限制最大宽度
+            worksheet.column_dimensions[get_column_letter(idx + 1)].width = min(max_len + 2, 50)
+
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(worksheet, value=header)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        worksheet.append(header_cells)
+        try:
+            for row in itertools.chain(sample, rows):
+                worksheet.append(row)
+        except BaseException:
+            # 中途取消或出错时先结束工作表写入，释放openpyxl的临时文件
+            try:
+                worksheet.close()
+            except Exception:
+                pass
+            raise
+        workbook.save(file_path)
+
+    @staticmethod
+    def _display_width(value):
+        """计算字符串显示宽度，中文字符计为2"""
+        return sum(2 if ord(c) > 127 else 1 for c in value)
+
+    def _export_display_path(self, file_path):
+        """获取相对路径，用于显示"""
+        try:
+            # 获取应用根目录
+            app_dir = os.path.dirname(self.db_path)
+            # 计算相对路径
+            rel_path = os.path.relpath(file_path, app_dir)
+            # 如果是在data文件夹下，简化显示
+            if rel_path.startswith('data\\'):
+                return rel_path
+            return file_path
+        except Exception:
+            return file_path
+
+    # === Background Export Jobs ===
+    def start_export(self, data_type, format="excel"):
+        """提交后台导出任务，立即返回任务id，进度通过onExportProgress推送或get_export_status查询"""
+        error = self._check_export_args(data_type, format)
+        if error:
+            return error
+        
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "kind": "export",
+            "data_type": data_type,
+            "format": format,
+            "status": "queued",
+            "rows_written": 0,
+            "total_rows": None,
+            "percent": 0,
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        job["_run"] = lambda on_progress, cancel_event: self._run_export(
+            data_type, format, on_progress, cancel_event)
+        return self._submit_job(job)
+
+    def _submit_job(self, job):
+        """把导出/导入任务提交到后台线程池，返回任务状态快照"""
+        with self._export_lock:
+            self._prune_export_jobs()
+            job["_cancel"] = threading.Event()
+            self._export_jobs[job["job_id"]] = job
+            if self._export_executor is None:
+                self._export_executor = ThreadPoolExecutor(
+                    max_workers=self.EXPORT_MAX_WORKERS, thread_name_prefix="ppms-export")
+            self._export_executor.submit(self._export_worker, job)
+        return self._export_snapshot(job)
+
+    def get_export_status(self, job_id=None):
+        """查询导出任务状态；不传job_id时返回全部任务"""
+        with self._export_lock:
+            if job_id is None:
+                return [self._export_snapshot(job) for job in self._export_jobs.values()]
+            job = self._export_jobs.get(job_id)
+            if job is None:
+                return {"error": "导出任务不存在"}
+            return self._export_snapshot(job)
+
+    def cancel_export(self, job_id):
+        """取消排队中或运行中的导出任务"""
+        with self._export_lock:
+            job = self._export_jobs.get(job_id)
+            if job is None:
+                return {"error": "导出任务不存在"}
+            if job["status"] not in ("queued", "running"):
+                return {"success": False, "status": job["status"]}
+            job["_cancel"].set()
+        return {"success": True}
+
+    def _export_worker(self, job):
+        """在线程池中执行导出任务"""
+        if job["_cancel"].is_set():
+            self._finish_export_job(job, "cancelled")
+            return
+        with self._export_lock:
+            job["status"] = "running"
+        self._push_export_status(job)
+        
+        last_push = [time.monotonic()]
+        
+        def on_progress(rows_written, total_rows):
+            with self._export_lock:
+                if total_rows is not None:
+                    job["total_rows"] = total_rows
+                job["rows_written"] = rows_written
+                total = job["total_rows"]
+                job["percent"] = round(rows_written * 100 / total, 1) if total else 0
+            now = time.monotonic()
+            if now - last_push[0] >= self.EXPORT_PUSH_INTERVAL:
+                last_push[0] = now
+                self._push_export_status(job)
+        
+        try:
+            result = job["_run"](on_progress, job["_cancel"])
+        except ExportCancelled:
+            self._finish_export_job(job, "cancelled")
+        except ImportError as e:
+            action = "导入" if job["kind"] == "import" else "导出"
+            self._finish_export_job(job, "failed", error=f"{action}组件加载失败: {e}")
+        except Exception as e:
+            print(f"导出任务{job['job_id']}失败: {e}")
+            self._finish_export_job(job, "failed", error=str(e))
+        else:
+            if isinstance(result, dict) and "error" in result:
+                self._finish_export_job(job, "failed", error=result["error"])
             else:
-                return {"error": "无效的格式"}
+                self._finish_export_job(job, "completed", result=result)
+
+    def _finish_export_job(self, job, status, result=None, error=None):
+        with self._export_lock:
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            if status == "completed":
+                job["percent"] = 100
+        self._push_export_status(job)
+
+    def _prune_export_jobs(self):
+        """只保留最近的已结束任务（调用方需持有_export_lock）"""
+        finished = [job_id for job_id, job in self._export_jobs.items()
+                    if job["status"] in ("completed", "failed", "cancelled")]
+        for job_id in finished[:max(0, len(finished) - self.EXPORT_JOBS_KEPT)]:
+            del self._export_jobs[job_id]
+
+    @staticmethod
+    def _export_snapshot(job):
+        """任务状态的可序列化副本（去掉内部字段）"""
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    def _push_export_status(self, job):
+        """通过evaluate_js把任务状态推送给页面"""
+        if not self.window:
+            return
+        with self._export_lock:
+            payload = json.dumps(self._export_snapshot(job), ensure_ascii=False)
+        try:
+            self.window.evaluate_js(f"window.onExportProgress && window.onExportProgress({payload})")
+        except Exception as e:
+            print(f"推送导出进度失败: {e}")
+
+    # === Import APIs ===
+    # 可导入的数据类型：columns与EXPORT_SPECS中的表头一一对应，None表示导出时的派生列，导入时忽略
+    IMPORT_SPECS = {
+        "tasks": {
+            "columns": ['id', 'title', 'client', 'category', 'quantity', 'deadline', 'status', 'priority',
+                        'created_at', 'updated_at', 'notes'],
+            "key": ['title', 'created_at'],
+            "required": ['title'],
+            "defaults": {"status": "pending", "priority": "medium", "quantity": 1},
+        },
+        "accounts": {
+            "columns": ['id', 'website_name', 'url', 'username', 'account', 'row', 'password', 'tag',
+                        'created_at', 'notes'],
+            "key": ['website_name', 'account'],
+            "required": ['website_name'],
+            "defaults": {},
+        },
+        "projects": {
+            "columns": ['id', 'name', None, None, 'type', 'quantity', 'completion_date', 'payment_status',
+                        'notes', 'archived', 'task_id'],
+            "key": ['name', 'completion_date'],
+            "required": ['name'],
+            "defaults": {"payment_status": "unpaid", "archived": 0},
+        },
+    }
+    # 导出时翻译成中文的取值，导入时翻译回来（原始英文取值同样接受）
+    IMPORT_VALUE_MAPS = {
+        "status": {'待办': 'pending', '进行中': 'in-progress', '已完成': 'completed', '已结算': 'settled'},
+        "priority": {'高': 'high', '中': 'medium', '低': 'low'},
+        "payment_status": {'已结算': 'paid', '未结算': 'unpaid'},
+        "archived": {'是': 1, '否': 0},
+    }
+    IMPORT_INT_COLUMNS = {'id', 'quantity', 'archived', 'task_id'}
+    IMPORT_DATE_COLUMNS = {'deadline', 'completion_date'}
+    IMPORT_DATETIME_COLUMNS = {'created_at', 'updated_at'}
+    IMPORT_CHUNK_SIZE = 1000       # 每个写事务插入/更新的行数
+    IMPORT_ERRORS_KEPT = 100       # 返回的无效行明细条数上限
+
+    def import_data(self, data_type, file_path, mode="upsert", key=None):
+        """从CSV/XLSX文件导入数据（同步执行）
+
+        mode: upsert按去重字段更新已有记录，skip跳过已有记录，insert全部新增。
+        key: 去重字段列表，默认使用IMPORT_SPECS中的配置；["id"]表示按编号还原。
+        """
+        error = self._check_import_args(data_type, file_path, mode, key)
+        if error:
+            return error
+        try:
+            return self._run_import(data_type, file_path, mode, key)
+        except ImportError as e:
+            return {"error": f"导入组件加载失败: {e}"}
         except Exception as e:
             return {"error": str(e)}
-            
+
+    def start_import(self, data_type, file_path, mode="upsert", key=None):
+        """提交后台导入任务，进度与导出任务一样通过onExportProgress推送，可用cancel_export取消
+
+        取消时已提交的分块保留，未处理的行不再导入。
+        """
+        error = self._check_import_args(data_type, file_path, mode, key)
+        if error:
+            return error
+
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "kind": "import",
+            "data_type": data_type,
+            "format": os.path.splitext(file_path)[1].lower().lstrip("."),
+            "status": "queued",
+            "rows_written": 0,
+            "total_rows": None,
+            "percent": 0,
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        job["_run"] = lambda on_progress, cancel_event: self._run_import(
+            data_type, file_path, mode, key, on_progress, cancel_event)
+        return self._submit_job(job)
+
+    def select_import_file(self):
+        """弹出文件选择对话框选择导入文件，取消选择时file_path为None"""
+        if not self.window:
+            return {"error": "窗口尚未就绪"}
+        try:
+            paths = self.window.create_file_dialog(
+                webview.OPEN_DIALOG, allow_multiple=False, file_types=('数据文件 (*.xlsx;*.csv)',))
+        except Exception as e:
+            return {"error": str(e)}
+        return {"file_path": paths[0] if paths else None}
+
+    def _check_import_args(self, data_type, file_path, mode, key):
+        if data_type not in self.IMPORT_SPECS:
+            return {"error": "无效的数据类型"}
+        if mode not in ("upsert", "skip", "insert"):
+            return {"error": "无效的导入模式"}
+        if not file_path or not os.path.isfile(file_path):
+            return {"error": "导入文件不存在"}
+        if os.path.splitext(file_path)[1].lower() not in (".xlsx", ".csv"):
+            return {"error": "仅支持xlsx和csv文件"}
+        if key is not None:
+            columns = self.IMPORT_SPECS[data_type]["columns"]
+            if not key or any(k is None or k not in columns for k in key) or ('id' in key and len(key) > 1):
+                return {"error": "无效的去重字段"}
+        return None
+
+    def _run_import(self, data_type, file_path, mode, key=None, on_progress=None, cancel_event=None):
+        """流式读取文件，校验后按块写入，返回导入统计"""
+        spec = self.IMPORT_SPECS[data_type]
+        headers = self.EXPORT_SPECS[data_type]["headers"]
+        header_columns = {h: c for h, c in zip(headers, spec["columns"]) if c}
+        column_headers = {c: h for h, c in header_columns.items()}
+        key = list(key or spec["key"])
+
+        rows, total, close = self._open_import_rows(file_path, self.EXPORT_SPECS[data_type]["sheet"])
+        try:
+            header = next(rows, None)
+            if header is None:
+                return {"error": "导入文件为空"}
+            positions = {}
+            for idx, title in enumerate(header):
+                column = header_columns.get(str(title).strip()) if title is not None else None
+                if column and column not in positions:
+                    positions[column] = idx
+            needed = spec["required"] + (key if mode != "insert" else [])
+            missing = [column_headers[c] for c in dict.fromkeys(needed) if c not in positions]
+            if missing:
+                return {"error": f"缺少必需的列: {', '.join(missing)}"}
+
+            result = {"success": True, "inserted": 0, "updated": 0, "skipped": 0,
+                      "duplicates": 0, "invalid": 0, "errors": []}
+            existing = self._load_import_keys(data_type, key) if mode != "insert" else {}
+            processed = 0
+            if on_progress:
+                on_progress(0, total)
+
+            chunk = []
+            for line, values in enumerate(rows, start=2):
+                if all(v is None or v == '' for v in values):
+                    continue
+                record, error = self._convert_import_row(values, positions, spec, column_headers)
+                if error:
+                    result["invalid"] += 1
+                    if len(result["errors"]) < self.IMPORT_ERRORS_KEPT:
+                        result["errors"].append({"line": line, "error": error})
+                else:
+                    chunk.append(record)
+                processed += 1
+                if len(chunk) >= self.IMPORT_CHUNK_SIZE:
+                    self._write_import_chunk(data_type, chunk, list(positions), key, mode, existing, result,
+                                             cancel_event)
+                    chunk = []
+                    if on_progress:
+                        on_progress(processed, None)
+            if chunk:
+                self._write_import_chunk(data_type, chunk, list(positions), key, mode, existing, result,
+                                         cancel_event)
+            if on_progress:
+                on_progress(processed, processed)
+        finally:
+            close()
+
+        result["total_rows"] = processed
+        print(f"导入{data_type}完成: 新增{result['inserted']}，更新{result['updated']}，"
+              f"跳过{result['skipped'] + result['duplicates']}，无效{result['invalid']}")
+        return result
+
+    def _open_import_rows(self, file_path, sheet_name):
+        """打开导入文件，返回(逐行迭代器, 估计的数据行数, 关闭函数)"""
+        if file_path.lower().endswith(".xlsx"):
+            openpyxl = get_openpyxl()
+            # 只读模式按需解析工作表，内存占用与行数无关
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            worksheet = workbook[sheet_name] if sheet_name in workbook.sheetnames else workbook.active
+            total = worksheet.max_row - 1 if worksheet.max_row else None
+            return worksheet.iter_rows(values_only=True), total, workbook.close
+
+        # 按行数估算进度（备注中的换行会使估计偏大，结束时修正为实际行数）
+        lines = 0
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                lines += block.count(b"\n")
+        f = open(file_path, "r", encoding=self._detect_csv_encoding(file_path), newline="")
+        return csv.reader(f), max(lines - 1, 0), f.close
+
+    @staticmethod
+    def _detect_csv_encoding(file_path):
+        """导出的CSV为带BOM的UTF-8；Excel另存的CSV在中文系统上通常是GBK"""
+        with open(file_path, "rb") as f:
+            sample = f.read(64 * 1024)
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            return "utf-8-sig"
+        except UnicodeDecodeError:
+            return "gbk"
+
+    def _convert_import_row(self, values, positions, spec, column_headers):
+        """把一行原始值转换为{列名: 值}，返回(record, 错误信息)"""
+        record = {}
+        for column, idx in positions.items():
+            value = values[idx] if idx < len(values) else None
+            try:
+                record[column] = self._import_value(column, value)
+            except ValueError:
+                return None, f"{column_headers[column]}格式无效: {value}"
+        for column in spec["required"]:
+            if record.get(column) is None:
+                return None, f"{column_headers[column]}不能为空"
+        return record, None
+
+    def _import_value(self, column, value):
+        """单元格取值转换为数据库取值，空串视为NULL；无法转换时抛出ValueError"""
+        if isinstance(value, str) and value.strip() == '':
+            return None
+        if value is None:
+            return None
+        if column in self.IMPORT_VALUE_MAPS:
+            mapping = self.IMPORT_VALUE_MAPS[column]
+            text = str(value).strip()
+            if text in mapping:
+                return mapping[text]
+            if column != "archived" and text not in mapping.values():
+                raise ValueError(text)
+        if column in self.IMPORT_INT_COLUMNS:
+            if isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError(value)
+                return int(value)
+            text = str(value).strip()
+            try:
+                return int(text)
+            except ValueError:
+                # CSV中由Excel保存的整数可能带有".0"
+                number = float(text)
+                if not number.is_integer():
+                    raise
+                return int(number)
+        if isinstance(value, datetime):
+            if column in self.IMPORT_DATE_COLUMNS:
+                return value.strftime("%Y-%m-%d")
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        if isinstance(value, float) and value.is_integer():
+            # Excel中的纯数字账号等读出为浮点数
+            return str(int(value))
+        if not isinstance(value, str):
+            return str(value)
+        return value
+
+    def _load_import_keys(self, data_type, key):
+        """读取已有记录的去重键 -> id"""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, {', '.join(key)} FROM {data_type}")
+            return {tuple(None if v == '' else v for v in row[1:]): row[0] for row in cursor.fetchall()}
+
+    def _write_import_chunk(self, data_type, records, columns, key, mode, existing, result, cancel_event=None):
+        """在一个写事务中批量插入/更新一块记录，并维护去重键映射"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        spec = self.IMPORT_SPECS[data_type]
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        inserts = {}
+        updates = {}
+        appended = []  # 不去重的新增（insert模式或去重键不完整）
+        for record in records:
+            if mode == "insert":
+                appended.append(record)
+                continue
+            record_key = tuple(record.get(c) for c in key)
+            if key == ['id'] and record_key == (None,):
+                appended.append(record)
+                continue
+            row_id = existing.get(record_key)
+            target = updates if row_id is not None else inserts
+            if record_key in target:
+                # 同一块内的重复行：upsert保留最后一行，skip保留第一行
+                result["duplicates"] += 1
+                if mode == "skip":
+                    continue
+            elif row_id is not None and mode == "skip":
+                result["skipped"] += 1
+                continue
+            target[record_key] = (row_id, record)
+
+        restore_ids = key == ['id']
+        insert_columns = [c for c in columns if c != 'id' or restore_ids]
+        insert_columns += [c for c in spec["defaults"] if c not in insert_columns]
+        for column in ('created_at', 'updated_at'):
+            if column in spec["columns"] and column not in insert_columns:
+                insert_columns.append(column)
+        update_columns = [c for c in columns if c != 'id' and c not in key]
+        if 'updated_at' in spec["columns"] and 'updated_at' not in update_columns:
+            update_columns.append('updated_at')
+
+        def insert_values(record):
+            values = []
+            for column in insert_columns:
+                value = record.get(column)
+                if value is None:
+                    value = now if column in ('created_at', 'updated_at') else spec["defaults"].get(column)
+                values.append(value)
+            return values
+
+        new_records = appended + [record for _, record in inserts.values()]
+        changed = [(row_id, record) for row_id, record in updates.values()]
+
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            if data_type == "projects":
+                self._resolve_import_task_links(cursor, new_records, changed)
+            if new_records:
+                cursor.execute(f"SELECT IFNULL(MAX(id), 0) FROM {data_type}")
+                last_id = cursor.fetchone()[0]
+                cursor.executemany(
+                    f"INSERT INTO {data_type} ({', '.join(insert_columns)}) "
+                    f"VALUES ({', '.join('?' * len(insert_columns))})",
+                    [insert_values(record) for record in new_records]
+                )
+            if changed and update_columns:
+                cursor.executemany(
+                    f"UPDATE {data_type} SET {', '.join(f'{c} = ?' for c in update_columns)} WHERE id = ?",
+                    [[(record.get(c) or now) if c == 'updated_at' else record.get(c)
+                      for c in update_columns] + [row_id] for row_id, record in changed]
+                )
+            if new_records and mode != "insert":
+                # 新插入的行登记到去重键映射中，后续块中的相同键会更新这些行
+                if restore_ids:
+                    for record in new_records:
+                        if record.get('id') is not None:
+                            existing[(record['id'],)] = record['id']
+                else:
+                    cursor.execute(f"SELECT id, {', '.join(key)} FROM {data_type} WHERE id > ?", (last_id,))
+                    for row in cursor.fetchall():
+                        existing[tuple(None if v == '' else v for v in row[1:])] = row[0]
+
+        result["inserted"] += len(new_records)
+        result["updated"] += len(changed)
+
+    @staticmethod
+    def _resolve_import_task_links(cursor, new_records, changed):
+        """导入项目时只保留指向存在的任务、且未被其他项目关联的task_id"""
+        records = [(None, record) for record in new_records] + changed
+        task_ids = {record['task_id'] for _, record in records if record.get('task_id') is not None}
+        if not task_ids:
+            return
+        placeholders = ', '.join('?' * len(task_ids))
+        cursor.execute(f"SELECT id FROM tasks WHERE id IN ({placeholders})", list(task_ids))
+        valid = {row[0] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT task_id, id FROM projects WHERE task_id IN ({placeholders})", list(task_ids))
+        linked = dict(cursor.fetchall())
+        claimed = set()
+        for row_id, record in records:
+            task_id = record.get('task_id')
+            if task_id is None:
+                continue
+            if task_id not in valid or task_id in claimed or linked.get(task_id, row_id) != row_id:
+                record['task_id'] = None
+            else:
+                claimed.add(task_id)
+
+    # === Diagnostics APIs ===
+    PERF_DUMP_INTERVAL = 300       # 调用统计写入磁盘的间隔（秒）
+
+    def get_perf_stats(self, reset=False):
+        """返回各桥接API的调用次数、错误数、延迟分位数、返回行数和数据大小，以及写线程的提交次数"""
+        stats = self.perf.snapshot(reset=bool(reset))
+        stats["writer"] = self.writer.stats()
+        return stats
+
+    def dump_perf_stats(self):
+        """把调用统计写入data/perf_stats.json（打包后的无控制台版本也能事后查看）"""
+        stats = self.perf.snapshot()
+        stats["dumped_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        data_dir = os.path.join(os.path.dirname(self.db_path), "data")
+        try:
+            os.makedirs(data_dir, exist_ok=True)
+            file_path = os.path.join(data_dir, "perf_stats.json")
+            tmp_path = file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stats, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, file_path)
+            return file_path
+        except OSError as e:
+            print(f"写入调用统计失败: {e}")
+            return None
+
+    def start_perf_dump(self):
+        """启动后台线程，每PERF_DUMP_INTERVAL秒写入一次调用统计"""
+        if self._perf_dump_stop is not None:
+            return
+        self._perf_dump_stop = stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.PERF_DUMP_INTERVAL):
+                self.dump_perf_stats()
+
+        threading.Thread(target=run, name="ppms-perf-dump", daemon=True).start()
+
+    def stop_perf_dump(self):
+        """停止定期写入并最后写入一次"""
+        if self._perf_dump_stop is not None:
+            self._perf_dump_stop.set()
+            self._perf_dump_stop = None
+        self.dump_perf_stats()
+
+    # === Search APIs ===
+    # 全文检索范围：columns为被索引的字段（第一个字段权重最高），title为结果标题表达式，
+    # extra为结果中额外返回的字段
+    SEARCH_SCOPES = {
+        "tasks": {"table": "tasks", "columns": ['title', 'notes', 'client', 'category'],
+                  "title": "title", "extra": ['status']},
+        "task_progress": {"table": "task_progress", "columns": ['progress_text'],
+                          "title": "progress_text", "extra": ['task_id', 'timestamp']},
+        "accounts": {"table": "accounts", "columns": ['website_name', 'url', 'username', 'account', 'notes', 'tag'],
+                     "title": "website_name", "extra": ['username']},
+        "projects": {"table": "projects", "columns": ['name', 'type', 'notes'],
+                     "title": "name", "extra": ['archived']},
+    }
+    SEARCH_LIMIT_DEFAULT = 20
+    SEARCH_LIMIT_MAX = 100
+    SEARCH_SNIPPET_TOKENS = 16     # 摘要长度（trigram分词下约为字符数）
+    # 每个范围只在最新的若干条命中里按相关度取结果，常见词的耗时不随总行数增长；
+    # 代价是更早的命中即使更相关也不会返回（关键词越具体，命中越少，越不受影响）
+    SEARCH_RANK_WINDOW = 500
+
+    def search(self, query, scopes=None, limit=None):
+        """在任务、任务进度、账号、项目中全文搜索，返回按相关度排序的结果及高亮摘要
+
+        多个关键词以空格分隔，需全部命中。摘要为已转义的HTML，命中部分用<mark>标出。
+        trigram分词要求关键词至少3个字符，更短的关键词使用LIKE扫描。
+        为保证边输入边搜索时的响应速度，每个范围只在最新的SEARCH_RANK_WINDOW条命中内按相关度
+        取结果，窗口之外更早的命中不会返回；需要查找旧记录时应使用更具体的关键词。
+        """
+        terms = [term for term in str(query or '').split() if term]
+        if not terms:
+            return {"query": query, "mode": None, "hits": []}
+        scopes = [scope for scope in (scopes or self.SEARCH_SCOPES) if scope in self.SEARCH_SCOPES]
+        try:
+            limit = int(limit or self.SEARCH_LIMIT_DEFAULT)
+        except (TypeError, ValueError):
+            limit = self.SEARCH_LIMIT_DEFAULT
+        limit = max(1, min(limit, self.SEARCH_LIMIT_MAX))
+
+        use_fts = all(len(term) >= 3 for term in terms) and self._search_index_ready()
+        hits = []
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            for scope in scopes:
+                if use_fts:
+                    hits.extend(self._search_fts(cursor, scope, terms, limit))
+                else:
+                    hits.extend(self._search_like(cursor, scope, terms, limit))
+        # bm25得分越小越相关；LIKE模式下得分均为0，保持各范围内按id倒序
+        hits.sort(key=lambda hit: hit["rank"])
+        return {"query": query, "mode": "fts" if use_fts else "like", "hits": hits[:limit]}
+
+    def _search_index_ready(self):
+        """FTS索引是否已建立（迁移7在不支持trigram的SQLite上会跳过）"""
+        if self._search_fts_ready is None:
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+                self._search_fts_ready = cursor.fetchone()[0] > 0
+        return self._search_fts_ready
+
+    def _search_fts(self, cursor, scope, terms, limit):
+        spec = self.SEARCH_SCOPES[scope]
+        table = spec["table"]
+        fts = f"{table}_fts"
+        weights = ', '.join(['5.0'] + ['1.0'] * (len(spec["columns"]) - 1))
+        extra = ''.join(f", t.{column}" for column in spec["extra"])
+        # 每个关键词作为短语匹配，trigram分词下即子串匹配。按加权的bm25取前limit条，
+        # 与合并各范围结果时使用的得分一致（默认的rank不含标题权重）
+        match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        cursor.execute(f'''
+        SELECT t.id, bm25({fts}, {weights}) AS score,
+               snippet({fts}, -1, char(2), char(3), '…', {self.SEARCH_SNIPPET_TOKENS}),
+               t.{spec["title"]}{extra}
+        FROM {fts} JOIN {table} t ON t.id = {fts}.rowid
+        WHERE {fts} MATCH ?
+          AND {fts}.rowid >= (SELECT IFNULL(MIN(rowid), 0) FROM (
+              SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rowid DESC LIMIT ?))
+        ORDER BY score
+        LIMIT ?
+        ''', (match, match, self.SEARCH_RANK_WINDOW, limit))
+        return [self._search_hit(scope, row[0], row[1], self._snippet_html(row[2]), row[3], row[4:])
+                for row in cursor.fetchall()]
+
+    def _search_like(self, cursor, scope, terms, limit):
+        spec = self.SEARCH_SCOPES[scope]
+        columns = spec["columns"]
+        extra = ''.join(f", {column}" for column in spec["extra"])
+        haystack = " || char(10) || ".join(f"IFNULL({column}, '')" for column in columns)
+        where = " AND ".join(f"({haystack}) LIKE ? ESCAPE '\\'" for _ in terms)
+        params = ['%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for term in terms]
+        cursor.execute(f'''
+        SELECT id, {spec["title"]}{extra}, {', '.join(columns)}
+        FROM {spec["table"]}
+        WHERE {where}
+        ORDER BY id DESC
+        LIMIT ?
+        ''', params + [limit])
+        hits = []
+        for row in cursor.fetchall():
+            texts = row[2 + len(spec["extra"]):]
+            snippet = self._like_snippet(texts, terms)
+            hits.append(self._search_hit(scope, row[0], 0, snippet, row[1], row[2:2 + len(spec["extra"])]))
+        return hits
+
+    def _search_hit(self, scope, row_id, rank, snippet, title, extra_values):
+        hit = {"scope": scope, "id": row_id, "title": title, "snippet": snippet, "rank": rank}
+        hit.update(zip(self.SEARCH_SCOPES[scope]["extra"], extra_values))
+        return hit
+
+    @staticmethod
+    def _snippet_html(raw):
+        """把FTS5摘要（char(2)/char(3)标记命中部分）转换为转义后的HTML"""
+        return html.escape(raw or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+    def _like_snippet(self, texts, terms):
+        """LIKE模式下在第一个包含关键词的字段中截取摘要"""
+        width = self.SEARCH_SNIPPET_TOKENS
+        lowered_terms = [term.lower() for term in terms]
+        for text in texts:
+            if not text:
+                continue
+            text = str(text)
+            lowered = text.lower()
+            positions = [lowered.find(term) for term in lowered_terms]
+            hit_positions = [pos for pos in positions if pos >= 0]
+            if not hit_positions:
+                continue
+            start = max(0, min(hit_positions) - width // 2)
+            end = min(len(text), start + width)
+            fragment = text[start:end]
+            pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+            marked = pattern.sub(lambda m: f"\x02{m.group(0)}\x03", fragment)
+            prefix = '…' if start > 0 else ''
+            suffix = '…' if end < len(text) else ''
+            return self._snippet_html(prefix + marked + suffix)
+        return ''
+
     # === Statistics APIs ===
     def get_task_stats(self, period="week"):
         """Get task statistics for a period."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime("%Y-%m-%d")
+        # 从按日汇总表读取，耗时只与天数有关
+        days = {"week": 7, "month": 30}.get(period)
+        if days is None:
+            return {
+                "total": 0,
+                "completed": 0,
+                "active_days": 0,
+                "completion_rate": 0
+            }
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
         
-        if period == "week":
-            # Get stats for the last 7 days
-            cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                COUNT(DISTINCT date(created_at)) as active_days
-            FROM tasks
-            WHERE date(created_at) >= date(?, '-7 days')
-            ''', (today,))
-        elif period == "month":
-            # Get stats for the last 30 days
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
             cursor.execute('''
             SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                COUNT(DISTINCT date(created_at)) as active_days
-            FROM tasks
-            WHERE date(created_at) >= date(?, '-30 days')
-            ''', (today,))
+                SUM(created_count) as total,
+                SUM(completed_count) as completed,
+                SUM(CASE WHEN created_count > 0 THEN 1 ELSE 0 END) as active_days
+            FROM task_daily_stats
+            WHERE day >= ?
+            ''', (since,))
+            stats = cursor.fetchone()
         
-        stats = cursor.fetchone()
-        conn.close()
-        
-        if stats:
-            total, completed, active_days = stats
-            completion_rate = (completed / total) * 100 if total > 0 else 0
-            
-            return {
-                "total": total,
-                "completed": completed,
-                "active_days": active_days,
-                "completion_rate": round(completion_rate, 2)
-            }
+        total, completed, active_days = (value or 0 for value in stats)
+        completion_rate = (completed / total) * 100 if total > 0 else 0
         
         return {
-            "total": 0,
-            "completed": 0,
-            "active_days": 0,
-            "completion_rate": 0
+            "total": total,
+            "completed": completed,
+            "active_days": active_days,
+            "completion_rate": round(completion_rate, 2)
         }
 
     def get_payment_stats(self, period="month"):
         """Get payment statistics for a period."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        
+        # 从按月汇总表读取，月报读1行，年报最多读12行
+        now = datetime.now()
         if period == "month":
-            # Get stats for the current month
-            cursor.execute('''
-            SELECT 
-                SUM(amount) as total_amount,
-                COUNT(*) as payment_count
-            FROM payments
-            WHERE strftime('%Y-%m', date) = strftime('%Y-%m', ?)
-            ''', (today,))
+            first_month = last_month = now.strftime("%Y-%m")
         elif period == "year":
-            # Get stats for the current year
+            first_month, last_month = f"{now.year}-01", f"{now.year}-12"
+        else:
+            return {
+                "total_amount": 0,
+                "payment_count": 0
+            }
+        
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
             cursor.execute('''
             SELECT 
-                SUM(amount) as total_amount,
-                COUNT(*) as payment_count
-            FROM payments
-            WHERE strftime('%Y', date) = strftime('%Y', ?)
-            ''', (today,))
-        
-        stats = cursor.fetchone()
-        conn.close()
+                SUM(total_amount) as total_amount,
+                SUM(payment_count) as payment_count
+            FROM payment_monthly_stats
+            WHERE month BETWEEN ? AND ?
+            ''', (first_month, last_month))
+            total_amount, payment_count = cursor.fetchone()
         
-        if stats:
-            total_amount, payment_count = stats
-            return {
-                "total_amount": total_amount or 0,
-                "payment_count": payment_count or 0
+        return {
+            "total_amount": total_amount or 0,
+            "payment_count": payment_count or 0
+        }
+
+    @staticmethod
+    def _period_range(period, start=None, end=None):
+        """计算报告周期的起止日期（含），与前端getDateRangeByPeriod一致
+
+        week为本周一到周日，month为本月，year为本年；传入start/end（YYYY-MM-DD）时优先使用。
+        """
+        today = datetime.now().date()
+        if period == "month":
+            range_start = today.replace(day=1)
+            next_month = (range_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            range_end = next_month - timedelta(days=1)
+        elif period == "year":
+            range_start = today.replace(month=1, day=1)
+            range_end = today.replace(month=12, day=31)
+        else:
+            range_start = today - timedelta(days=today.weekday())
+            range_end = range_start + timedelta(days=6)
+        if start:
+            range_start = datetime.strptime(start[:10], "%Y-%m-%d").date()
+        if end:
+            range_end = datetime.strptime(end[:10], "%Y-%m-%d").date()
+        return range_start, range_end
+
+    def get_dashboard_stats(self, period="week", start=None, end=None):
+        """报告页统计：总完成/结算项目数、结算率、活跃天数、状态分布和类型分布
+
+        全部在SQL中聚合，只返回图表需要的数字。日期范围用规范化日期键的区间比较，
+        可以直接利用索引。
+        """
+        try:
+            range_start, range_end = self._period_range(period, start, end)
+        except ValueError:
+            return {"error": "无效的日期"}
+        day_range = (self._epoch_day(range_start), self._epoch_day(range_end))
+        created_day = self._date_key("created_day")
+        completion_day = self._date_key("completion_day")
+
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            
+            # 总统计数据（不受时间范围限制）
+            cursor.execute('''
+            SELECT COUNT(*), SUM(CASE WHEN payment_status = 'paid' THEN 1 ELSE 0 END)
+            FROM projects
+            ''')
+            completed_projects, settled_projects = cursor.fetchone()
+            settled_projects = settled_projects or 0
+            
+            # 时间范围内创建的未完成任务，按状态统计（不包括已删除的）；
+            # 与页面原先的task.status || 'pending'一致，没有状态的任务计为待处理
+            cursor.execute(f'''
+            SELECT IFNULL(NULLIF(status, ''), 'pending') AS task_status, COUNT(*) FROM tasks
+            WHERE {created_day} BETWEEN ? AND ?
+              AND IFNULL(NULLIF(status, ''), 'pending') IN ('pending', 'in-progress')
+            GROUP BY task_status
+            ''', day_range)
+            task_status_counts = dict(cursor.fetchall())
+            
+            # 活跃天数：有任务创建或项目完成的日期数
+            cursor.execute(f'''
+            SELECT COUNT(*) FROM (
+                SELECT {created_day} FROM tasks
+                WHERE {created_day} BETWEEN ? AND ? AND IFNULL(status, '') != 'deleted'
+                UNION
+                SELECT {completion_day} FROM projects
+                WHERE {completion_day} BETWEEN ? AND ?
+            )
+            ''', day_range + day_range)
+            active_days = cursor.fetchone()[0]
+            
+            # 项目类型分布（不受时间范围限制）
+            cursor.execute('''
+            SELECT IFNULL(NULLIF(type, ''), '未分类') AS type_name, COUNT(*)
+            FROM projects
+            GROUP BY type_name
+            ORDER BY MIN(id)
+            ''')
+            type_rows = cursor.fetchall()
+
+        # 与前端Math.round一致（四舍五入）
+        settlement_rate = int(settled_projects * 100 / completed_projects + 0.5) if completed_projects else 0
+        return {
+            "period": period,
+            "start": range_start.strftime("%Y-%m-%d"),
+            "end": range_end.strftime("%Y-%m-%d"),
+            "completed_projects": completed_projects,
+            "settled_projects": settled_projects,
+            "settlement_rate": settlement_rate,
+            "active_days": active_days,
+            "status_counts": {
+                "pending": task_status_counts.get("pending", 0),
+                "in-progress": task_status_counts.get("in-progress", 0),
+                "completed": completed_projects,
+                "settled": settled_projects
+            },
+            "type_counts": {
+                "labels": [row[0] for row in type_rows],
+                "data": [row[1] for row in type_rows]
             }
-        
+        }
+
+    # === Time Series APIs ===
+    # 指标定义：table/key为明细表及其规范化日期键，value为聚合表达式，where为附加条件；
+    # rollup为可替代明细表的汇总表(表名, 日期键字段, 聚合表达式, 日期键粒度)，
+    # 汇总表覆盖所需粒度时优先使用，年度视图只需读取几百行
+    TIMESERIES_METRICS = {
+        "tasks_created": {
+            "table": "tasks", "key": "created_day", "value": "COUNT(*)",
+            "rollup": ("task_daily_stats", "day", "SUM(created_count)", "day"),
+        },
+        # 任务没有单独的完成时间，已完成任务按最后更新时间计
+        "tasks_completed": {
+            "table": "tasks", "key": "updated_day", "value": "COUNT(*)", "where": "status = 'completed'",
+        },
+        "projects_completed": {
+            "table": "projects", "key": "completion_day", "value": "COUNT(*)",
+        },
+        "payment_amount": {
+            "table": "payments", "key": "payment_day", "value": "SUM(amount)",
+            "rollup": ("payment_monthly_stats", "month", "SUM(total_amount)", "month"),
+        },
+        "payment_count": {
+            "table": "payments", "key": "payment_day", "value": "COUNT(*)",
+            "rollup": ("payment_monthly_stats", "month", "SUM(payment_count)", "month"),
+        },
+    }
+    # 桶键表达式，{d}为以YYYY-MM-DD开头的日期文本；周以周一的日期为键
+    TIMESERIES_BUCKETS = {
+        "day": "substr({d}, 1, 10)",
+        "week": "date(substr({d}, 1, 10), 'weekday 0', '-6 days')",
+        "month": "substr({d}, 1, 7)",
+        "year": "substr({d}, 1, 4)",
+    }
+    TIMESERIES_MAX_POINTS = 1000
+
+    def get_timeseries(self, metric, start=None, end=None, bucket="day"):
+        """按时间桶汇总指标，返回可直接用于Chart.js的数组
+
+        metric为指标名或指标名列表；start/end为YYYY-MM-DD（含），省略时取数据的最早/最晚日期。
+        分组在SQL中完成，没有数据的桶补0。
+        返回{"bucket", "start", "end", "buckets": [桶键], "labels": [标签], "series": {指标: [值]}}
+        """
+        metrics = [metric] if isinstance(metric, str) else list(metric or [])
+        unknown = [str(name) for name in metrics if name not in self.TIMESERIES_METRICS]
+        if not metrics or unknown:
+            return {"error": f"未知的指标: {', '.join(unknown) or metric}"}
+        if bucket not in self.TIMESERIES_BUCKETS:
+            return {"error": f"未知的时间粒度: {bucket}"}
+
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                range_start, range_end = self._timeseries_range(cursor, metrics, start, end)
+            except ValueError:
+                return {"error": "无效的日期"}
+            # 省略的一端按桶对齐
+            range_start, range_end = self._timeseries_align(range_start, range_end, bucket, not start, not end)
+            if range_start > range_end:
+                return {"error": "开始日期晚于结束日期"}
+
+            keys = self._timeseries_keys(range_start, range_end, bucket)
+            if len(keys) > self.TIMESERIES_MAX_POINTS:
+                return {"error": f"时间点过多（{len(keys)}个），请缩小范围或使用更粗的粒度"}
+
+            series = {}
+            for name in metrics:
+                values = dict(self._timeseries_query(cursor, name, range_start, range_end, bucket))
+                series[name] = [round(values.get(key) or 0, 2) for key in keys]
+
         return {
-            "total_amount": 0,
-            "payment_count": 0
+            "bucket": bucket,
+            "start": range_start.strftime("%Y-%m-%d"),
+            "end": range_end.strftime("%Y-%m-%d"),
+            "buckets": keys,
+            # 日、周标签为MM-dd，月、年标签即桶键（YYYY-MM / YYYY），与前端原有标签一致
+            "labels": [key[5:] if bucket in ("day", "week") else key for key in keys],
+            "series": series,
         }
 
+    def _timeseries_range(self, cursor, metrics, start, end):
+        """解析起止日期；省略的一端取这些指标数据的最早/最晚日期（没有数据时取今天）"""
+        range_start = datetime.strptime(start[:10], "%Y-%m-%d").date() if start else None
+        range_end = datetime.strptime(end[:10], "%Y-%m-%d").date() if end else None
+        if range_start and range_end:
+            return range_start, range_end
+
+        firsts, lasts = [], []
+        for name in metrics:
+            spec = self.TIMESERIES_METRICS[name]
+            rollup = spec.get("rollup")
+            if rollup and rollup[3] == "day":
+                # 按日汇总表的行数只与天数有关（计数为0的日期只会让范围略宽，补0即可）
+                table, column = rollup[0], rollup[1]
+                cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+                first, last = cursor.fetchone()
+            else:
+                # 日期键上有索引，分别取MIN/MAX时直接读取索引两端
+                key = self._date_key(spec["key"])
+                source = f"FROM {spec['table']} WHERE {spec['where']}" if spec.get("where") else f"FROM {spec['table']}"
+                cursor.execute(f"SELECT (SELECT MIN({key}) {source}), (SELECT MAX({key}) {source})")
+                first, last = (None if day is None else (self.EPOCH + timedelta(days=day)).strftime("%Y-%m-%d")
+                               for day in cursor.fetchone())
+            if first:
+                firsts.append(first[:10])
+                lasts.append(last[:10])
+        today = datetime.now().date()
+        if range_start is None:
+            range_start = datetime.strptime(min(firsts), "%Y-%m-%d").date() if firsts else today
+        if range_end is None:
+            range_end = datetime.strptime(max(lasts), "%Y-%m-%d").date() if lasts else today
+        return range_start, range_end
+
+    @staticmethod
+    def _timeseries_align(range_start, range_end, bucket, align_start, align_end):
+        """把起止日期扩展到所在月/年的首尾，使首尾的桶完整、可以直接使用按月汇总表"""
+        if bucket == "year":
+            if align_start:
+                range_start = range_start.replace(month=1, day=1)
+            if align_end:
+                range_end = range_end.replace(month=12, day=31)
+        elif bucket == "month":
+            if align_start:
+                range_start = range_start.replace(day=1)
+            if align_end:
+                range_end = (range_end.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        return range_start, range_end
+
+    @staticmethod
+    def _timeseries_keys(range_start, range_end, bucket):
+        """起止日期之间的全部桶键，用于补齐没有数据的桶"""
+        if bucket == "year":
+            return [str(year) for year in range(range_start.year, range_end.year + 1)]
+        if bucket == "month":
+            first = range_start.year * 12 + range_start.month - 1
+            last = range_end.year * 12 + range_end.month - 1
+            return [f"{index // 12:04d}-{index % 12 + 1:02d}" for index in range(first, last + 1)]
+        if bucket == "week":
+            day, step = range_start - timedelta(days=range_start.weekday()), timedelta(days=7)
+        else:
+            day, step = range_start, timedelta(days=1)
+        keys = []
+        while day <= range_end:
+            keys.append(day.strftime("%Y-%m-%d"))
+            day += step
+        return keys
+
+    def _timeseries_query(self, cursor, name, range_start, range_end, bucket):
+        """返回[(桶键, 值)]；汇总表按字符串区间、明细表按规范化日期键区间过滤，都可以利用索引"""
+        spec = self.TIMESERIES_METRICS[name]
+        next_day = range_end + timedelta(days=1)
+        start_key = range_start.strftime("%Y-%m-%d")
+        end_key = next_day.strftime("%Y-%m-%d")
+
+        rollup = spec.get("rollup")
+        # 按月汇总表只能用于起止日期按整月对齐的月/年粒度
+        if rollup and (rollup[3] == "day" or (
+                bucket in ("month", "year") and range_start.day == 1 and next_day.day == 1)):
+            table, column, value, grain = rollup
+            if grain == "month":
+                start_key, end_key = start_key[:7], end_key[:7]
+                date_expr = f"{column} || '-01'"
+            else:
+                date_expr = column
+            cursor.execute(f'''
+            SELECT {self.TIMESERIES_BUCKETS[bucket].format(d=date_expr)} AS bucket_key, {value}
+            FROM {table}
+            WHERE {column} >= ? AND {column} < ?
+            GROUP BY bucket_key
+            ''', (start_key, end_key))
+            return cursor.fetchall()
+
+        key = self._date_key(spec["key"])
+        date_expr = f"date({key} * 86400, 'unixepoch')"
+        where = f" AND {spec['where']}" if spec.get("where") else ""
+        cursor.execute(f'''
+        SELECT {self.TIMESERIES_BUCKETS[bucket].format(d=date_expr)} AS bucket_key, {spec['value']}
+        FROM {spec['table']}
+        WHERE {key} BETWEEN ? AND ?{where}
+        GROUP BY bucket_key
+        ''', (self._epoch_day(range_start), self._epoch_day(range_end)))
+        return cursor.fetchall()
+
     # === Website Management APIs ===
     def get_websites(self):
         """获取所有网站类型列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, url, description, created_at FROM websites ORDER BY name")
-        websites = cursor.fetchall()
-        conn.close()
-        
-        columns = ['id', 'name', 'url', 'description', 'created_at']
-        return [dict(zip(columns, website)) for website in websites]
+        return self._lookup_rows('websites')
     
     def add_website(self, name, url=None, description=None):
         """添加新网站类型"""
         if not name or not name.strip():
             return {"error": "网站类型名称不能为空"}
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            cursor.execute(
-                "INSERT INTO websites (name, url, description, created_at) VALUES (?, ?, ?, ?)", 
-                (name.strip(), url, description, now)
-            )
-            website_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO websites (name, url, description, created_at) VALUES (?, ?, ?, ?)", 
+                    (name.strip(), url, description, now)
+                )
+                website_id = cursor.lastrowid
             return {
                 "id": website_id, 
                 "name": name.strip(), 
@@ -1384,10 +3570,8 @@ class PPMS:
                 "created_at": now
             }
         except sqlite3.IntegrityError:
-            conn.close()
             return {"error": "网站类型名称已存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
     
     def update_website(self, website_id, updates_dict):
@@ -1417,18 +3601,13 @@ class PPMS:
         params = dict(updates)
         params['website_id'] = website_id
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # 使用命名参数执行更新
-            cursor.execute(f"UPDATE websites SET {set_sql} WHERE id = :website_id", params)
-            
-            # 检查是否成功更新
-            rows_affected = cursor.rowcount
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                # 使用命名参数执行更新
+                cursor.execute(f"UPDATE websites SET {set_sql} WHERE id = :website_id", params)
+                # 检查是否成功更新
+                rows_affected = cursor.rowcount
             
             return {
                 "success": rows_affected > 0,
@@ -1436,37 +3615,31 @@ class PPMS:
                 "updated_fields": list(updates.keys())
             }
         except sqlite3.IntegrityError:
-            conn.close()
             return {"error": "网站类型名称已存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
     
     def delete_website(self, website_id):
         """删除网站类型"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # 检查是否有账号使用此网站类型
-            cursor.execute("SELECT COUNT(*) FROM accounts WHERE website_name = (SELECT name FROM websites WHERE id = ?)", (website_id,))
-            count = cursor.fetchone()[0]
-            
-            if count > 0:
-                conn.close()
-                return {"error": f"无法删除，有{count}个账号正在使用该网站类型"}
-            
-            cursor.execute("DELETE FROM websites WHERE id = ?", (website_id,))
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # 检查是否有账号使用此网站类型
+                cursor.execute("SELECT COUNT(*) FROM accounts WHERE website_name = (SELECT name FROM websites WHERE id = ?)", (website_id,))
+                count = cursor.fetchone()[0]
+                
+                if count > 0:
+                    return {"error": f"无法删除，有{count}个账号正在使用该网站类型"}
+                
+                cursor.execute("DELETE FROM websites WHERE id = ?", (website_id,))
+                affected_rows = cursor.rowcount
             
             if affected_rows > 0:
                 return {"success": True}
             else:
                 return {"error": "网站类型不存在"}
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
 
     def open_file_explorer(self, path):
@@ -1553,7 +3726,19 @@ def show_tray_icon(window, on_quit):
     return icon
 
 # === 新增：API代理类 ===
+@instrument_api
+@route_writes
 class PPMSApi:
+    # 经由写线程执行的写操作；导入等耗时的写入在后台任务中自行分块提交，不占用写线程
+    WRITE_METHODS = (
+        'add_task', 'update_task', 'add_task_progress',
+        'add_account', 'update_account', 'delete_account',
+        'add_project', 'update_project', 'convert_completed_tasks_to_projects', 'delete_project',
+        'add_payment', 'delete_payment', 'update_settings',
+        'add_website', 'update_website', 'delete_website',
+        'add_client', 'delete_client', 'add_category', 'delete_category',
+    )
+
     def __init__(self, ppms_instance):
         self._ppms = ppms_instance
     # 只暴露API方法，不暴露属性
@@ -1581,6 +3766,8 @@ class PPMSApi:
         return self._ppms.add_project(*args, **kwargs)
     def update_project(self, *args, **kwargs):
         return self._ppms.update_project(*args, **kwargs)
+    def convert_completed_tasks_to_projects(self, *args, **kwargs):
+        return self._ppms.convert_completed_tasks_to_projects(*args, **kwargs)
     def delete_project(self, *args, **kwargs):
         return self._ppms.delete_project(*args, **kwargs)
     def get_payments(self, *args, **kwargs):
@@ -1589,6 +3776,14 @@ class PPMSApi:
         return self._ppms.add_payment(*args, **kwargs)
     def delete_payment(self, *args, **kwargs):
         return self._ppms.delete_payment(*args, **kwargs)
+    def get_tasks_page(self, *args, **kwargs):
+        return self._ppms.get_tasks_page(*args, **kwargs)
+    def get_accounts_page(self, *args, **kwargs):
+        return self._ppms.get_accounts_page(*args, **kwargs)
+    def get_projects_page(self, *args, **kwargs):
+        return self._ppms.get_projects_page(*args, **kwargs)
+    def get_payments_page(self, *args, **kwargs):
+        return self._ppms.get_payments_page(*args, **kwargs)
     def get_settings(self, *args, **kwargs):
         return self._ppms.get_settings(*args, **kwargs)
     def update_settings(self, *args, **kwargs):
@@ -1601,10 +3796,34 @@ class PPMSApi:
         return self._ppms.restart_application(*args, **kwargs)
     def export_data(self, *args, **kwargs):
         return self._ppms.export_data(*args, **kwargs)
+    def start_export(self, *args, **kwargs):
+        return self._ppms.start_export(*args, **kwargs)
+    def get_export_status(self, *args, **kwargs):
+        return self._ppms.get_export_status(*args, **kwargs)
+    def cancel_export(self, *args, **kwargs):
+        return self._ppms.cancel_export(*args, **kwargs)
+    def import_data(self, *args, **kwargs):
+        return self._ppms.import_data(*args, **kwargs)
+    def start_import(self, *args, **kwargs):
+        return self._ppms.start_import(*args, **kwargs)
+    def select_import_file(self, *args, **kwargs):
+        return self._ppms.select_import_file(*args, **kwargs)
     def get_task_stats(self, *args, **kwargs):
         return self._ppms.get_task_stats(*args, **kwargs)
     def get_payment_stats(self, *args, **kwargs):
         return self._ppms.get_payment_stats(*args, **kwargs)
+    def get_dashboard_stats(self, *args, **kwargs):
+        return self._ppms.get_dashboard_stats(*args, **kwargs)
+    def get_timeseries(self, *args, **kwargs):
+        return self._ppms.get_timeseries(*args, **kwargs)
+    def get_data_version(self, *args, **kwargs):
+        return self._ppms.get_data_version(*args, **kwargs)
+    def get_changes_since(self, *args, **kwargs):
+        return self._ppms.get_changes_since(*args, **kwargs)
+    def search(self, *args, **kwargs):
+        return self._ppms.search(*args, **kwargs)
+    def get_perf_stats(self, *args, **kwargs):
+        return self._ppms.get_perf_stats(*args, **kwargs)
     def get_websites(self, *args, **kwargs):
         return self._ppms.get_websites(*args, **kwargs)
     def add_website(self, *args, **kwargs):
@@ -1617,6 +3836,10 @@ class PPMSApi:
         return self._ppms.open_file_explorer(*args, **kwargs)
     def get_clients(self, *args, **kwargs):
         return self._ppms.get_clients(*args, **kwargs)
+    def get_client_names(self, *args, **kwargs):
+        return self._ppms.get_client_names(*args, **kwargs)
+    def get_lookups(self, *args, **kwargs):
+        return self._ppms.get_lookups(*args, **kwargs)
     def add_client(self, *args, **kwargs):
         return self._ppms.add_client(*args, **kwargs)
     def delete_client(self, *args, **kwargs):
@@ -1628,6 +3851,62 @@ class PPMSApi:
     def delete_category(self, *args, **kwargs):
         return self._ppms.delete_category(*args, **kwargs)
 
+    def batch(self, calls, atomic=False):
+        """一次桥接往返执行多个API调用
+
+        calls为[{"method": "get_tasks", "args": [...]}, ...]，args可以是列表（位置参数）
+        或字典（关键字参数）。所有调用共用同一个数据库连接；atomic为True时在同一个事务中执行，
+        任一调用抛出异常或返回{"error": ...}即整批回滚，后续调用不再执行。
+        返回{"results": [{"ok": True, "result": ...} | {"ok": False, "error": "..."}], "rolled_back": bool}
+        """
+        if not isinstance(calls, list):
+            return {"error": "calls必须是列表"}
+        if any(isinstance(call, dict) and call.get("method") in self.WRITE_METHODS for call in calls):
+            # 含写操作的批量调用整体在写线程上执行，其中的写操作不再单独排队
+            return self._ppms.writer.call(self._run_batch, calls, atomic)
+        return self._run_batch(calls, atomic)
+
+    def _run_batch(self, calls, atomic):
+        results = []
+
+        def run(call):
+            method = call.get("method") if isinstance(call, dict) else None
+            if not isinstance(method, str) or method.startswith('_') or method == 'batch' \
+                    or not callable(getattr(PPMSApi, method, None)):
+                return {"ok": False, "error": f"未知的API方法: {method}"}
+            args = call.get("args") or []
+            try:
+                if isinstance(args, dict):
+                    result = getattr(self, method)(**args)
+                else:
+                    result = getattr(self, method)(*args)
+            except Exception as e:
+                print(f"批量调用{method}失败: {e}")
+                return {"ok": False, "error": str(e)}
+            if isinstance(result, dict) and "error" in result:
+                return {"ok": False, "error": result["error"]}
+            return {"ok": True, "result": result}
+
+        db = self._ppms.db
+        if not atomic:
+            with db.connection():
+                for call in calls:
+                    results.append(run(call))
+            return {"results": results, "rolled_back": False}
+
+        try:
+            with db.transaction():
+                for call in calls:
+                    outcome = run(call)
+                    results.append(outcome)
+                    if not outcome["ok"]:
+                        raise BatchAborted(outcome["error"])
+        except BatchAborted:
+            skipped = {"ok": False, "error": "已跳过（批量调用已回滚）"}
+            results.extend(dict(skipped) for _ in range(len(calls) - len(results)))
+            return {"results": results, "rolled_back": True}
+        return {"results": results, "rolled_back": False}
+
 def main():
     # 创建互斥锁确保程序只运行一个实例
     mutex, is_first_instance = create_mutex()
@@ -1637,7 +3916,8 @@ def main():
         
     app = PPMS()
     api = PPMSApi(app)  # 新增：API代理对象
-    settings = app.get_settings()
+    app.start_perf_dump()
+    settings = app.settings_snapshot()
     html_path = get_resource_path('web/index.html')
     theme = settings.get('theme', 'light')
     if platform.system() == 'Windows':
@@ -1676,6 +3956,8 @@ def main():
             print("主题已通过Python注入")
         except Exception as e:
             print(f"应用主题时出错: {e}")
+        # 窗口显示后再在后台预热导出依赖，不影响启动速度
+        threading.Thread(target=preload_export_modules, daemon=True).start()
     
     # 注册窗口加载完成事件
     app.window.events.loaded += on_loaded
@@ -1731,6 +4013,12 @@ def main():
         print(f"启动窗口时出错: {e}")
         sys.exit(1)
 
+    app.stop_perf_dump()
+    app.writer.stop()
+
+    # 关闭数据库连接（最后一个连接关闭时会完成WAL检查点）
+    app.db.close_all()
+
     # 主循环退出后再彻底退出进程
     if app._should_quit:
         sys.exit(0)
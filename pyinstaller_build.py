@@ -31,7 +31,6 @@ def run_pyinstaller():
         '--add-data=web;web',
         '--add-data=ppms.db;.',
         '--add-data=ppms.manifest;.',  # 添加清单文件
-        '--hidden-import=pandas',
         '--hidden-import=openpyxl',
         '--hidden-import=pystray',
         '--hidden-import=PIL',
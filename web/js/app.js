@@ -33,6 +33,7 @@ function initApiConnection() {
                 get_payments: () => Promise.resolve([]),
                 get_websites: () => Promise.resolve([]),
                 get_clients: () => Promise.resolve([]),
+                get_client_names: () => Promise.resolve([]),
                 get_categories: () => Promise.resolve([])
             }
         };
@@ -292,6 +293,12 @@ function setupEventListeners() {
         exportBtn.addEventListener('click', exportData);
     }
     
+    // 导入数据按钮事件监听
+    const importBtn = document.getElementById('import-btn');
+    if (importBtn) {
+        importBtn.addEventListener('click', importData);
+    }
+    
     // Task-related event listeners
     setupTaskEventListeners();
     
@@ -448,620 +455,339 @@ function setupCharts() {
             });
         });
     }
-    
-    // 设置定时刷新（每60秒刷新一次）
-    setInterval(() => {
-        const activePeriod = document.querySelector('.period-selector button.active');
-        if (activePeriod) {
-            const period = activePeriod.getAttribute('data-period');
-            setupTaskReportCharts(period);
-        }
-    }, 60000);
 }
 
-// 设置任务报告图表
-function setupTaskReportCharts(period) {
-    if (!window.pywebview) {
-        console.warn('PyWebView API not available yet, cannot load report data');
-        return;
+// 数据变更后需要自动刷新的视图：页面id -> 依赖的数据表和刷新函数
+// （列表页在自身修改数据后已主动刷新，这里只登记只读视图）
+const dataChangeViews = {
+    'reports-page': {
+        tables: ['tasks', 'projects', 'payments'],
+        refresh: () => {
+            const activePeriod = document.querySelector('.period-selector button.active');
+            setupTaskReportCharts(activePeriod ? activePeriod.getAttribute('data-period') : 'week');
+        }
     }
+};
+// 已处理的最新数据版本
+let lastDataVersion = 0;
+
+// Python端在写事务提交后推送的数据变更事件（已在后端合并）
+window.onDataChanged = function(change) {
+    if (!change || change.version <= lastDataVersion) return;
+    lastDataVersion = change.version;
     
-    // 显示加载状态
-    const chartContainers = document.querySelectorAll('.chart-container');
-    chartContainers.forEach(container => {
-        container.classList.add('loading');
-    });
-    
-    // 获取所有任务数据
-    window.pywebview.api.get_tasks().then(tasks => {
-        // 获取所有项目数据（包括已归档和未归档的）
-        window.pywebview.api.get_projects(true).then(archivedProjects => {
-            window.pywebview.api.get_projects(false).then(activeProjects => {
-                // 合并所有项目
-                const allProjects = [...activeProjects];
-                archivedProjects.forEach(archivedProject => {
-                    if (!allProjects.some(p => p.id === archivedProject.id)) {
-                        allProjects.push(archivedProject);
-                    }
-                });
-                
-                console.log('报告 - 获取到未归档项目:', activeProjects.length);
-                console.log('报告 - 获取到归档项目:', archivedProjects.length);
-                console.log('报告 - 合并后总项目数:', allProjects.length);
-                
-                // 调用各个图表函数并传递任务和所有项目数据
-                updateTasksStatistics(tasks, allProjects, period);
-                createTaskStatusChart(tasks, allProjects, period);
-                createTaskTypeDistributionChart(allProjects, period);
-                createTaskTrendChart(tasks, allProjects, period);
-                
-                // 移除加载状态
-                chartContainers.forEach(container => {
-                    container.classList.remove('loading');
-                });
-            }).catch(error => {
-                console.error('获取未归档项目数据失败:', error);
-                // 移除加载状态
-                chartContainers.forEach(container => {
-                    container.classList.remove('loading');
-                });
-            });
-        }).catch(error => {
-            console.error('获取归档项目数据失败:', error);
-            // 移除加载状态
-            chartContainers.forEach(container => {
-                container.classList.remove('loading');
-            });
-        });
-    }).catch(error => {
-        console.error('获取任务数据失败:', error);
-        // 移除加载状态
-        chartContainers.forEach(container => {
-            container.classList.remove('loading');
-        });
-    });
-}
+    // 只刷新当前可见且依赖被修改表的视图
+    const activePage = document.querySelector('.page-content.active');
+    const view = activePage ? dataChangeViews[activePage.id] : null;
+    if (view && view.tables.some(table => change.tables.includes(table))) {
+        view.refresh();
+    }
+};
 
 // 更新任务统计信息
-function updateTasksStatistics(tasks, projects, period) {
-    // 过滤掉已删除的任务
-    const activeTasks = tasks.filter(task => !(task.is_deleted === true || task.status === 'deleted'));
-    
-    // 根据周期过滤数据
-    const { startDate, endDate } = getDateRangeByPeriod(period);
-    
-    // 获取所有项目数据（包括已归档和未归档的）
-    window.pywebview.api.get_projects(true).then(archivedProjects => {
-        window.pywebview.api.get_projects(false).then(activeProjects => {
-            // 合并所有项目
-            const allProjects = [...activeProjects];
-            archivedProjects.forEach(archivedProject => {
-                if (!allProjects.some(p => p.id === archivedProject.id)) {
-                    allProjects.push(archivedProject);
-                }
-            });
-            
-            console.log('任务统计 - 获取到未归档项目:', activeProjects.length);
-            console.log('任务统计 - 获取到归档项目:', archivedProjects.length);
-            console.log('任务统计 - 合并后总项目数:', allProjects.length);
-            
-            // 计算总统计数据（不受时间范围限制）
-            const totalCompletedProjects = allProjects.length;
-            const totalSettledProjects = allProjects.filter(p => p.payment_status === 'paid').length;
-            const settlementRate = totalCompletedProjects > 0 ? Math.round((totalSettledProjects / totalCompletedProjects) * 100) : 0;
-            
-            // 过滤指定时间范围内的任务（不包括已删除的）
-            const filteredActiveTasks = activeTasks.filter(task => {
-                const taskDate = task.created_at ? new Date(task.created_at) : null;
-                return taskDate && taskDate >= startDate && taskDate <= endDate;
-            });
-            
-            // 过滤指定时间范围内的已完成项目
-            const filteredProjects = allProjects.filter(project => {
-                const projectDate = project.completion_date ? new Date(project.completion_date) : null;
-                return projectDate && projectDate >= startDate && projectDate <= endDate;
-            });
-            
-            // 计算活跃天数（有任务创建或项目完成的天数）
-            const activeDaysSet = new Set();
-            
-            // 添加任务创建日期
-            filteredActiveTasks.forEach(task => {
-                if (task.created_at) {
-                    const date = new Date(task.created_at).toLocaleDateString();
-                    activeDaysSet.add(date);
-                }
-            });
-            
-            // 添加项目完成日期
-            filteredProjects.forEach(project => {
-                if (project.completion_date) {
-                    const date = new Date(project.completion_date).toLocaleDateString();
-                    activeDaysSet.add(date);
-                }
-            });
-            
-            const activeDays = activeDaysSet.size;
-            
-            // 更新页面显示
-            document.getElementById('completed-tasks').textContent = totalCompletedProjects; // 总完成项目数
-            document.getElementById('settled-tasks').textContent = totalSettledProjects; // 总结算项目数
-            document.getElementById('settlement-rate').textContent = `${settlementRate}%`;
-            document.getElementById('active-days').textContent = activeDays;
-            
-            console.log('任务统计:', {
-                已完成项目: totalCompletedProjects,
-                已结算项目: totalSettledProjects,
-                结算率: `${settlementRate}%`,
-                活跃天数: activeDays
-            });
-        }).catch(error => {
-            console.error('获取未归档项目数据失败:', error);
-        });
-    }).catch(error => {
-        console.error('获取归档项目数据失败:', error);
+function updateTasksStatistics(stats) {
+    // 更新页面显示
+    document.getElementById('completed-tasks').textContent = stats.completed_projects; // 总完成项目数
+    document.getElementById('settled-tasks').textContent = stats.settled_projects; // 总结算项目数
+    document.getElementById('settlement-rate').textContent = `${stats.settlement_rate}%`;
+    document.getElementById('active-days').textContent = stats.active_days;
+    
+    console.log('任务统计:', {
+        已完成项目: stats.completed_projects,
+        已结算项目: stats.settled_projects,
+        结算率: `${stats.settlement_rate}%`,
+        活跃天数: stats.active_days
     });
 }
 
 // 创建任务状态分布图表
-function createTaskStatusChart(tasks, projects, period) {
-    // 过滤掉已删除的任务
-    const activeTasks = tasks.filter(task => !(task.is_deleted === true || task.status === 'deleted'));
+function createTaskStatusChart(stats) {
+    const statusCounts = stats.status_counts;
+    console.log('任务状态分布:', statusCounts);
+    
+    // 获取图表Canvas
+    const chartCanvas = document.getElementById('tasks-status-chart');
+    if (!chartCanvas) return;
+    
+    // 销毁现有图表（如果存在）
+    if (window.tasksStatusChart) {
+        window.tasksStatusChart.destroy();
+    }
+    
+    // 确保有任务数据
+    const total = statusCounts.pending + statusCounts['in-progress'] + statusCounts.completed;
+    if (total === 0) {
+        // 创建空图表
+        window.tasksStatusChart = new Chart(chartCanvas, {
+            type: 'doughnut',
+            data: {
+                labels: ['暂无数据'],
+                datasets: [{
+                    data: [1],
+                    backgroundColor: ['#e9ecef'],
+                    borderWidth: 0
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        display: true
+                    },
+                    tooltip: {
+                        enabled: false
+                    }
+                }
+            }
+        });
+        return;
+    }
     
-    // 根据周期过滤数据
-    const { startDate, endDate } = getDateRangeByPeriod(period);
+    // 准备图表数据
+    const chartData = {
+        labels: ['待办', '进行中', '已完成', '已结算'],
+        datasets: [{
+            data: [
+                statusCounts.pending, 
+                statusCounts['in-progress'], 
+                statusCounts.completed, 
+                statusCounts.settled
+            ],
+            backgroundColor: ['#6c757d', '#4361ee', '#4cc9f0', '#28a745'],
+            borderWidth: 0
+        }]
+    };
     
-    // 获取所有项目数据（包括已归档的和未归档的）
-    window.pywebview.api.get_projects(true).then(archivedProjects => {
-        window.pywebview.api.get_projects(false).then(activeProjects => {
-            // 合并所有项目
-            const allProjects = [...activeProjects];
-            archivedProjects.forEach(archivedProject => {
-                if (!allProjects.some(p => p.id === archivedProject.id)) {
-                    allProjects.push(archivedProject);
-                }
-            });
-            
-            console.log('获取到未归档项目:', activeProjects.length);
-            console.log('获取到归档项目:', archivedProjects.length);
-            console.log('合并后总项目数:', allProjects.length);
-            
-            // 统计不同状态的任务数量
-            const statusCounts = {
-                'pending': 0,
-                'in-progress': 0,
-                'completed': 0,
-                'settled': 0
-            };
-            
-            // 过滤指定时间范围内的任务
-            const filteredTasks = activeTasks.filter(task => {
-                const taskDate = task.created_at ? new Date(task.created_at) : null;
-                return taskDate && taskDate >= startDate && taskDate <= endDate;
-            });
-            
-            // 统计未完成任务的数量
-            filteredTasks.forEach(task => {
-                const status = task.status || 'pending';
-                if (status === 'pending' || status === 'in-progress') {
-                    statusCounts[status]++;
-                }
-            });
-            
-            // 统计已完成的项目数量 - 所有项目都算作已完成
-            statusCounts.completed = allProjects.length;
-            
-            // 统计已结算的项目数量
-            statusCounts.settled = allProjects.filter(p => p.payment_status === 'paid').length;
-            
-            console.log('任务状态分布:', statusCounts);
-            
-            // 确保有任务数据
-            if (filteredTasks.length === 0 && allProjects.length === 0) {
-                // 获取图表Canvas
-                const chartCanvas = document.getElementById('tasks-status-chart');
-                if (!chartCanvas) return;
-                
-                // 销毁现有图表（如果存在）
-                if (window.tasksStatusChart) {
-                    window.tasksStatusChart.destroy();
-                }
-                
-                // 创建空图表
-                window.tasksStatusChart = new Chart(chartCanvas, {
-                    type: 'doughnut',
-                    data: {
-                        labels: ['暂无数据'],
-                        datasets: [{
-                            data: [1],
-                            backgroundColor: ['#e9ecef'],
-                            borderWidth: 0
-                        }]
-                    },
-                    options: {
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        plugins: {
-                            legend: {
-                                position: 'bottom',
-                                display: true
-                            },
-                            tooltip: {
-                                enabled: false
-                            }
+    // 创建新图表
+    window.tasksStatusChart = new Chart(chartCanvas, {
+        type: 'doughnut',
+        data: chartData,
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            cutout: '60%',
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        boxWidth: 15,
+                        padding: 15,
+                        font: {
+                            size: 12
                         }
                     }
-                });
-                return;
+                },
+                tooltip: {
+                    position: 'nearest',
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.raw || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = total > 0 ? Math.round((value / total) * 100) : 0;
+                            return `${label}: ${value} (${percentage}%)`;
+                        }
+                    }
+                }
             }
-            
-            // 准备图表数据
-            const chartData = {
-                labels: ['待办', '进行中', '已完成', '已结算'],
+        }
+    });
+}
+
+// 创建任务类型分布图表
+function createTaskTypeDistributionChart(stats) {
+    // 所有项目的类型分布（不受时间范围限制）
+    const labels = stats.type_counts.labels;
+    const data = stats.type_counts.data;
+    
+    // 获取图表Canvas
+    const chartCanvas = document.getElementById('tasks-type-chart');
+    if (!chartCanvas) return;
+    
+    // 销毁现有图表（如果存在）
+    if (window.tasksTypeChart) {
+        window.tasksTypeChart.destroy();
+    }
+    
+    // 确保有数据
+    if (labels.length === 0) {
+        // 创建空图表
+        window.tasksTypeChart = new Chart(chartCanvas, {
+            type: 'pie',
+            data: {
+                labels: ['暂无数据'],
                 datasets: [{
-                    data: [
-                        statusCounts.pending, 
-                        statusCounts['in-progress'], 
-                        statusCounts.completed, 
-                        statusCounts.settled
-                    ],
-                    backgroundColor: ['#6c757d', '#4361ee', '#4cc9f0', '#28a745'],
+                    data: [1],
+                    backgroundColor: ['#e9ecef'],
                     borderWidth: 0
                 }]
-            };
-            
-            // 获取图表Canvas
-            const chartCanvas = document.getElementById('tasks-status-chart');
-            if (!chartCanvas) return;
-            
-            // 销毁现有图表（如果存在）
-            if (window.tasksStatusChart) {
-                window.tasksStatusChart.destroy();
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: true,
+                plugins: {
+                    legend: {
+                        position: 'right',
+                        display: true
+                    },
+                    tooltip: {
+                        enabled: false
+                    }
+                }
             }
-            
-            // 创建新图表
-            window.tasksStatusChart = new Chart(chartCanvas, {
-                type: 'doughnut',
-                data: chartData,
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    cutout: '60%',
-                    plugins: {
-                        legend: {
-                            position: 'bottom',
-                            labels: {
-                                boxWidth: 15,
-                                padding: 15,
-                                font: {
-                                    size: 12
-                                }
-                            }
-                        },
-                        tooltip: {
-                            position: 'nearest',
-                            callbacks: {
-                                label: function(context) {
-                                    const label = context.label || '';
-                                    const value = context.raw || 0;
-                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                    const percentage = total > 0 ? Math.round((value / total) * 100) : 0;
-                                    return `${label}: ${value} (${percentage}%)`;
-                                }
-                            }
+        });
+        return;
+    }
+    
+    // 生成颜色
+    const backgroundColors = generateChartColors(labels.length);
+    
+    const chartData = {
+        labels: labels,
+        datasets: [{
+            data: data,
+            backgroundColor: backgroundColors,
+            borderWidth: 0
+        }]
+    };
+    
+    // 创建新图表
+    window.tasksTypeChart = new Chart(chartCanvas, {
+        type: 'pie',
+        data: chartData,
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'right',
+                    display: true,
+                    labels: {
+                        boxWidth: 15,
+                        padding: 15,
+                        font: {
+                            size: 12
+                        }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.raw || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = total > 0 ? Math.round((value / total) * 100) : 0;
+                            return `${label}: ${value} (${percentage}%)`;
                         }
                     }
                 }
-            });
-        }).catch(error => {
-            console.error('获取未归档项目数据失败:', error);
-        });
-    }).catch(error => {
-        console.error('获取归档项目数据失败:', error);
+            }
+        }
     });
 }
 
-// 创建任务类型分布图表
-function createTaskTypeDistributionChart(projects, period) {
-    // 根据周期过滤数据
+// 创建任务趋势图表（按桶汇总在后端SQL中完成）
+function createTaskTrendChart(tasks, projects, period) {
+    // 获取日期范围：年报按月汇总，周报和月报按日汇总
     const { startDate, endDate } = getDateRangeByPeriod(period);
+    const bucket = period === 'year' ? 'month' : 'day';
     
-    // 获取所有项目数据（包括已归档和未归档的）
-    window.pywebview.api.get_projects(true).then(archivedProjects => {
-        window.pywebview.api.get_projects(false).then(activeProjects => {
-            // 合并所有项目
-            const allProjects = [...activeProjects];
-            archivedProjects.forEach(archivedProject => {
-                if (!allProjects.some(p => p.id === archivedProject.id)) {
-                    allProjects.push(archivedProject);
-                }
-            });
-            
-            console.log('类型分布 - 获取到未归档项目:', activeProjects.length);
-            console.log('类型分布 - 获取到归档项目:', archivedProjects.length);
-            console.log('类型分布 - 合并后总项目数:', allProjects.length);
-            
-            // 统计不同类型的项目数量
-            const typeCounts = {};
+    safeApiCall('get_timeseries', ['projects_completed', 'payment_count'],
+                formatDateLabel(startDate, 'yyyy-MM-dd'), formatDateLabel(endDate, 'yyyy-MM-dd'), bucket)
+        .then(timeseries => {
+            if (!timeseries || timeseries.error) {
+                throw new Error(timeseries ? timeseries.error : '趋势数据为空');
+            }
+            const dateLabels = timeseries.labels;
+            const completedTasksData = timeseries.series.projects_completed;
+            const settledTasksData = timeseries.series.payment_count;
             
-            // 统计所有项目的类型分布（不受时间范围限制）
-            allProjects.forEach(project => {
-                const type = project.type || '未分类';
-                if (!typeCounts[type]) {
-                    typeCounts[type] = 0;
-                }
-                typeCounts[type]++;
+            console.log("趋势图数据统计:", {
+                完成项目: completedTasksData.reduce((a, b) => a + b, 0),
+                结算项目: settledTasksData.reduce((a, b) => a + b, 0)
             });
             
+            // 准备图表数据
+            const chartData = {
+                labels: dateLabels,
+                datasets: [
+                    {
+                        label: '完成项目',
+                        data: completedTasksData,
+                        borderColor: '#4cc9f0',
+                        backgroundColor: 'rgba(76, 201, 240, 0.1)',
+                        borderWidth: 2,
+                        fill: true,
+                        tension: 0.4
+                    },
+                    {
+                        label: '结算项目',
+                        data: settledTasksData,
+                        borderColor: '#f72585',
+                        backgroundColor: 'rgba(247, 37, 133, 0.1)',
+                        borderWidth: 2,
+                        fill: true,
+                        tension: 0.4
+                    }
+                ]
+            };
+            
             // 获取图表Canvas
-            const chartCanvas = document.getElementById('tasks-type-chart');
+            const chartCanvas = document.getElementById('tasks-trend-chart');
             if (!chartCanvas) return;
             
             // 销毁现有图表（如果存在）
-            if (window.tasksTypeChart) {
-                window.tasksTypeChart.destroy();
-            }
-            
-            // 确保有数据
-            if (Object.keys(typeCounts).length === 0) {
-                // 创建空图表
-                window.tasksTypeChart = new Chart(chartCanvas, {
-                    type: 'pie',
-                    data: {
-                        labels: ['暂无数据'],
-                        datasets: [{
-                            data: [1],
-                            backgroundColor: ['#e9ecef'],
-                            borderWidth: 0
-                        }]
-                    },
-                    options: {
-                        responsive: true,
-                        maintainAspectRatio: true,
-                        plugins: {
-                            legend: {
-                                position: 'right',
-                                display: true
-                            },
-                            tooltip: {
-                                enabled: false
-                            }
-                        }
-                    }
-                });
-                return;
+            if (window.tasksTrendChart) {
+                window.tasksTrendChart.destroy();
             }
             
-            // 准备图表数据
-            const labels = Object.keys(typeCounts);
-            const data = Object.values(typeCounts);
-            
-            // 生成颜色
-            const backgroundColors = generateChartColors(labels.length);
-            
-            const chartData = {
-                labels: labels,
-                datasets: [{
-                    data: data,
-                    backgroundColor: backgroundColors,
-                    borderWidth: 0
-                }]
-            };
-            
             // 创建新图表
-            window.tasksTypeChart = new Chart(chartCanvas, {
-                type: 'pie',
+            window.tasksTrendChart = new Chart(chartCanvas, {
+                type: 'line',
                 data: chartData,
                 options: {
                     responsive: true,
                     maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'right',
-                            display: true,
-                            labels: {
-                                boxWidth: 15,
-                                padding: 15,
-                                font: {
-                                    size: 12
-                                }
-                            }
-                        },
-                        tooltip: {
-                            callbacks: {
-                                label: function(context) {
-                                    const label = context.label || '';
-                                    const value = context.raw || 0;
-                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                    const percentage = total > 0 ? Math.round((value / total) * 100) : 0;
-                                    return `${label}: ${value} (${percentage}%)`;
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-        }).catch(error => {
-            console.error('获取未归档项目数据失败:', error);
-        });
-    }).catch(error => {
-        console.error('获取归档项目数据失败:', error);
-    });
-}
-
-// 创建任务趋势图表
-function createTaskTrendChart(tasks, projects, period) {
-    // 过滤掉已删除的任务
-    const activeTasks = tasks.filter(task => !(task.is_deleted === true || task.status === 'deleted'));
-    
-    // 根据周期确定日期格式和标签间隔
-    let dateFormat, labelStep;
-    switch (period) {
-        case 'week':
-            dateFormat = 'MM-dd';
-            labelStep = 1; // 每天显示一个标签
-            break;
-        case 'month':
-            dateFormat = 'MM-dd';
-            labelStep = 2; // 每两天显示一个标签
-            break;
-        case 'year':
-            dateFormat = 'yyyy-MM';
-            labelStep = 1; // 每月显示一个标签
-            break;
-        default:
-            dateFormat = 'MM-dd';
-            labelStep = 1;
-    }
-    
-    // 获取日期范围
-    const { startDate, endDate, dateLabels } = getDateRangeByPeriod(period);
-    
-    // 获取所有项目数据（包括已归档和未归档的）以及结算数据
-    window.pywebview.api.get_projects(true).then(archivedProjects => {
-        window.pywebview.api.get_projects(false).then(activeProjects => {
-            // 合并所有项目
-            const allProjects = [...activeProjects];
-            archivedProjects.forEach(archivedProject => {
-                if (!allProjects.some(p => p.id === archivedProject.id)) {
-                    allProjects.push(archivedProject);
-                }
-            });
-            
-            console.log('趋势图 - 获取到未归档项目:', activeProjects.length);
-            console.log('趋势图 - 获取到归档项目:', archivedProjects.length);
-            console.log('趋势图 - 合并后总项目数:', allProjects.length);
-            
-            window.pywebview.api.get_payments().then(payments => {
-                console.log("获取到结算数据:", payments.length);
-                
-                // 初始化数据数组
-                const createdTasksData = new Array(dateLabels.length).fill(0);
-                const completedTasksData = new Array(dateLabels.length).fill(0);
-                const settledTasksData = new Array(dateLabels.length).fill(0);
-                
-                // 统计所有项目（包括已归档和未归档）
-                allProjects.forEach(project => {
-                    if (project.completion_date) {
-                        const projectDate = new Date(project.completion_date);
-                        if (projectDate >= startDate && projectDate <= endDate) {
-                            const index = getDateIndex(projectDate, startDate, period);
-                            if (index >= 0 && index < completedTasksData.length) {
-                                completedTasksData[index]++;
-                                // 同时添加一个创建任务，确保数据匹配
-                                createdTasksData[index]++;
-                            }
-                        }
-                    }
-                });
-                
-                // 统计每天结算的任务数量
-                payments.forEach(payment => {
-                    if (payment.date) {
-                        const paymentDate = new Date(payment.date);
-                        if (paymentDate >= startDate && paymentDate <= endDate) {
-                            const index = getDateIndex(paymentDate, startDate, period);
-                            if (index >= 0 && index < settledTasksData.length) {
-                                settledTasksData[index]++;
-                            }
-                        }
-                    }
-                });
-                
-                // 计算总数
-                const totalCompletedProjects = completedTasksData.reduce((a, b) => a + b, 0);
-                const totalSettledProjects = settledTasksData.reduce((a, b) => a + b, 0);
-                
-                console.log("趋势图数据统计:", {
-                    完成项目: totalCompletedProjects,
-                    结算项目: totalSettledProjects
-                });
-                
-                // 准备图表数据
-                const chartData = {
-                    labels: dateLabels,
-                    datasets: [
-                        {
-                            label: '完成项目',
-                            data: completedTasksData,
-                            borderColor: '#4cc9f0',
-                            backgroundColor: 'rgba(76, 201, 240, 0.1)',
-                            borderWidth: 2,
-                            fill: true,
-                            tension: 0.4
-                        },
-                        {
-                            label: '结算项目',
-                            data: settledTasksData,
-                            borderColor: '#f72585',
-                            backgroundColor: 'rgba(247, 37, 133, 0.1)',
-                            borderWidth: 2,
-                            fill: true,
-                            tension: 0.4
-                        }
-                    ]
-                };
-                
-                // 获取图表Canvas
-                const chartCanvas = document.getElementById('tasks-trend-chart');
-                if (!chartCanvas) return;
-                
-                // 销毁现有图表（如果存在）
-                if (window.tasksTrendChart) {
-                    window.tasksTrendChart.destroy();
-                }
-                
-                // 创建新图表
-                window.tasksTrendChart = new Chart(chartCanvas, {
-                    type: 'line',
-                    data: chartData,
-                    options: {
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        scales: {
-                            x: {
-                                ticks: {
-                                    maxRotation: 0,
-                                    autoSkip: true,
-                                    maxTicksLimit: 10
-                                },
-                                grid: {
-                                    display: false
-                                }
+                    scales: {
+                        x: {
+                            ticks: {
+                                maxRotation: 0,
+                                autoSkip: true,
+                                maxTicksLimit: 10
                             },
-                            y: {
-                                beginAtZero: true,
-                                ticks: {
-                                    precision: 0
-                                }
+                            grid: {
+                                display: false
                             }
                         },
-                        plugins: {
-                            legend: {
-                                position: 'top',
-                                align: 'end'
-                            },
-                            tooltip: {
-                                mode: 'index',
-                                intersect: false,
-                                position: 'nearest'
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                precision: 0
                             }
+                        }
+                    },
+                    plugins: {
+                        legend: {
+                            position: 'top',
+                            align: 'end'
                         },
-                        interaction: {
+                        tooltip: {
                             mode: 'index',
-                            intersect: false
+                            intersect: false,
+                            position: 'nearest'
                         }
+                    },
+                    interaction: {
+                        mode: 'index',
+                        intersect: false
                     }
-                });
-            }).catch(error => {
-                console.error('获取结算数据失败:', error);
+                }
             });
         }).catch(error => {
-            console.error('获取未归档项目数据失败:', error);
+            console.error('获取趋势数据失败:', error);
         });
-    }).catch(error => {
-        console.error('获取归档项目数据失败:', error);
-    });
 }
 
 // 根据周期获取日期范围
@@ -1154,21 +880,6 @@ function getDateRangeByPeriod(period) {
     return { startDate, endDate, dateLabels };
 }
 
-// 获取日期在数组中的索引
-function getDateIndex(date, startDate, period) {
-    switch (period) {
-        case 'week':
-        case 'month':
-            // 计算天数差
-            return Math.floor((date - startDate) / (1000 * 60 * 60 * 24));
-        case 'year':
-            // 计算月份差
-            return (date.getFullYear() - startDate.getFullYear()) * 12 + date.getMonth() - startDate.getMonth();
-        default:
-            return 0;
-    }
-}
-
 // 格式化日期标签
 function formatDateLabel(date, format) {
     const year = date.getFullYear();
@@ -1451,88 +1162,29 @@ function loadTasksData(autoTransferToProjects = false) {
 
 // 将已完成的任务转移到项目模块
 function transferCompletedTasksToProjects(completedTasks) {
-    // 检查每个已完成的任务是否已经作为项目存在
-    // 如果不存在，则创建新项目
+    // 已完成的任务由后端在一个事务中批量转换为项目，已转换过的任务会被跳过
     if (!window.pywebview) {
         console.warn('PyWebView API not available, unable to transfer tasks to projects');
         return;
-    }
-    
-    // 首先获取现有项目
-    window.pywebview.api.get_projects(true).then(projects => {
-        // 创建一个映射表来检查任务是否已经转为项目
-        const existingProjects = {};
-        projects.forEach(project => {
-            if (project.task_id) {
-                existingProjects[project.task_id] = project;
-            }
-        });
-        
-        // 过滤出尚未转换为项目的任务
-        const tasksToConvert = completedTasks.filter(task => !existingProjects[task.id]);
-        
-        if (tasksToConvert.length === 0) {
-            console.log('没有新的已完成任务需要转移到项目');
-            return;
-        }
-        
-        console.log(`需要转移到项目的新完成任务: ${tasksToConvert.length}`);
-        
-        // 处理每个已完成的任务
-        const promises = [];
-        
-        tasksToConvert.forEach(task => {
-            // 创建新项目
-            const today = new Date().toISOString().split('T')[0];
-            
-            // 创建项目名称 - 如果有客户名称，添加到项目名称中
-            let projectName = task.title;
-            if (task.client) {
-                projectName = `[${task.client}] ${task.title}`;
-            }
-            
-            // 使用任务类别作为项目类型
-            const projectType = task.category || '已完成任务';
-            
-            // 项目备注中添加任务备注和客户信息
-            let projectNotes = task.notes || '';
-            if (task.client && !projectName.includes(`[${task.client}]`)) {
-                projectNotes = `客户: ${task.client}\n${projectNotes}`;
-            }
-            
-            // 获取任务数量，如果未设置则默认为1
-            const quantity = task.quantity || 1;
-            
-            // 根据API参数要求调整add_project调用
-            const promise = window.pywebview.api.add_project(
-                projectName,
-                projectType,
-                quantity,
-                today,
-                'unpaid',
-                projectNotes,
-                task.id  // 添加task_id参数
-            ).then(() => {
-                console.log(`已完成任务 "${task.title}" 已转移到项目模块，数量: ${quantity}`);
-            }).catch(error => {
-                console.error('转移任务到项目失败:', error);
-            });
-            
-            promises.push(promise);
-        });
+    }
+    
+    const taskIds = completedTasks.map(task => task.id);
+    
+    window.pywebview.api.convert_completed_tasks_to_projects(taskIds).then(projectIds => {
+        if (!projectIds || projectIds.length === 0) {
+            console.log('没有新的已完成任务需要转移到项目');
+            return;
+        }
         
-        // 等待所有项目创建完成
-        Promise.all(promises).then(() => {
-            console.log('所有已完成任务转移完成');
-            
-            // 如果当前在项目页面，刷新项目列表
-            const projectsPage = document.getElementById('projects-page');
-            if (projectsPage && projectsPage.classList.contains('active')) {
-                loadProjectsData();
-            }
-        });
+        console.log(`已完成任务已转移到项目模块: ${projectIds.length}`);
+        
+        // 如果当前在项目页面，刷新项目列表
+        const projectsPage = document.getElementById('projects-page');
+        if (projectsPage && projectsPage.classList.contains('active')) {
+            loadProjectsData();
+        }
     }).catch(error => {
-        console.error('获取项目列表失败:', error);
+        console.error('转移任务到项目失败:', error);
     });
 }
 
@@ -1746,49 +1398,18 @@ function loadClientsPromise() {
             return;
         }
         
-        window.pywebview.api.get_projects(true).then(projects => {
-            const clientDatalist = document.getElementById('client-options');
-            if (!clientDatalist) {
+        window.pywebview.api.get_client_names().then(clientNames => {
+            if (!document.getElementById('client-options')) {
                 resolve([]);
                 return;
             }
             
-            // 清空现有选项
-            clientDatalist.innerHTML = '';
-            
-            // 提取客户名称
-            let extractedClients = [];
+            // 后端已完成提取、去重和排序
+            applyClientsList(clientNames);
             
-            projects.forEach(project => {
-                // 从项目名称提取
-                const clientMatch = project.name.match(/\[(.*?)\]/);
-                if (clientMatch && clientMatch[1]) {
-                    extractedClients.push(clientMatch[1]);
-                }
-                
-                // 从备注中提取
-                if (project.notes && project.notes.includes('客户:')) {
-                    const notesClientMatch = project.notes.match(/客户:\s*([^\n]+)/);
-                    if (notesClientMatch && notesClientMatch[1]) {
-                        extractedClients.push(notesClientMatch[1].trim());
-                    }
-                }
-            });
-            
-            // 去重并排序
-            clientsList = [...new Set(extractedClients)].sort();
-            
-            // 添加到datalist
-            clientsList.forEach(client => {
-                const option = document.createElement('option');
-                option.value = client;
-                clientDatalist.appendChild(option);
-            });
-            
-            console.log('客户列表已从项目中加载:', clientsList.length);
             resolve(clientsList);
         }).catch(error => {
-            console.error('获取项目列表失败:', error);
+            console.error('获取客户列表失败:', error);
             reject(error);
         });
     });
@@ -3537,7 +3158,7 @@ function loadPaymentsData() {
     const periodFilter = document.getElementById('payment-period-filter')?.value || currentYear;
     
     // 使用safeApiCall代替直接调用
-    return safeApiCall('get_payments')
+    return safeListCall('get_payments', null)
         .then(payments => {
             if (!payments || !Array.isArray(payments)) {
                 console.error('获取结算数据失败:', payments);
@@ -3574,7 +3195,7 @@ function loadPaymentsData() {
             updatePaymentStatistics(uniquePayments, periodFilter);
             
             // 获取项目数据，然后渲染结算列表
-            return safeApiCall('get_projects')
+            return safeListCall('get_projects', false)
                 .then(projects => {
                     if (!projects || !Array.isArray(projects)) {
                         console.error('获取项目数据失败:', projects);
@@ -3588,7 +3209,7 @@ function loadPaymentsData() {
                     renderPaymentItems(uniquePayments, projects);
                     
                     // 更新结算图表
-                    updatePaymentsChart(uniquePayments, periodFilter);
+                    updatePaymentsChart(periodFilter);
                     
                     return uniquePayments;
                 })
@@ -3663,7 +3284,7 @@ function updatePaymentStatistics(payments, period) {
     paymentCountElement.setAttribute('data-length', paymentCount.toString().length);
     
     // 更新图表
-    updatePaymentsChart(filteredPayments, period);
+    updatePaymentsChart(period);
 }
 
 // 辅助函数：更新支付统计UI
@@ -3689,7 +3310,7 @@ function updatePaymentStatsUI(filteredPayments) {
     const periodFilter = document.getElementById('payment-period-filter')?.value || 'all';
     
     // 更新图表
-    updatePaymentsChart(filteredPayments, periodFilter);
+    updatePaymentsChart(periodFilter);
 }
 
 // 更新结算清单客户筛选下拉框
@@ -3737,70 +3358,53 @@ function updatePaymentClientOptions() {
     });
 }
 
-// 更新支付图表
-function updatePaymentsChart(payments, period) {
+// 更新支付图表：特定年份按月、所有时间按年汇总结算金额（在后端SQL中分组并补齐空缺）
+let paymentsChartRequest = 0;
+function updatePaymentsChart(period) {
     const canvas = document.getElementById('payments-chart');
     if (!canvas) return;
     
+    const groupByMonth = /^\d{4}$/.test(period);
+    const start = groupByMonth ? `${period}-01-01` : null;
+    const end = groupByMonth ? `${period}-12-31` : null;
+    const request = ++paymentsChartRequest;
+    
+    safeApiCall('get_timeseries', 'payment_amount', start, end, groupByMonth ? 'month' : 'year')
+        .then(timeseries => {
+            // 只渲染最后一次请求的结果
+            if (request !== paymentsChartRequest) return;
+            if (!timeseries || timeseries.error) {
+                throw new Error(timeseries ? timeseries.error : '结算趋势数据为空');
+            }
+            renderPaymentsChart(canvas, timeseries, groupByMonth);
+        })
+        .catch(error => {
+            console.error('获取结算趋势数据失败:', error);
+        });
+}
+
+// 用get_timeseries的结果绘制结算金额柱状图
+function renderPaymentsChart(canvas, timeseries, groupByMonth) {
     // 检查是否已有图表实例
     if (window.paymentsChart) {
         window.paymentsChart.destroy();
     }
     
-    // 按日期分组支付记录
-    const paymentsByDate = {};
-    
-    // 决定分组方式和显示格式
-    let groupByMonth = false;
-    if (period === 'all') {
-        // 如果是所有时间，按年份分组
-        groupByMonth = false;
-    } else if (/^\d{4}$/.test(period)) {
-        // 特定年，按月份分组
-        groupByMonth = true;
-    }
-    
-    payments.forEach(payment => {
-        if (!payment.date) return;
-        
-        const paymentDate = new Date(payment.date);
-        let dateKey;
-        
-        if (groupByMonth) {
-            // 按月分组 (格式: "2023-01")
-            const year = paymentDate.getFullYear();
-            const month = paymentDate.getMonth() + 1;
-            dateKey = `${year}-${month.toString().padStart(2, '0')}`;
-        } else {
-            // 按年分组
-            dateKey = paymentDate.getFullYear().toString();
-        }
-        
-        if (!paymentsByDate[dateKey]) {
-            paymentsByDate[dateKey] = 0;
-        }
-        
-        paymentsByDate[dateKey] += parseFloat(payment.amount || 0);
-    });
-    
-    // 排序日期键
-    const sortedDates = Object.keys(paymentsByDate).sort();
-    
     // 准备图表数据
     const chartData = {
-        labels: sortedDates.map(date => {
+        labels: timeseries.buckets.map(key => {
             if (groupByMonth) {
                 // 显示月份 (如 "2023年1月")
-                const [year, month] = date.split('-');
+                const [year, month] = key.split('-');
                 return `${year}年${parseInt(month)}月`;
             } else {
                 // 显示年份 (如 "2023年")
-                return `${date}年`;
+                return `${key}年`;
             }
         }),
         datasets: [{
             label: '结算金额',
-            data: sortedDates.map(date => paymentsByDate[date]),
+            data: timeseries.series.payment_amount,
             backgroundColor: 'rgba(67, 97, 238, 0.3)',
             borderColor: 'rgba(67, 97, 238, 1)',
             borderWidth: 1
@@ -3891,11 +3495,12 @@ function renderPaymentsList(payments) {
     
     // 获取所有项目（包括已归档的）
     if (checkApiAvailable()) {
-        // 使用Promise.all同时获取未归档和已归档项目
-        Promise.all([
-            safeApiCall('get_projects', false),
-            safeApiCall('get_projects', true)
+        // 在一次批量调用中同时获取未归档和已归档项目
+        safeBatchCall([
+            ['get_projects', false, 'json'],
+            ['get_projects', true, 'json']
         ])
+        .then(results => results.map(decodeListResult))
         .then(([activeProjects, archivedProjects]) => {
             console.log("获取到未归档项目:", activeProjects.length);
             console.log("获取到已归档项目:", archivedProjects.length);
@@ -4133,49 +3738,13 @@ function loadClientsOptions() {
     // 清空现有选项
     clientDatalist.innerHTML = '';
     
-    // 从完成项目模块中提取所有客户名称
+    // 客户名称由后端从客户表、任务和项目中汇总
     if (window.pywebview) {
-        // 获取所有项目(包括已归档的)
-        window.pywebview.api.get_projects(true).then(projects => {
-            // 提取客户名称 - 从项目名称中提取 [客户名称] 格式的信息
-            let extractedClients = [];
-            
-            projects.forEach(project => {
-                // 检查项目名称是否包含 [客户名称] 格式
-                const clientMatch = project.name.match(/\[(.*?)\]/);
-                if (clientMatch && clientMatch[1]) {
-                    // 提取客户名称
-                    extractedClients.push(clientMatch[1]);
-                }
-                
-                // 从备注中提取客户名称（如果备注中包含"客户:"前缀）
-                if (project.notes && project.notes.includes('客户:')) {
-                    const notesClientMatch = project.notes.match(/客户:\s*([^\n]+)/);
-                    if (notesClientMatch && notesClientMatch[1]) {
-                        extractedClients.push(notesClientMatch[1].trim());
-                    }
-                }
-            });
-            
-            // 去重
-            clientsList = [...new Set(extractedClients)];
-            
-            // 排序
-            clientsList.sort();
-            
-            // 添加到datalist
-            clientsList.forEach(client => {
-                const option = document.createElement('option');
-                option.value = client;
-                clientDatalist.appendChild(option);
-            });
-            
-            console.log('客户列表已从项目中更新:', clientsList.length);
-        }).catch(error => {
-            console.error('获取项目列表失败:', error);
+        window.pywebview.api.get_client_names().then(applyClientsList).catch(error => {
+            console.error('获取客户列表失败:', error);
         });
     } else {
-        console.warn('PyWebView API not available, unable to load clients from projects');
+        console.warn('PyWebView API not available, unable to load clients');
     }
 }
 
@@ -4652,21 +4221,25 @@ function loadClientsFromDatabase() {
         return;
     }
     
-    window.pywebview.api.get_clients()
-        .then(clients => {
-            // 更新客户列表全局变量
-            clientsList = clients.map(client => client.name);
-            
-            // 更新任务表单中的客户datalist
-            updateClientDatalist();
-            
-            console.log('客户列表已从数据库加载:', clientsList.length);
-        })
+    // 客户名称由后端从客户表、任务和项目中汇总并缓存
+    window.pywebview.api.get_client_names()
+        .then(applyClientsList)
         .catch(error => {
             console.error('获取客户列表失败:', error);
         });
 }
 
+// 用后端返回的客户名称更新全局变量和datalist
+function applyClientsList(clientNames) {
+    // 更新客户列表全局变量
+    clientsList = clientNames.slice();
+    
+    // 更新任务表单中的客户datalist
+    updateClientDatalist();
+    
+    console.log('客户列表已从数据库加载:', clientsList.length);
+}
+
 // 从数据库加载项目类型列表
 function loadCategoriesFromDatabase() {
     if (!window.pywebview) {
@@ -4675,20 +4248,23 @@ function loadCategoriesFromDatabase() {
     }
     
     window.pywebview.api.get_categories()
-        .then(categories => {
-            // 更新项目类型列表全局变量
-            categoriesList = categories.map(category => category.name);
-            
-            // 更新任务表单中的项目类型datalist
-            updateCategoryDatalist();
-            
-            console.log('项目类型列表已从数据库加载:', categoriesList.length);
-        })
+        .then(applyCategoriesList)
         .catch(error => {
             console.error('获取项目类型列表失败:', error);
         });
 }
 
+// 用数据库返回的项目类型列表更新全局变量和datalist
+function applyCategoriesList(categories) {
+    // 更新项目类型列表全局变量
+    categoriesList = categories.map(category => category.name);
+    
+    // 更新任务表单中的项目类型datalist
+    updateCategoryDatalist();
+    
+    console.log('项目类型列表已从数据库加载:', categoriesList.length);
+}
+
 // 打开网站类型管理模态框
 function openWebsitesModal() {
     if (!checkApiAvailable()) {
@@ -5300,7 +4876,54 @@ function setupTaskFilterEventListeners() {
 }
 
 // 导出数据功能
+// 后台导出任务：jobId -> { resolve, onProgress }
+const exportJobWaiters = {};
+// 当前正在进行的导出任务id
+let currentExportJobId = null;
+
+// Python端通过evaluate_js推送的导出进度
+window.onExportProgress = function(job) {
+    const waiter = exportJobWaiters[job.job_id];
+    if (!waiter) return;
+    
+    waiter.onProgress(job);
+    if (['completed', 'failed', 'cancelled'].includes(job.status)) {
+        delete exportJobWaiters[job.job_id];
+        waiter.resolve(job);
+    }
+};
+
+// 等待已提交的后台任务（导出或导入）结束，返回在任务结束时resolve的Promise
+function waitForJob(job, onProgress) {
+    return new Promise(resolve => {
+        exportJobWaiters[job.job_id] = { resolve, onProgress };
+        // 任务可能在注册回调之前就已结束，主动查询一次
+        safeApiCall('get_export_status', job.job_id)
+            .then(status => window.onExportProgress(status))
+            .catch(error => console.error('查询任务状态失败:', error));
+    });
+}
+
+// 提交后台导出任务，返回在任务结束时resolve的Promise
+function runExportJob(dataType, format, onProgress) {
+    return safeApiCall('start_export', dataType, format)
+        .then(job => {
+            if (job.error) {
+                return { status: 'failed', error: job.error };
+            }
+            currentExportJobId = job.job_id;
+            return waitForJob(job, onProgress);
+        });
+}
+
 function exportData() {
+    // 导出进行中再次点击按钮则取消导出
+    if (currentExportJobId) {
+        safeApiCall('cancel_export', currentExportJobId)
+            .catch(error => console.error('取消导出失败:', error));
+        return;
+    }
+    
     const dataType = document.getElementById('export-type').value;
     const format = document.getElementById('export-format').value;
     
@@ -5309,104 +4932,193 @@ function exportData() {
         return;
     }
     
-    // 禁用导出按钮，防止重复点击
+    // 导出期间按钮显示进度，点击可取消
     const exportBtn = document.getElementById('export-btn');
     const originalText = exportBtn.innerHTML;
     exportBtn.innerHTML = '<i class="bi bi-hourglass-split"></i> 导出中...';
-    exportBtn.disabled = true;
     
-    safeApiCall('export_data', dataType, format)
-        .then(result => {
-            // 恢复按钮状态
-            exportBtn.innerHTML = originalText;
-            exportBtn.disabled = false;
+    const restoreButton = () => {
+        currentExportJobId = null;
+        exportBtn.innerHTML = originalText;
+    };
+    
+    runExportJob(dataType, format, job => {
+        if (job.status === 'running') {
+            exportBtn.innerHTML = `<i class="bi bi-x-circle"></i> 导出中 ${job.percent}%（点击取消）`;
+        }
+    })
+        .then(job => {
+            restoreButton();
             
-            if (result.error) {
-                showAlert(`导出失败: ${result.error}`, '导出错误');
+            if (job.status === 'cancelled') {
+                showAlert('导出已取消', '导出');
+                return;
+            }
+            if (job.status === 'failed') {
+                showAlert(`导出失败: ${job.error}`, '导出错误');
                 return;
             }
             
+            const result = job.result || {};
             if (result.success && result.file_path) {
-                // 使用display_path来显示更简短的路径
-                const displayPath = result.display_path || result.file_path;
-                
-                // 创建导出成功对话框
-                const modal = document.createElement('div');
-                modal.className = 'modal fade';
-                modal.id = 'export-success-modal';
-                modal.setAttribute('tabindex', '-1');
-                modal.setAttribute('aria-hidden', 'true');
-                
-                modal.innerHTML = `
-                    <div class="modal-dialog modal-dialog-centered">
-                        <div class="modal-content">
-                            <div class="modal-header">
-                                <h5 class="modal-title">导出成功</h5>
-                                <button type="button" class="btn-close" data-bs-dismiss="modal" aria-label="Close"></button>
-                            </div>
-                            <div class="modal-body">
-                                <p>数据已成功导出到:</p>
-                                <div class="export-path-container">
-                                    <code>${displayPath}</code>
-                                </div>
-                            </div>
-                            <div class="modal-footer">
-                                <button type="button" class="btn btn-primary" id="open-export-folder">打开文件夹</button>
-                                <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">关闭</button>
-                            </div>
-                        </div>
-                    </div>
-                `;
-                
-                document.body.appendChild(modal);
-                
-                // 添加样式
-                const style = document.createElement('style');
-                style.textContent = `
-                    .export-path-container {
-                        background-color: #f8f9fa;
-                        padding: 10px;
-                        border-radius: 4px;
-                        word-break: break-all;
-                        max-width: 100%;
-                        overflow-x: auto;
-                    }
-                `;
-                document.head.appendChild(style);
-                
-                // 显示模态框
-                const bsModal = new bootstrap.Modal(modal);
-                bsModal.show();
-                
-                // 添加打开文件夹按钮事件
-                document.getElementById('open-export-folder').addEventListener('click', function() {
-                    try {
-                        const dirPath = result.file_path.substring(0, result.file_path.lastIndexOf('\\'));
-                        window.pywebview.api.open_file_explorer(dirPath)
-                            .catch(error => console.error('无法打开文件目录:', error));
-                    } catch (e) {
-                        console.error('处理文件路径时出错:', e);
-                    }
-                    bsModal.hide();
-                });
-                
-                // 监听模态框关闭事件，移除DOM元素
-                modal.addEventListener('hidden.bs.modal', function() {
-                    document.body.removeChild(modal);
-                });
+                showExportSuccessModal(result);
             } else {
                 showAlert('导出过程中发生未知错误', '导出错误');
             }
         })
         .catch(error => {
-            // 恢复按钮状态
-            exportBtn.innerHTML = originalText;
-            exportBtn.disabled = false;
+            restoreButton();
+            handleApiError(error);
+        });
+}
+
+// 导入数据功能
+// 当前正在进行的导入任务id
+let currentImportJobId = null;
+
+function importData() {
+    // 导入进行中再次点击按钮则取消导入（已写入的部分保留）
+    if (currentImportJobId) {
+        safeApiCall('cancel_export', currentImportJobId)
+            .catch(error => console.error('取消导入失败:', error));
+        return;
+    }
+    
+    const dataType = document.getElementById('import-type').value;
+    const mode = document.getElementById('import-mode').value;
+    const importBtn = document.getElementById('import-btn');
+    const originalText = importBtn.innerHTML;
+    
+    const restoreButton = () => {
+        currentImportJobId = null;
+        importBtn.innerHTML = originalText;
+    };
+    
+    safeApiCall('select_import_file')
+        .then(selection => {
+            if (selection.error) {
+                showAlert(`选择文件失败: ${selection.error}`, '导入错误');
+                return;
+            }
+            if (!selection.file_path) return;
             
+            return safeApiCall('start_import', dataType, selection.file_path, mode)
+                .then(job => {
+                    if (job.error) {
+                        showAlert(`导入失败: ${job.error}`, '导入错误');
+                        return;
+                    }
+                    currentImportJobId = job.job_id;
+                    importBtn.innerHTML = '<i class="bi bi-hourglass-split"></i> 导入中...';
+                    return waitForJob(job, status => {
+                        if (status.status === 'running') {
+                            importBtn.innerHTML = `<i class="bi bi-x-circle"></i> 导入中 ${status.percent}%（点击取消）`;
+                        }
+                    }).then(finished => {
+                        restoreButton();
+                        showImportResult(finished);
+                    });
+                });
+        })
+        .catch(error => {
+            restoreButton();
             handleApiError(error);
         });
 }
 
+// 显示导入结果：各类行数及前几条无效行的原因
+function showImportResult(job) {
+    if (job.status === 'cancelled') {
+        showAlert('导入已取消，取消前已导入的数据会保留', '导入');
+        return;
+    }
+    if (job.status === 'failed') {
+        showAlert(`导入失败: ${job.error}`, '导入错误');
+        return;
+    }
+    
+    const result = job.result || {};
+    const skipped = (result.skipped || 0) + (result.duplicates || 0);
+    let message = `导入完成：新增${result.inserted || 0}条，更新${result.updated || 0}条，` +
+        `跳过${skipped}条，无效${result.invalid || 0}条。`;
+    const errors = (result.errors || []).slice(0, 5);
+    if (errors.length > 0) {
+        message += ' ' + errors.map(item => `第${item.line}行: ${item.error}`).join('；');
+    }
+    showAlert(message, '导入');
+}
+
+// 显示导出成功对话框
+function showExportSuccessModal(result) {
+    // 使用display_path来显示更简短的路径
+    const displayPath = result.display_path || result.file_path;
+    
+    // 创建导出成功对话框
+    const modal = document.createElement('div');
+    modal.className = 'modal fade';
+    modal.id = 'export-success-modal';
+    modal.setAttribute('tabindex', '-1');
+    modal.setAttribute('aria-hidden', 'true');
+    
+    modal.innerHTML = `
+        <div class="modal-dialog modal-dialog-centered">
+            <div class="modal-content">
+                <div class="modal-header">
+                    <h5 class="modal-title">导出成功</h5>
+                    <button type="button" class="btn-close" data-bs-dismiss="modal" aria-label="Close"></button>
+                </div>
+                <div class="modal-body">
+                    <p>数据已成功导出到:</p>
+                    <div class="export-path-container">
+                        <code>${displayPath}</code>
+                    </div>
+                </div>
+                <div class="modal-footer">
+                    <button type="button" class="btn btn-primary" id="open-export-folder">打开文件夹</button>
+                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">关闭</button>
+                </div>
+            </div>
+        </div>
+    `;
+    
+    document.body.appendChild(modal);
+    
+    // 添加样式
+    const style = document.createElement('style');
+    style.textContent = `
+        .export-path-container {
+            background-color: #f8f9fa;
+            padding: 10px;
+            border-radius: 4px;
+            word-break: break-all;
+            max-width: 100%;
+            overflow-x: auto;
+        }
+    `;
+    document.head.appendChild(style);
+    
+    // 显示模态框
+    const bsModal = new bootstrap.Modal(modal);
+    bsModal.show();
+    
+    // 添加打开文件夹按钮事件
+    document.getElementById('open-export-folder').addEventListener('click', function() {
+        try {
+            const dirPath = result.file_path.substring(0, result.file_path.lastIndexOf('\\'));
+            window.pywebview.api.open_file_explorer(dirPath)
+                .catch(error => console.error('无法打开文件目录:', error));
+        } catch (e) {
+            console.error('处理文件路径时出错:', e);
+        }
+        bsModal.hide();
+    });
+    
+    // 监听模态框关闭事件，移除DOM元素
+    modal.addEventListener('hidden.bs.modal', function() {
+        document.body.removeChild(modal);
+    });
+}
+
 // 辅助函数：更新支付统计UI
 function updatePaymentStatsUI(filteredPayments) {
     const totalAmountElement = document.getElementById('total-amount');
@@ -5431,7 +5143,7 @@ function updatePaymentStatsUI(filteredPayments) {
     const periodFilter = document.getElementById('payment-period-filter')?.value || 'all';
     
     // 更新图表
-    updatePaymentsChart(filteredPayments, periodFilter);
+    updatePaymentsChart(periodFilter);
 }
 
 // 初始化主题
@@ -5701,12 +5413,62 @@ function safeApiCall(apiFunction, ...args) {
     });
 }
 
+// 一次桥接往返执行多个API调用，calls形如 [['get_tasks'], ['get_projects', true], ...]
+// 按顺序返回各调用的结果；任一调用失败则整体reject。atomic为true时写操作全部成功或全部回滚
+function safeBatchCall(calls, atomic = false) {
+    const payload = calls.map(([method, ...args]) => ({ method, args }));
+    return safeApiCall('batch', payload, atomic)
+        .then(response => {
+            if (!response || response.error) {
+                throw new Error(response ? response.error : '批量调用无返回');
+            }
+            const failed = response.results.findIndex(item => !item.ok);
+            if (failed !== -1) {
+                throw new Error(`${calls[failed][0]}: ${response.results[failed].error}`);
+            }
+            return response.results.map(item => item.result);
+        });
+}
+
+// 列式返回值还原为对象数组：{columns: [...], rows: [[...], ...]} -> [{...}, ...]
+// 非列式的返回值（如错误对象）原样返回
+function decodeColumnar(result) {
+    if (!result || !Array.isArray(result.columns) || !Array.isArray(result.rows)) {
+        return result;
+    }
+    const columns = result.columns;
+    return result.rows.map(row => {
+        const record = {};
+        for (let i = 0; i < columns.length; i++) {
+            record[columns[i]] = row[i];
+        }
+        return record;
+    });
+}
+
+// 还原列表API的返回值：json格式为SQLite生成的JSON文本，columnar格式为列式对象，
+// 后端退回字典列表时原样返回
+function decodeListResult(result) {
+    if (typeof result === 'string') {
+        return JSON.parse(result);
+    }
+    return decodeColumnar(result);
+}
+
+// 以json格式调用列表API（get_tasks/get_accounts/get_projects/get_payments）并还原为对象数组
+// args需写全该API在format之前的筛选参数，例如 safeListCall('get_tasks', null, null)
+function safeListCall(method, ...args) {
+    return safeApiCall(method, ...args, 'json').then(decodeListResult);
+}
+
 // 修改loadTasksData函数
 function loadTasksData(autoTransferToProjects = false) {
     console.log('尝试加载任务数据...');
     
-    safeApiCall('get_tasks')
-        .then(tasks => {
+    // 任务、客户和任务类别在一次桥接调用中取回
+    safeBatchCall([['get_tasks', null, null, 'json'], ['get_client_names'], ['get_categories']])
+        .then(([taskRows, clientNames, categories]) => {
+            const tasks = decodeListResult(taskRows);
             console.log('All tasks loaded:', tasks.length);
             
             // 过滤掉已删除的任务和已完成的任务(已完成任务将在项目模块中显示)
@@ -5717,54 +5479,47 @@ function loadTasksData(autoTransferToProjects = false) {
             });
             
             // 更新任务状态：有进度记录的任务标记为"进行中"，没有进度记录的任务标记为"待办"
-            tasksList.forEach(task => {
-                // 已完成的任务不需要处理
-                if (task.status === 'completed') {
-                    return;
-                }
-                
-                // 检查是否有进度记录
-                safeApiCall('get_task_progress', task.id)
-                    .then(progress => {
-                        // 如果有进度记录但状态不是"进行中"，更新状态
-                        if (progress && progress.length > 0 && task.status !== 'in-progress') {
-                            safeApiCall('update_task', task.id, {
-                                status: 'in-progress'
-                            }).then(() => {
-                                console.log(`任务 "${task.title}" 状态已更新为进行中`);
-                                task.status = 'in-progress';
-                                // 更新任务状态徽章
-                                updateTaskStatusBadge();
-                            }).catch(error => {
-                                console.error('更新任务状态失败:', error);
-                            });
-                        } 
-                        // 如果没有进度记录但状态不是"待办"，更新状态
-                        else if ((!progress || progress.length === 0) && task.status !== 'pending') {
-                            safeApiCall('update_task', task.id, {
-                                status: 'pending'
-                            }).then(() => {
-                                console.log(`任务 "${task.title}" 状态已更新为待办`);
-                                task.status = 'pending';
+            // 所有任务的进度记录在一次批量调用中查询，需要变更的状态也合并为一次批量写入
+            if (tasksList.length > 0) {
+                safeBatchCall(tasksList.map(task => ['get_task_progress', task.id]))
+                    .then(progressLists => {
+                        const statusUpdates = [];
+                        tasksList.forEach((task, index) => {
+                            const progress = progressLists[index];
+                            const hasProgress = progress && progress.length > 0;
+                            const expectedStatus = hasProgress ? 'in-progress' : 'pending';
+                            if (task.status !== expectedStatus) {
+                                statusUpdates.push({ task, status: expectedStatus });
+                            }
+                        });
+                        if (statusUpdates.length === 0) {
+                            return;
+                        }
+                        return safeBatchCall(statusUpdates.map(({ task, status }) => ['update_task', task.id, { status }]))
+                            .then(() => {
+                                statusUpdates.forEach(({ task, status }) => {
+                                    task.status = status;
+                                    console.log(`任务 "${task.title}" 状态已更新为${status === 'in-progress' ? '进行中' : '待办'}`);
+                                });
                                 // 更新任务状态徽章
                                 updateTaskStatusBadge();
-                            }).catch(error => {
+                            })
+                            .catch(error => {
                                 console.error('更新任务状态失败:', error);
                             });
-                        }
                     })
                     .catch(error => {
                         console.error('获取任务进度失败:', error);
                     });
-            });
+            }
             
             console.log('Tasks after filtering:', tasksList.length);
             renderTasksList(tasksList);
             updateTaskStatusBadge();
             
-            // 加载客户和任务类别选项列表
-            loadClientsFromDatabase();
-            loadCategoriesFromDatabase();
+            // 更新客户和任务类别选项列表
+            applyClientsList(clientNames);
+            applyCategoriesList(categories);
             
             // 仅当需要时，将已完成的任务转移到项目模块
             if (autoTransferToProjects) {
@@ -5826,7 +5581,7 @@ function loadAccountsData() {
         searchInput.value = '';
     }
     
-    safeApiCall('get_accounts')
+    safeListCall('get_accounts', null)
         .then(accounts => {
             console.log("原始账号数据:", accounts);
             
@@ -5895,7 +5650,7 @@ function loadAccountsData() {
 function loadProjectsData() {
     console.log('尝试加载项目数据...');
     
-    safeApiCall('get_projects', showArchived)
+    safeListCall('get_projects', showArchived)
         .then(projects => {
             projectsList = projects;
             renderProjectsList(projects);
@@ -5928,7 +5683,7 @@ function loadPaymentsData() {
     const currentYear = new Date().getFullYear().toString();
     const periodFilter = document.getElementById('payment-period-filter')?.value || currentYear;
     
-    safeApiCall('get_payments')
+    safeListCall('get_payments', null)
         .then(payments => {
             console.log('获取到结算数据:', payments.length);
             
@@ -5984,57 +5739,25 @@ function setupTaskReportCharts(period) {
         container.classList.add('loading');
     });
     
-    // 获取所有任务数据
-    safeApiCall('get_tasks')
-        .then(tasks => {
-            // 获取所有项目数据（包括已归档和未归档的）
-            safeApiCall('get_projects', true)
-                .then(archivedProjects => {
-                    safeApiCall('get_projects', false)
-                        .then(activeProjects => {
-                            // 合并所有项目
-                            const allProjects = [...activeProjects];
-                            archivedProjects.forEach(archivedProject => {
-                                if (!allProjects.some(p => p.id === archivedProject.id)) {
-                                    allProjects.push(archivedProject);
-                                }
-                            });
-                            
-                            console.log('报告 - 获取到未归档项目:', activeProjects.length);
-                            console.log('报告 - 获取到归档项目:', archivedProjects.length);
-                            console.log('报告 - 合并后总项目数:', allProjects.length);
-                            
-                            // 调用各个图表函数并传递任务和所有项目数据
-                            updateTasksStatistics(tasks, allProjects, period);
-                            createTaskStatusChart(tasks, allProjects, period);
-                            createTaskTypeDistributionChart(allProjects, period);
-                            createTaskTrendChart(tasks, allProjects, period);
-                            
-                            // 移除加载状态
-                            chartContainers.forEach(container => {
-                                container.classList.remove('loading');
-                            });
-                        })
-                        .catch(error => {
-                            console.error('获取未归档项目数据失败:', error);
-                            // 移除加载状态
-                            chartContainers.forEach(container => {
-                                container.classList.remove('loading');
-                                container.innerHTML = '<div class="chart-error"><i class="bi bi-exclamation-triangle"></i> 加载失败</div>';
-                            });
-                        });
-                })
-                .catch(error => {
-                    console.error('获取归档项目数据失败:', error);
-                    // 移除加载状态
-                    chartContainers.forEach(container => {
-                        container.classList.remove('loading');
-                        container.innerHTML = '<div class="chart-error"><i class="bi bi-exclamation-triangle"></i> 加载失败</div>';
-                    });
-                });
+    // 统计数据由后端聚合，一次调用即可获得全部图表数字
+    safeApiCall('get_dashboard_stats', period)
+        .then(stats => {
+            if (stats.error) {
+                throw new Error(stats.error);
+            }
+            
+            updateTasksStatistics(stats);
+            createTaskStatusChart(stats);
+            createTaskTypeDistributionChart(stats);
+            createTaskTrendChart([], [], period);
+            
+            // 移除加载状态
+            chartContainers.forEach(container => {
+                container.classList.remove('loading');
+            });
         })
         .catch(error => {
-            console.error('获取任务数据失败:', error);
+            console.error('获取报告统计数据失败:', error);
             // 移除加载状态
             chartContainers.forEach(container => {
                 container.classList.remove('loading');
@@ -6366,4 +6089,73 @@ if (resetAvatarBtn) {
             showAlert('头像已恢复为默认头像', '成功');
         }
     });
-}
\ No newline at end of file
+}
+// 隐藏的诊断面板：Ctrl+Shift+D 打开/关闭，显示各API的调用统计
+let perfPanelTimer = null;
+
+function togglePerfPanel() {
+    let panel = document.getElementById('perf-panel');
+    if (panel) {
+        clearInterval(perfPanelTimer);
+        perfPanelTimer = null;
+        panel.remove();
+        return;
+    }
+    
+    panel = document.createElement('div');
+    panel.id = 'perf-panel';
+    panel.className = 'card shadow';
+    panel.style.cssText = 'position:fixed;right:16px;bottom:16px;width:720px;max-height:60vh;overflow:auto;z-index:2000;font-size:12px;';
+    panel.innerHTML = `
+        <div class="card-header d-flex justify-content-between align-items-center">
+            <span>API调用统计 <small class="text-muted" id="perf-panel-since"></small></span>
+            <span>
+                <button type="button" class="btn btn-sm btn-outline-secondary" id="perf-panel-reset">重置</button>
+                <button type="button" class="btn btn-sm btn-outline-secondary" id="perf-panel-close">关闭</button>
+            </span>
+        </div>
+        <table class="table table-sm table-striped mb-0">
+            <thead>
+                <tr><th>方法</th><th>调用</th><th>错误</th><th>p50</th><th>p95</th><th>p99</th><th>最大</th><th>行数</th><th>平均大小</th></tr>
+            </thead>
+            <tbody id="perf-panel-body"></tbody>
+        </table>
+    `;
+    document.body.appendChild(panel);
+    document.getElementById('perf-panel-close').addEventListener('click', togglePerfPanel);
+    document.getElementById('perf-panel-reset').addEventListener('click', () => refreshPerfPanel(true));
+    
+    refreshPerfPanel();
+    perfPanelTimer = setInterval(refreshPerfPanel, 2000);
+}
+
+function refreshPerfPanel(reset = false) {
+    safeApiCall('get_perf_stats', reset)
+        .then(stats => {
+            const body = document.getElementById('perf-panel-body');
+            if (!body) return;
+            document.getElementById('perf-panel-since').textContent = `自 ${stats.since}`;
+            const formatBytes = bytes => bytes == null ? '-' : bytes >= 1024 ? `${(bytes / 1024).toFixed(1)}KB` : `${bytes}B`;
+            body.innerHTML = Object.entries(stats.methods).map(([method, item]) => `
+                <tr>
+                    <td>${method}</td>
+                    <td>${item.calls}</td>
+                    <td>${item.errors}</td>
+                    <td>${item.p50_ms}ms</td>
+                    <td>${item.p95_ms}ms</td>
+                    <td>${item.p99_ms}ms</td>
+                    <td>${item.max_ms}ms</td>
+                    <td>${item.rows}</td>
+                    <td>${formatBytes(item.avg_payload_bytes)}</td>
+                </tr>
+            `).join('');
+        })
+        .catch(error => console.error('获取API调用统计失败:', error));
+}
+
+document.addEventListener('keydown', event => {
+    if (event.ctrlKey && event.shiftKey && (event.key === 'D' || event.key === 'd')) {
+        event.preventDefault();
+        togglePerfPanel();
+    }
+});